@@ -0,0 +1,205 @@
+"""Helpers shared by the benchmark scripts"""
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+import requests
+
+
+@contextmanager
+def temp_database():
+    """Yield the URL of a seeded SQLite database in a temporary directory"""
+    directory = tempfile.mkdtemp(prefix='bench-')
+    url = f"sqlite:///{os.path.join(directory, 'app.db')}"
+    try:
+        with bench_app(url):
+            pass
+        yield url
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+@contextmanager
+def bench_app(database_url=None, **overrides):
+    """Yield a seeded app without Power BI credentials or background threads"""
+    from src.config import Config
+    from src.main import create_app
+    from src.database.seed import init_database, seed_database
+    from src.models.user import db
+
+    directory = None
+    if database_url is None:
+        directory = tempfile.mkdtemp(prefix='bench-')
+        database_url = f"sqlite:///{os.path.join(directory, 'app.db')}"
+
+    settings = {
+        'SQLALCHEMY_DATABASE_URI': database_url,
+        'SQLALCHEMY_REPLICA_URIS': [],
+        'JWT_SECRET_KEY': 'benchmark-jwt-secret-key-that-is-long-enough',
+        'POWERBI_CLIENT_ID': None,
+        'POWERBI_CATALOG_SYNC_INTERVAL': 0,
+        'WRITE_BEHIND_ENABLED': False
+    }
+    settings.update(overrides)
+    app = create_app(type('BenchConfig', (Config,), settings))
+    with app.app_context():
+        init_database()
+        seed_database()
+
+    try:
+        yield app
+    finally:
+        app.extensions['password_hasher'].shutdown()
+        app.extensions['event_bus'].close()
+        with app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+        if directory:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def running_server(database_url, *serve_args, env=None, startup_timeout=30):
+    """Run ``python -m src.serve`` on a free local port, yield the process (with ``base_url`` set)"""
+    port = free_port()
+    server_env = dict(
+        os.environ,
+        DATABASE_URL=database_url,
+        JWT_SECRET_KEY='benchmark-jwt-secret-key-that-is-long-enough',
+        POWERBI_CATALOG_SYNC_INTERVAL='0',
+        **(env or {})
+    )
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'src.serve', '--bind', f'127.0.0.1:{port}', *serve_args],
+        cwd=PROJECT_ROOT,
+        env=server_env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    process.base_url = base_url
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f'Server exited with code {process.returncode}')
+            try:
+                requests.get(f'{base_url}/health', timeout=1)
+                break
+            except requests.RequestException:
+                if time.monotonic() > deadline:
+                    raise RuntimeError('Server did not start in time')
+                time.sleep(0.2)
+        yield process
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def process_tree_rss(pid):
+    """Resident memory of a process and its children in MiB (Linux only, else None)"""
+    total = 0
+    pending = [pid]
+    try:
+        while pending:
+            current = pending.pop()
+            with open(f'/proc/{current}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1])
+            for task in os.listdir(f'/proc/{current}/task'):
+                with open(f'/proc/{current}/task/{task}/children') as f:
+                    pending.extend(int(child) for child in f.read().split())
+    except OSError:
+        return None
+    return total / 1024
+
+
+_sessions = threading.local()
+
+
+def thread_session():
+    """A keep-alive requests session for the calling thread"""
+    if not hasattr(_sessions, 'session'):
+        _sessions.session = requests.Session()
+    return _sessions.session
+
+
+def login(base_url, username='user', password='user123'):
+    """Log in against a running server, returns the Authorization header"""
+    response = requests.post(f'{base_url}/api/auth/login', json={'username': username, 'password': password}, timeout=30)
+    response.raise_for_status()
+    return {'Authorization': f"Bearer {response.json()['token']}"}
+
+
+def run_concurrently(func, total, concurrency):
+    """Call ``func(index)`` ``total`` times from ``concurrency`` threads
+
+    Returns (latencies in seconds, errors, wall-clock seconds).
+    """
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def worker():
+        while True:
+            with lock:
+                index = next(counter, None)
+            if index is None:
+                return
+            started = time.perf_counter()
+            try:
+                func(index)
+            except Exception as e:
+                with lock:
+                    errors.append(e)
+                continue
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - started
+
+
+def percentile(values, fraction):
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def report(name, latencies, errors=(), elapsed=None):
+    """Print one result line: throughput and latency percentiles in milliseconds"""
+    throughput = f'{len(latencies) / elapsed:8.1f} req/s' if elapsed else ' ' * 14
+    print(
+        f'{name:<32} n={len(latencies):<6} err={len(errors):<4} {throughput}  '
+        f'p50={percentile(latencies, 0.50) * 1000:7.2f}ms  '
+        f'p95={percentile(latencies, 0.95) * 1000:7.2f}ms  '
+        f'p99={percentile(latencies, 0.99) * 1000:7.2f}ms'
+    )
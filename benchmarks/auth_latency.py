@@ -0,0 +1,73 @@
+"""Authentication latency: ``python -m benchmarks.auth_latency [--requests N] [--concurrency C]``
+
+Measures, in-process through the Flask test client:
+
+- login: password verification in the bounded hashing pool
+- me (claims): a request authorized from the token's signed claims
+- me (user cache): a token without claims, resolved through the user cache
+- login (busy): logins beyond the pool's queue, which must fail fast with 503
+"""
+import click
+from flask_jwt_extended import create_access_token
+from benchmarks._common import bench_app, report, run_concurrently
+
+
+def login_headers(client):
+    response = client.post('/api/auth/login', json={'username': 'user', 'password': 'user123'})
+    return {'Authorization': f"Bearer {response.get_json()['token']}"}
+
+
+def expect(status, response):
+    if response.status_code != status:
+        raise RuntimeError(f'HTTP {response.status_code}')
+
+
+@click.command()
+@click.option('--requests', 'total', default=500, show_default=True, help='Requests per scenario.')
+@click.option('--concurrency', default=8, show_default=True, help='Concurrent clients.')
+@click.option('--hash-workers', default=2, show_default=True, help='Password hashing processes.')
+def main(total, concurrency, hash_workers):
+    """Measure login and authenticated request latency."""
+    overrides = {
+        'PASSWORD_HASH_WORKERS': hash_workers,
+        'LOGIN_MAX_ATTEMPTS_PER_USERNAME': total * 10,
+        'LOGIN_MAX_ATTEMPTS_PER_IP': total * 10
+    }
+    with bench_app(**overrides) as app:
+        client = app.test_client()
+        claims_headers = login_headers(client)
+        with app.test_request_context():
+            legacy_headers = {'Authorization': f"Bearer {create_access_token(identity='2')}"}
+
+        logins = max(total // 10, concurrency)
+        report('login', *run_concurrently(
+            lambda _: expect(200, app.test_client().post(
+                '/api/auth/login', json={'username': 'user', 'password': 'user123'}
+            )),
+            logins, concurrency
+        ))
+        report('me (claims)', *run_concurrently(
+            lambda _: expect(200, app.test_client().get('/api/auth/me', headers=claims_headers)),
+            total, concurrency
+        ))
+        report('me (user cache)', *run_concurrently(
+            lambda _: expect(200, app.test_client().get('/api/auth/me', headers=legacy_headers)),
+            total, concurrency
+        ))
+
+    with bench_app(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_MAX_QUEUE=1, **{
+        key: value for key, value in overrides.items() if key != 'PASSWORD_HASH_WORKERS'
+    }) as app:
+        statuses = []
+        app.test_client().post('/api/auth/login', json={'username': 'user', 'password': 'user123'})
+
+        def busy_login(_):
+            response = app.test_client().post('/api/auth/login', json={'username': 'user', 'password': 'user123'})
+            statuses.append(response.status_code)
+
+        report('login (busy)', *run_concurrently(busy_login, logins, concurrency * 4))
+        print(f"{'':<32} {statuses.count(200)} served, {statuses.count(503)} rejected with 503")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Change feed overhead: ``python -m benchmarks.change_feed [--writers N]``
+
+Runs the like and reaction toggles of the atomic counters and of the
+write-behind buffer with and without the change feed recording them, with
+an admin polling ``/api/changes`` alongside:
+
+- direct / direct-no-feed: every toggle commits in its request
+- write-behind / write-behind-no-feed: toggles are buffered and flushed in batches
+
+Every writer acts as its own user, as in ``benchmarks.concurrent_writers``.
+"""
+import threading
+import time
+from contextlib import nullcontext
+from unittest import mock
+import click
+from benchmarks._common import bench_app, report, run_concurrently
+from benchmarks.concurrent_writers import REACTIONS, writer_headers
+from src.models.change_log import ChangeLogEntry
+
+MODES = {
+    'direct': ({}, True),
+    'direct-no-feed': ({}, False),
+    'write-behind': ({'WRITE_BEHIND_ENABLED': True}, True),
+    'write-behind-no-feed': ({'WRITE_BEHIND_ENABLED': True}, False)
+}
+
+
+def toggle(client, headers, index):
+    if index % 2:
+        response = client.post('/api/comments/1/like', headers=headers)
+    else:
+        response = client.post('/api/reactions', json={'report_id': 1, 'tipo': REACTIONS[index % 3]}, headers=headers)
+    if response.status_code >= 400:
+        raise RuntimeError(response.get_json().get('message'))
+
+
+@click.command()
+@click.option('--writers', default=16, show_default=True, help='Concurrent writers.')
+@click.option('--writes', default=100, show_default=True, help='Toggles per writer.')
+@click.option('--mode', 'modes', type=click.Choice(list(MODES)), multiple=True,
+              help='Modes to run (default: all).')
+def main(writers, writes, modes):
+    """Measure toggle throughput with and without the change feed."""
+    for mode in modes or MODES:
+        overrides, feed = MODES[mode]
+        disabled = nullcontext() if feed else mock.patch.object(ChangeLogEntry, 'record', lambda *args, **kwargs: None)
+        with disabled, bench_app(**overrides) as app:
+            identities = iter(writer_headers(app, writers))
+            lock = threading.Lock()
+            local = threading.local()
+            stop = threading.Event()
+            poll_latencies, poll_errors = [], []
+
+            with app.test_client() as client:
+                admin = client.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'}).get_json()
+                admin_headers = {'Authorization': f"Bearer {admin['token']}"}
+
+            def writer():
+                """This thread's client and user"""
+                if not hasattr(local, 'client'):
+                    with lock:
+                        local.headers = next(identities)
+                    local.client = app.test_client()
+                return local.client, local.headers
+
+            def poll_loop():
+                client = app.test_client()
+                since = 0
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    response = client.get(f'/api/changes?since={since}', headers=admin_headers)
+                    with lock:
+                        if response.status_code == 200:
+                            poll_latencies.append(time.perf_counter() - started)
+                            since = response.get_json()['next_since']
+                        else:
+                            poll_errors.append(response.status_code)
+                    time.sleep(0.05)
+
+            poller = threading.Thread(target=poll_loop)
+            poller.start()
+
+            latencies, errors, elapsed = run_concurrently(
+                lambda index: toggle(*writer(), index), writers * writes, writers
+            )
+
+            stop.set()
+            poller.join()
+            if 'write_behind' in app.extensions:
+                app.extensions['write_behind'].stop()
+
+            report(f'{mode}: toggles', latencies, errors, elapsed)
+            report(f'{mode}: feed polls', poll_latencies, poll_errors)
+
+if __name__ == '__main__':
+    main()
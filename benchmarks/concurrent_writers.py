@@ -0,0 +1,111 @@
+"""Concurrent writers on SQLite: ``python -m benchmarks.concurrent_writers [--writers N]``
+
+Runs the same mix of comment, like and reaction writes, with readers
+listing comments alongside, against each SQLite profile:
+
+- wal: the default engine profile (WAL journal, synchronous NORMAL, busy wait)
+- rollback: the rollback journal without busy wait, as before the profile
+
+Every writer acts as its own user, so failures come from locking, not from
+one user's toggles racing each other.
+"""
+import threading
+import time
+import click
+from flask_jwt_extended import create_access_token
+from benchmarks._common import bench_app, report, run_concurrently
+from src.models.user import db, User
+from src.services.token_revocation import user_claims
+
+PROFILES = {
+    'wal': {},
+    'rollback': {'SQLITE_JOURNAL_MODE': 'DELETE', 'SQLITE_SYNCHRONOUS': 'FULL', 'SQLITE_BUSY_TIMEOUT_MS': 0}
+}
+
+REACTIONS = ('me_interesa', 'increible', 'aporta')
+
+
+def writer_headers(app, writers):
+    """Create one user per writer, returns their Authorization headers"""
+    with app.app_context():
+        users = [User(username=f'writer{index}', email=f'writer{index}@example.com') for index in range(writers)]
+        for user in users:
+            user.password_hash = 'unused'
+        db.session.add_all(users)
+        db.session.commit()
+        with app.test_request_context():
+            return [
+                {'Authorization': f"Bearer {create_access_token(identity=str(user.id), additional_claims=user_claims(user))}"}
+                for user in users
+            ]
+
+
+def write(client, headers, index):
+    kind = index % 10
+    if kind < 2:
+        response = client.post('/api/comments', json={'report_id': 1, 'contenido': f'Comentario {index}'}, headers=headers)
+    elif kind < 5:
+        response = client.post('/api/comments/1/like', headers=headers)
+    else:
+        response = client.post('/api/reactions', json={'report_id': 1, 'tipo': REACTIONS[index % 3]}, headers=headers)
+    if response.status_code >= 400:
+        raise RuntimeError(response.get_json().get('message'))
+
+
+@click.command()
+@click.option('--writers', default=16, show_default=True, help='Concurrent writers.')
+@click.option('--writes', default=50, show_default=True, help='Writes per writer.')
+@click.option('--readers', default=4, show_default=True, help='Concurrent comment readers.')
+@click.option('--profile', 'profiles', type=click.Choice(sorted(PROFILES)), multiple=True,
+              help='Profiles to run (default: all).')
+def main(writers, writes, readers, profiles):
+    """Measure write throughput and lock errors per SQLite profile."""
+    for profile in profiles or sorted(PROFILES, reverse=True):
+        with bench_app(**PROFILES[profile]) as app:
+            identities = iter(writer_headers(app, writers))
+            lock = threading.Lock()
+            local = threading.local()
+            stop = threading.Event()
+            read_latencies, read_errors = [], []
+
+            def writer():
+                """This thread's client and user"""
+                if not hasattr(local, 'client'):
+                    with lock:
+                        local.headers = next(identities)
+                    local.client = app.test_client()
+                return local.client, local.headers
+
+            def read_loop():
+                client = app.test_client()
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    status = client.get('/api/comments?report_id=1&limit=50').status_code
+                    with lock:
+                        if status == 200:
+                            read_latencies.append(time.perf_counter() - started)
+                        else:
+                            read_errors.append(status)
+
+            reader_threads = [threading.Thread(target=read_loop) for _ in range(readers)]
+            for thread in reader_threads:
+                thread.start()
+
+            latencies, errors, elapsed = run_concurrently(
+                lambda index: write(*writer(), index), writers * writes, writers
+            )
+
+            stop.set()
+            for thread in reader_threads:
+                thread.join()
+
+            report(f'{profile}: writes', latencies, errors, elapsed)
+            report(f'{profile}: reads', read_latencies, read_errors)
+            messages = {}
+            for error in errors:
+                messages[str(error)] = messages.get(str(error), 0) + 1
+            for message, count in sorted(messages.items(), key=lambda item: -item[1]):
+                print(f"{'':<32} {count} x {message}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Idle Server-Sent Events streams: ``python -m benchmarks.sse_connections [--streams N]``
+
+Starts ``python -m src.serve`` with one gevent worker, opens N streams on
+report 1 and leaves them idle, then measures:
+
+- how long opening the streams took and the server's resident memory
+- the latency of regular requests while the streams stay open
+- how long one comment takes to reach every stream
+"""
+import selectors
+import socket
+import time
+import click
+import requests
+from benchmarks._common import (
+    login, process_tree_rss, report, run_concurrently, running_server, temp_database, thread_session
+)
+
+
+def open_stream(host, port, report_id):
+    sock = socket.create_connection((host, port))
+    sock.sendall(
+        f'GET /api/reports/{report_id}/events HTTP/1.1\r\nHost: {host}\r\n'
+        'Accept: text/event-stream\r\n\r\n'.encode()
+    )
+    return sock
+
+
+def read_until(sockets, marker, timeout):
+    """Read every socket until each one received ``marker``, returns how many did"""
+    selector = selectors.DefaultSelector()
+    buffers = {}
+    for sock in sockets:
+        sock.setblocking(False)
+        selector.register(sock, selectors.EVENT_READ)
+        buffers[sock] = b''
+
+    done = 0
+    deadline = time.monotonic() + timeout
+    while done < len(sockets) and time.monotonic() < deadline:
+        for key, _ in selector.select(timeout=0.5):
+            sock = key.fileobj
+            data = sock.recv(65536)
+            buffers[sock] += data
+            if not data or marker in buffers[sock]:
+                selector.unregister(sock)
+                done += bool(data)
+                buffers[sock] = b''
+    selector.close()
+    for sock in sockets:
+        sock.setblocking(True)
+    return done
+
+
+@click.command()
+@click.option('--streams', default=2000, show_default=True, help='Idle streams to open.')
+@click.option('--requests', 'total', default=500, show_default=True, help='Regular requests while the streams are open.')
+@click.option('--concurrency', default=8, show_default=True, help='Concurrent regular clients.')
+def main(streams, total, concurrency):
+    """Measure the cost of many idle SSE streams on a gevent worker."""
+    serve_args = ['--worker-class', 'gevent', '--workers', '1', '--worker-connections', str(streams + concurrency + 100)]
+    env = {'SSE_MAX_SUBSCRIBERS': str(streams + 100), 'SSE_HEARTBEAT_SECONDS': '60'}
+
+    with temp_database() as database_url, running_server(database_url, *serve_args, env=env) as server:
+        base_url = server.base_url
+        host, port = base_url.rsplit('/', 1)[1].split(':')
+        headers = login(base_url)
+        rss_before = process_tree_rss(server.pid)
+
+        started = time.perf_counter()
+        sockets = [open_stream(host, int(port), 1) for _ in range(streams)]
+        connected = read_until(sockets, b'retry:', timeout=60)
+        opened = time.perf_counter() - started
+        rss_after = process_tree_rss(server.pid)
+
+        print(f'{connected}/{streams} streams open in {opened:.2f}s')
+        if rss_before is not None:
+            print(f'server memory {rss_before:.0f} MiB -> {rss_after:.0f} MiB '
+                  f'({(rss_after - rss_before) * 1024 / max(connected, 1):.1f} KiB per stream)')
+
+        report('GET /api/reactions (idle SSE)', *run_concurrently(
+            lambda _: thread_session().get(f'{base_url}/api/reactions?report_id=1', timeout=30).raise_for_status(),
+            total, concurrency
+        ))
+
+        started = time.perf_counter()
+        requests.post(
+            f'{base_url}/api/comments', json={'report_id': 1, 'contenido': 'Evento de prueba'},
+            headers=headers, timeout=30
+        ).raise_for_status()
+        delivered = read_until(sockets, b'comment_created', timeout=60)
+        print(f'comment delivered to {delivered}/{connected} streams in {time.perf_counter() - started:.2f}s')
+
+        for sock in sockets:
+            sock.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Cold start: ``python -m benchmarks.startup_time [--runs N]``
+
+Each run starts a fresh interpreter and times, in order:
+
+- import: ``import src.main``
+- create_app: building the app with the factory (no database work)
+- first request: GET /api/comments, which opens the first connection
+- total: start of the import to the first response
+
+With ``--legacy`` the app comes from the ``src.main:app`` shim instead,
+which also creates tables and seed data. ``--importtime`` prints the
+slowest imports of one run (``python -X importtime``).
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import click
+from benchmarks._common import PROJECT_ROOT, temp_database
+
+PROBE = r'''
+import json, sys, time
+started = time.perf_counter()
+import src.main
+imported = time.perf_counter()
+app = src.main.app if sys.argv[1] == 'legacy' else src.main.create_app()
+created = time.perf_counter()
+response = app.test_client().get('/api/comments?report_id=1')
+assert response.status_code == 200, response.status_code
+answered = time.perf_counter()
+print(json.dumps({
+    'import': imported - started,
+    'create_app': created - imported,
+    'first request': answered - created,
+    'total': answered - started
+}))
+'''
+
+
+def run_probe(database_url, mode, extra_args=()):
+    env = dict(os.environ, DATABASE_URL=database_url, POWERBI_CATALOG_SYNC_INTERVAL='0')
+    return subprocess.run(
+        [sys.executable, *extra_args, '-c', PROBE, mode],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+
+
+def slowest_imports(stderr, count):
+    """Parse ``-X importtime`` output, returns (cumulative microseconds, module) for the slowest"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        rows.append((int(cumulative), module.rstrip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+@click.command()
+@click.option('--runs', default=10, show_default=True, help='Fresh interpreters to start.')
+@click.option('--legacy', is_flag=True, help='Load the app through the src.main:app shim.')
+@click.option('--importtime', 'import_count', default=0, help='Also list the N slowest imports.')
+def main(runs, legacy, import_count):
+    """Measure import-to-first-request time in fresh interpreters."""
+    mode = 'legacy' if legacy else 'factory'
+    with temp_database() as database_url:
+        samples = [json.loads(run_probe(database_url, mode).stdout.splitlines()[-1]) for _ in range(runs)]
+
+        for phase in samples[0]:
+            values = [sample[phase] * 1000 for sample in samples]
+            print(f'{phase:<16} median={statistics.median(values):8.1f}ms  min={min(values):8.1f}ms  max={max(values):8.1f}ms')
+
+        if import_count:
+            print()
+            for cumulative, module in slowest_imports(run_probe(database_url, mode, ['-X', 'importtime']).stderr, import_count):
+                print(f'{cumulative / 1000:8.1f}ms  {module}')
+
+
+if __name__ == '__main__':
+    main()
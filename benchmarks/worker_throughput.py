@@ -0,0 +1,52 @@
+"""Throughput by worker class: ``python -m benchmarks.worker_throughput [--workers N] [--concurrency C]``
+
+Serves a seeded SQLite database with ``python -m src.serve`` once per
+worker class and sends the same authenticated read mix to each: comment
+listing, reaction stats and the user's profile. The client runs in this
+process, so keep ``--concurrency`` within what one Python process can
+drive, or run several copies.
+"""
+import importlib.util
+import click
+from benchmarks._common import login, report, run_concurrently, running_server, temp_database, thread_session
+
+PATHS = (
+    '/api/comments?report_id=1',
+    '/api/reactions?report_id=1',
+    '/api/auth/me'
+)
+
+
+@click.command()
+@click.option('--worker-class', 'worker_classes', type=click.Choice(['sync', 'gthread', 'gevent']), multiple=True,
+              help='Worker classes to compare (default: all available).')
+@click.option('--workers', default=2, show_default=True, help='Worker processes.')
+@click.option('--threads', default=4, show_default=True, help='Threads per gthread worker.')
+@click.option('--requests', 'total', default=2000, show_default=True, help='Requests per worker class.')
+@click.option('--concurrency', default=16, show_default=True, help='Concurrent clients.')
+def main(worker_classes, workers, threads, total, concurrency):
+    """Compare request throughput of the sync, gthread and gevent workers."""
+    if not worker_classes:
+        worker_classes = ['sync', 'gthread']
+        if importlib.util.find_spec('gevent'):
+            worker_classes.append('gevent')
+
+    with temp_database() as database_url:
+        for worker_class in worker_classes:
+            serve_args = ['--worker-class', worker_class, '--workers', str(workers), '--threads', str(threads)]
+            with running_server(database_url, *serve_args) as server:
+                headers = login(server.base_url)
+
+                def get(index):
+                    response = thread_session().get(
+                        server.base_url + PATHS[index % len(PATHS)], headers=headers, timeout=30
+                    )
+                    response.raise_for_status()
+
+                # Warm up every worker's connections and caches
+                run_concurrently(get, concurrency * len(PATHS), concurrency)
+                report(f'{worker_class} ({workers} workers)', *run_concurrently(get, total, concurrency))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+import time
+import click
+from src.models.user import db
+from src.models.reaction import ReactionCounter
+from src.models.change_log import ChangeLogEntry
+from src.services.catalog_sync import CatalogSyncService
+
+
+def register_commands(app):
+    """Register the application's Flask CLI commands"""
+
+    @app.cli.command('init-db')
+    def init_db():
+        """Create missing tables and apply migrations (run once per deploy)."""
+        from src.database.seed import init_database
+
+        init_database()
+        click.echo("Database schema is up to date")
+
+    @app.cli.command('seed-db')
+    def seed_db():
+        """Create the default users, report and sample data if missing."""
+        from src.database.seed import seed_database
+
+        seed_database()
+
+    @app.cli.command('sync-reports')
+    @click.option('--workspace', 'workspaces', multiple=True, help='Workspace to sync (repeatable).')
+    @click.option('--interval', type=int, default=0, help='Keep running, syncing every this many seconds.')
+    def sync_reports(workspaces, interval):
+        """Sync Power BI reports into the reports table.
+
+        With --interval this is the catalog sync process of a multi-worker
+        deployment: run exactly one, so workers never race on the same reports.
+        """
+        while True:
+            try:
+                run = CatalogSyncService.sync(list(workspaces) or None)
+                click.echo(
+                    f"{run.status}: {run.inserted} inserted, {run.updated} updated, "
+                    f"{run.deactivated} deactivated, {run.unchanged} unchanged in {run.duration_ms}ms"
+                )
+                if run.error:
+                    click.echo(run.error, err=True)
+            except Exception as e:
+                if not interval:
+                    raise
+                click.echo(f"Error syncing report catalog: {str(e)}", err=True)
+            finally:
+                db.session.remove()
+
+            if not interval:
+                break
+            time.sleep(interval)
+
+    @app.cli.command('reconcile-reactions')
+    @click.option('--report', 'report_id', type=int, help='Only reconcile this report.')
+    def reconcile_reactions(report_id):
+        """Rebuild reaction counters from the reactions table and report drift."""
+        drift = ReactionCounter.reconcile(report_id)
+        db.session.commit()
+        for row in drift:
+            click.echo(
+                f"report {row['report_id']} {row['tipo']}: counter {row['actual']} -> {row['expected']}"
+            )
+        click.echo(f"{len(drift)} counter(s) corrected")
+
+    @app.cli.command('prune-changes')
+    @click.option('--days', default=90, show_default=True, help='Delete changes older than this many days.')
+    def prune_changes(days):
+        """Delete old entries from the change log."""
+        deleted = ChangeLogEntry.prune(days)
+        db.session.commit()
+        click.echo(f"{deleted} change(s) deleted")
@@ -13,15 +13,132 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or f'sqlite:///{db_path}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Read replicas (comma-separated URLs) for GET requests, and seconds a client reads from the primary after writing
+    SQLALCHEMY_REPLICA_URIS = [url for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url]
+    REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 10))
+    
+    # Engine profile: 'sqlite', 'server' (SQL Server, PostgreSQL...) or 'auto' to pick it from the URI
+    DB_ENGINE_PROFILE = os.environ.get('DB_ENGINE_PROFILE', 'auto')
+    
+    # SQLite profile: pragmas applied to every connection
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 268435456))
+    SQLITE_CACHE_SIZE = int(os.environ.get('SQLITE_CACHE_SIZE', -65536))
+    
+    # Server profile: connection pool per process
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    
     # JWT config
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-string'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(seconds=int(os.environ.get('JWT_ACCESS_TOKEN_EXPIRES', 3600)))
     
+    # Authenticated user cache: entries and seconds before a user is reloaded from the database
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 1024))
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 30))
+    
+    # Comment/reaction response cache: entries and seconds an entry may be served for its version
+    RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 2048))
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 300))
+    
+    # SSE report events: events buffered per client before it is resynced, connection limit, keepalive seconds.
+    # Each stream holds a thread under sync/gthread workers, so python -m src.serve caps the limit at
+    # threads - 1 per worker there; thousands of streams need the gevent worker class
+    SSE_SUBSCRIBER_BUFFER = int(os.environ.get('SSE_SUBSCRIBER_BUFFER', 100))
+    SSE_MAX_SUBSCRIBERS = int(os.environ.get('SSE_MAX_SUBSCRIBERS', 5000))
+    SSE_HEARTBEAT_SECONDS = int(os.environ.get('SSE_HEARTBEAT_SECONDS', 15))
+    
+    # Report bootstrap: threads requesting embed tokens and seconds to wait for one
+    BOOTSTRAP_EMBED_WORKERS = int(os.environ.get('BOOTSTRAP_EMBED_WORKERS', 16))
+    BOOTSTRAP_EMBED_TIMEOUT = int(os.environ.get('BOOTSTRAP_EMBED_TIMEOUT', 10))
+    
+    # Seconds between incremental reloads of revoked token versions. The process that revokes a
+    # user's tokens applies it at once; other workers accept the revoked tokens for up to this long
+    TOKEN_VERSION_REFRESH_SECONDS = int(os.environ.get('TOKEN_VERSION_REFRESH_SECONDS', 5))
+    
+    # Password hashing: werkzeug method (changing it upgrades hashes on next login), pool size and queue limit
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_QUEUE = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', 32))
+    PASSWORD_HASH_TIMEOUT = int(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
+    
+    # Login throttling: attempts allowed per username and per IP within the window (seconds)
+    LOGIN_MAX_ATTEMPTS_PER_USERNAME = int(os.environ.get('LOGIN_MAX_ATTEMPTS_PER_USERNAME', 10))
+    LOGIN_MAX_ATTEMPTS_PER_IP = int(os.environ.get('LOGIN_MAX_ATTEMPTS_PER_IP', 50))
+    LOGIN_THROTTLE_WINDOW = int(os.environ.get('LOGIN_THROTTLE_WINDOW', 60))
+    
     # Power BI config
     POWERBI_CLIENT_ID = os.environ.get('POWERBI_CLIENT_ID')
     POWERBI_CLIENT_SECRET = os.environ.get('POWERBI_CLIENT_SECRET')
     POWERBI_TENANT_ID = os.environ.get('POWERBI_TENANT_ID')
     POWERBI_WORKSPACE_ID = os.environ.get('POWERBI_WORKSPACE_ID')
+    POWERBI_API_URL = os.environ.get('POWERBI_API_URL', 'https://api.powerbi.com')
+    POWERBI_AUTHORITY_URL = os.environ.get('POWERBI_AUTHORITY_URL', 'https://login.microsoftonline.com')
+    
+    # HTTP client: timeouts in seconds, retries on 429/5xx and keep-alive pool size
+    POWERBI_HTTP_CONNECT_TIMEOUT = float(os.environ.get('POWERBI_HTTP_CONNECT_TIMEOUT', 3.05))
+    POWERBI_HTTP_READ_TIMEOUT = float(os.environ.get('POWERBI_HTTP_READ_TIMEOUT', 15))
+    POWERBI_HTTP_MAX_RETRIES = int(os.environ.get('POWERBI_HTTP_MAX_RETRIES', 3))
+    POWERBI_HTTP_BACKOFF_FACTOR = float(os.environ.get('POWERBI_HTTP_BACKOFF_FACTOR', 0.5))
+    POWERBI_HTTP_POOL_SIZE = int(os.environ.get('POWERBI_HTTP_POOL_SIZE', 20))
+    
+    # Circuit breaker: consecutive failures before opening and seconds before a trial call
+    POWERBI_BREAKER_FAILURE_THRESHOLD = int(os.environ.get('POWERBI_BREAKER_FAILURE_THRESHOLD', 5))
+    POWERBI_BREAKER_RECOVERY_TIMEOUT = int(os.environ.get('POWERBI_BREAKER_RECOVERY_TIMEOUT', 30))
+    
+    # Seconds before expiry at which a cached Azure AD token is refreshed
+    POWERBI_TOKEN_REFRESH_MARGIN = int(os.environ.get('POWERBI_TOKEN_REFRESH_MARGIN', 300))
+    
+    # Embed token cache: size bound, reuse margin before expiration and background refresh window
+    POWERBI_EMBED_CACHE_SIZE = int(os.environ.get('POWERBI_EMBED_CACHE_SIZE', 256))
+    POWERBI_EMBED_TOKEN_MARGIN = int(os.environ.get('POWERBI_EMBED_TOKEN_MARGIN', 300))
+    POWERBI_EMBED_REFRESH_AHEAD = int(os.environ.get('POWERBI_EMBED_REFRESH_AHEAD', 600))
+    
+    # Report catalog sync: workspaces to pull (defaults to POWERBI_WORKSPACE_ID), seconds between runs (0 disables).
+    # python -m src.serve runs it in one process next to the workers; the app only syncs in its own
+    # process when POWERBI_CATALOG_SYNC_IN_PROCESS is set (the development server does), since every
+    # worker of a multi-worker server would run it
+    POWERBI_CATALOG_WORKSPACES = [w for w in os.environ.get('POWERBI_CATALOG_WORKSPACES', '').split(',') if w]
+    POWERBI_CATALOG_SYNC_INTERVAL = int(os.environ.get('POWERBI_CATALOG_SYNC_INTERVAL', 900))
+    POWERBI_CATALOG_SYNC_IN_PROCESS = os.environ.get('POWERBI_CATALOG_SYNC_IN_PROCESS', 'false').lower() == 'true'
+    
+    # Row-level security: embed tokens carry the user's identity and role
+    POWERBI_RLS_ENABLED = os.environ.get('POWERBI_RLS_ENABLED', 'false').lower() == 'true'
+    POWERBI_RLS_ADMIN_ROLE = os.environ.get('POWERBI_RLS_ADMIN_ROLE', 'Admin')
+    POWERBI_RLS_USER_ROLE = os.environ.get('POWERBI_RLS_USER_ROLE', 'User')
+    
+    # Write-behind buffer for like/reaction toggles: flush every N ms or M events, bounded queue.
+    # The buffer lives in the serving process, so buffered toggles are only read back by that
+    # process: python -m src.serve runs a single worker while it is enabled
+    WRITE_BEHIND_ENABLED = os.environ.get('WRITE_BEHIND_ENABLED', 'false').lower() == 'true'
+    WRITE_BEHIND_FLUSH_MS = int(os.environ.get('WRITE_BEHIND_FLUSH_MS', 200))
+    WRITE_BEHIND_FLUSH_EVENTS = int(os.environ.get('WRITE_BEHIND_FLUSH_EVENTS', 500))
+    WRITE_BEHIND_MAX_PENDING = int(os.environ.get('WRITE_BEHIND_MAX_PENDING', 10000))
+    
+    # Production server (python -m src.serve): worker model is sync, gthread or gevent
+    SERVER_BIND = os.environ.get('SERVER_BIND', '0.0.0.0:5000')
+    SERVER_WORKER_CLASS = os.environ.get('SERVER_WORKER_CLASS', 'gthread')
+    SERVER_WORKERS = int(os.environ.get('SERVER_WORKERS', 1 if WRITE_BEHIND_ENABLED else (os.cpu_count() or 1) * 2 + 1))
+    SERVER_THREADS = int(os.environ.get('SERVER_THREADS', 4))
+    SERVER_WORKER_CONNECTIONS = int(os.environ.get('SERVER_WORKER_CONNECTIONS', 1000))
+    SERVER_TIMEOUT = int(os.environ.get('SERVER_TIMEOUT', 30))
+    SERVER_GRACEFUL_TIMEOUT = int(os.environ.get('SERVER_GRACEFUL_TIMEOUT', 30))
+    SERVER_KEEPALIVE = int(os.environ.get('SERVER_KEEPALIVE', 5))
+    SERVER_MAX_REQUESTS = int(os.environ.get('SERVER_MAX_REQUESTS', 0))
+    SERVER_MAX_REQUESTS_JITTER = int(os.environ.get('SERVER_MAX_REQUESTS_JITTER', 0))
+    SERVER_PRELOAD = os.environ.get('SERVER_PRELOAD', 'true').lower() == 'true'
+    SERVER_ACCESS_LOG = os.environ.get('SERVER_ACCESS_LOG', '')
+    
+    # Frontend assets: in-memory manifest of the static folder, rescanned on change when STATIC_AUTO_RELOAD
+    # (defaults to FLASK_DEBUG); names matching STATIC_HASHED_PATTERN are cached as immutable
+    STATIC_AUTO_RELOAD = os.environ.get('STATIC_AUTO_RELOAD', os.environ.get('FLASK_DEBUG', 'false')).lower() in ('true', '1')
+    STATIC_HASHED_PATTERN = os.environ.get('STATIC_HASHED_PATTERN', r'[.-](?=[0-9A-Za-z_]*[0-9])[0-9A-Za-z_]{8,}\.[0-9A-Za-z]+$')
+    STATIC_MAX_AGE = int(os.environ.get('STATIC_MAX_AGE', 3600))
     
     # CORS config
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:3000').split(',')
@@ -0,0 +1,62 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+
+def get_engine_profile(config, uri=None):
+    """Get the engine profile ('sqlite' or 'server') for a database URI"""
+    profile = config.get('DB_ENGINE_PROFILE', 'auto')
+    if profile != 'auto':
+        return profile
+    uri = uri or config['SQLALCHEMY_DATABASE_URI']
+    return 'sqlite' if make_url(uri).get_backend_name() == 'sqlite' else 'server'
+
+
+def build_engine_options(config, uri=None):
+    """Build SQLALCHEMY_ENGINE_OPTIONS for the configured profile"""
+    uri = uri or config['SQLALCHEMY_DATABASE_URI']
+
+    if get_engine_profile(config, uri) == 'sqlite':
+        # The sqlite3 module waits on locks itself; busy_timeout is also set as a pragma
+        return {
+            'connect_args': {'timeout': config.get('SQLITE_BUSY_TIMEOUT_MS', 5000) / 1000}
+        }
+
+    options = {
+        'pool_size': config.get('DB_POOL_SIZE', 10),
+        'max_overflow': config.get('DB_MAX_OVERFLOW', 20),
+        'pool_timeout': config.get('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': config.get('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': config.get('DB_POOL_PRE_PING', True)
+    }
+    if make_url(uri).drivername == 'mssql+pyodbc':
+        # Send executemany() parameters in one round trip instead of one per row
+        options['fast_executemany'] = True
+    return options
+
+
+def sqlite_pragmas(config):
+    """Get the pragmas applied to every new SQLite connection, in order"""
+    return [
+        ('journal_mode', config.get('SQLITE_JOURNAL_MODE', 'WAL')),
+        ('synchronous', config.get('SQLITE_SYNCHRONOUS', 'NORMAL')),
+        ('busy_timeout', config.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        ('mmap_size', config.get('SQLITE_MMAP_SIZE', 268435456)),
+        ('cache_size', config.get('SQLITE_CACHE_SIZE', -65536))
+    ]
+
+
+def configure_engine(engine, config):
+    """Apply per-connection settings to an engine created by Flask-SQLAlchemy"""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    pragmas = sqlite_pragmas(config)
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
@@ -0,0 +1,71 @@
+from sqlalchemy import inspect, text
+from src.models.user import db
+from src.models.reaction import Reaction, ReactionCounter
+from src.models.change_log import ChangeLogEntry
+
+# Columns added to existing tables after their first release: (table, column, DDL type).
+# db.create_all() only creates missing tables, so these are added in place.
+ADDED_COLUMNS = [
+    ('reports', 'embed_url', 'VARCHAR(500)'),
+    ('reports', 'dataset_id', 'VARCHAR(100)'),
+]
+
+# Models whose SQLite tables must use AUTOINCREMENT so ids are never reused.
+# SQLite cannot add it in place, so older tables are rebuilt.
+AUTOINCREMENT_MODELS = [
+    ChangeLogEntry,
+]
+
+
+def run_migrations():
+    """Bring an existing database up to date with the models.
+
+    Adds missing columns and model-declared indexes and backfills derived
+    tables. Safe to run on every start: each step
+    checks the live schema first, so databases created by older versions
+    (e.g. instance/app.db) are upgraded in place and new ones are left
+    untouched.
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+
+    with db.engine.begin() as connection:
+        for table, column, ddl_type in ADDED_COLUMNS:
+            if table not in existing_tables:
+                continue
+            columns = {col['name'] for col in inspector.get_columns(table)}
+            if column not in columns:
+                connection.execute(text(f'ALTER TABLE {table} ADD {column} {ddl_type}'))
+
+        if db.engine.dialect.name == 'sqlite':
+            for model in AUTOINCREMENT_MODELS:
+                if model.__tablename__ in existing_tables:
+                    _add_sqlite_autoincrement(connection, model.__table__)
+
+        # Indexes declared on the models but missing from older databases
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+    # Derived tables introduced after their source data already existed
+    if ReactionCounter.query.first() is None and Reaction.query.first() is not None:
+        ReactionCounter.reconcile()
+        db.session.commit()
+
+
+def _add_sqlite_autoincrement(connection, table):
+    """Rebuild a SQLite table without AUTOINCREMENT, keeping its rows and highest id"""
+    sql = connection.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {'name': table.name}
+    ).scalar()
+    if not sql or 'AUTOINCREMENT' in sql.upper():
+        return
+
+    columns = ', '.join(column.name for column in table.columns)
+    old_name = f'{table.name}_old'
+    connection.execute(text(f'ALTER TABLE {table.name} RENAME TO {old_name}'))
+    table.create(connection)
+    # Explicit ids also move sqlite_sequence to the highest one
+    connection.execute(text(f'INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {old_name}'))
+    connection.execute(text(f'DROP TABLE {old_name}'))
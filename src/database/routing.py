@@ -0,0 +1,98 @@
+import random
+import time
+from contextlib import contextmanager
+import sqlalchemy as sa
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+
+# Bind keys of read replicas are REPLICA_BIND_PREFIX + index
+REPLICA_BIND_PREFIX = 'replica_'
+
+# Cookie telling later requests from the same client to read from the primary
+PRIMARY_COOKIE = 'db_primary_until'
+
+
+class RoutingSession(Session):
+    """Session that sends reads of read-only requests to a replica.
+
+    A request marked read-only by ``choose_replica`` reads from its replica
+    until the session writes anything (a flush or an UPDATE/DELETE/INSERT
+    statement); from then on every statement goes to the primary, so the
+    request reads its own writes. Outside read-only requests, and for models
+    with their own bind key, it behaves like the Flask-SQLAlchemy session.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if self._flushing or (clause is not None and not getattr(clause, 'is_select', False)):
+            self.info['wrote'] = True
+
+        replica = g.get('db_replica') if has_request_context() else None
+        if replica is not None and bind is None and not self.info.get('wrote') \
+                and not self.info.get('force_primary') and self._has_default_bind(mapper):
+            return self._db.engines[replica]
+
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    @staticmethod
+    def _has_default_bind(mapper):
+        if mapper is None:
+            return True
+        return sa.inspect(mapper).local_table.metadata.info.get('bind_key') is None
+
+
+def replica_bind_keys(app):
+    """Get the bind keys of the configured read replicas"""
+    return [key for key in (app.config.get('SQLALCHEMY_BINDS') or {}) if key and key.startswith(REPLICA_BIND_PREFIX)]
+
+
+def choose_replica():
+    """Before each request: route GET/HEAD reads to a replica unless the client must read its writes"""
+    if request.method not in ('GET', 'HEAD'):
+        return
+
+    replicas = current_app.extensions.get('db_replicas')
+    if not replicas:
+        return
+
+    try:
+        primary_until = float(request.cookies.get(PRIMARY_COOKIE, 0))
+    except ValueError:
+        primary_until = 0
+    if primary_until > time.time():
+        return
+
+    g.db_replica = random.choice(replicas)
+
+
+def mark_writes(response):
+    """After each request: if the session wrote, keep this client reading from the primary for a while
+    
+    Replicas lag behind the primary; the cookie covers the client's next
+    requests, which may go to another process.
+    """
+    if not current_app.extensions.get('db_replicas'):
+        return response
+
+    from src.models.user import db
+
+    if db.session.info.get('wrote'):
+        sticky_seconds = current_app.config.get('REPLICA_STICKY_SECONDS', 10)
+        response.set_cookie(
+            PRIMARY_COOKIE,
+            str(int(time.time() + sticky_seconds)),
+            max_age=sticky_seconds,
+            httponly=True,
+            samesite='Lax'
+        )
+    return response
+
+
+@contextmanager
+def primary_reads(session):
+    """Read from the primary inside the block, e.g. for security-sensitive lookups"""
+    previous = session.info.get('force_primary')
+    session.info['force_primary'] = True
+    try:
+        yield
+    finally:
+        session.info['force_primary'] = previous
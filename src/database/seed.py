@@ -0,0 +1,96 @@
+# Importing the models registers every table with db.metadata for create_all
+from src.models.user import db, User
+from src.models.report import Report
+from src.models.comment import Comment
+from src.models.reaction import Reaction, ReactionCounter
+from src.database.migrations import run_migrations
+
+def init_database():
+    """Create missing tables and bring existing ones up to date"""
+    # Primary only: read replicas get their schema through replication
+    db.create_all(bind_key=None)
+    run_migrations()
+
+def seed_database():
+    """Seed database with initial data"""
+    try:
+        # Create admin user if not exists
+        admin_user = User.query.filter_by(username='admin').first()
+        if not admin_user:
+            admin_user = User(
+                username='admin',
+                is_admin=True,
+                email='admin@example.com'
+            )
+            admin_user.set_password('admin123')
+            db.session.add(admin_user)
+        
+        # Create regular user if not exists
+        regular_user = User.query.filter_by(username='user').first()
+        if not regular_user:
+            regular_user = User(
+                username='user',
+                is_admin=False,
+                email='user@example.com'
+            )
+            regular_user.set_password('user123')
+            db.session.add(regular_user)
+        
+        # Create default report if not exists
+        default_report = Report.query.filter_by(powerbi_report_id='default-report').first()
+        if not default_report:
+            default_report = Report(
+                name='Dashboard Principal',
+                description='Dashboard principal de la aplicación',
+                powerbi_report_id='default-report',
+                powerbi_workspace_id='default-workspace'
+            )
+            db.session.add(default_report)
+        
+        db.session.commit()
+        
+        # Add sample comments if none exist
+        if Comment.query.count() == 0:
+            sample_comments = [
+                Comment(
+                    user_id=regular_user.id if regular_user else 2,
+                    report_id=default_report.id if default_report else 1,
+                    content='Excelente análisis de ventas. Los datos del Q4 muestran una tendencia muy positiva.',
+                    likes=5
+                ),
+                Comment(
+                    user_id=admin_user.id if admin_user else 1,
+                    report_id=default_report.id if default_report else 1,
+                    content='Gracias por el feedback. Hemos actualizado el dashboard con métricas adicionales.',
+                    likes=3
+                )
+            ]
+            
+            for comment in sample_comments:
+                db.session.add(comment)
+        
+        # Add sample reactions if none exist
+        if Reaction.query.count() == 0:
+            sample_reactions = [
+                Reaction(
+                    user_id=regular_user.id if regular_user else 2,
+                    report_id=default_report.id if default_report else 1,
+                    reaction_type='me_interesa'
+                ),
+                Reaction(
+                    user_id=admin_user.id if admin_user else 1,
+                    report_id=default_report.id if default_report else 1,
+                    reaction_type='aporta'
+                )
+            ]
+            
+            for reaction in sample_reactions:
+                db.session.add(reaction)
+                ReactionCounter.increment(reaction.report_id, reaction.reaction_type, 1)
+        
+        db.session.commit()
+        print("Database seeded successfully!")
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error seeding database: {str(e)}")
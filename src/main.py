@@ -1,40 +1,122 @@
 import os
 import sys
+import threading
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from dotenv import load_dotenv
 load_dotenv()
 
-from flask import Flask, send_from_directory
+from flask import Flask
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
-from src.models.user import db, User
-from src.models.report import Report
-from src.models.comment import Comment, CommentLike
-from src.models.reaction import Reaction
+from src.models.user import db
+from src.services.powerbi_service import PowerBIService
+from src.services.catalog_sync import CatalogSyncWorker
+from src.services.write_behind import WriteBehindBuffer
+from src.services.user_cache import UserCache, load_user
+from src.services.token_revocation import TokenVersionCache, TokenUser, get_token_versions
+from src.services.password_hasher import PasswordHasher, LoginThrottle
+from src.services.response_cache import ResponseCache
+from src.services.event_bus import EventBus
+from src.services.static_manifest import StaticManifest, send_static_asset
+from src.database.engine import build_engine_options, configure_engine
+from src.database.routing import REPLICA_BIND_PREFIX, replica_bind_keys, choose_replica, mark_writes
+from src.config import Config
+from src.commands import register_commands
 
 # Import blueprints
 from src.routes.auth import auth_bp
 from src.routes.powerbi import powerbi_bp
 from src.routes.comments import comments_bp
 from src.routes.reactions import reactions_bp
-from src.routes.user import user_bp 
-def create_app():
+from src.routes.user import user_bp
+from src.routes.reports import reports_bp
+from src.routes.changes import changes_bp
+
+def create_app(config_class=Config):
+    """Build the application without touching the database
+    
+    Calling the factory has no side effects: tables and seed data are
+    created with ``flask init-db`` and ``flask seed-db``, and background
+    threads start with the first request.
+    """
     app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
     
-    # Basic configuration
-    app.config['SECRET_KEY'] = 'your-super-secret-jwt-key-change-in-production'
-    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///./app.db')
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['JWT_SECRET_KEY'] = 'jwt-secret-string'
+    # Configuration from src/config.py (environment variables with defaults)
+    app.config.from_object(config_class)
+    
+    # Engine profile: SQLite pragmas or a tuned connection pool for server databases
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', build_engine_options(app.config))
+    
+    # Read replicas are extra binds; GET/HEAD requests read from one of them
+    replica_uris = app.config.get('SQLALCHEMY_REPLICA_URIS') or []
+    if replica_uris:
+        binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+        for index, uri in enumerate(replica_uris):
+            binds[f'{REPLICA_BIND_PREFIX}{index}'] = {'url': uri, **build_engine_options(app.config, uri)}
+        app.config['SQLALCHEMY_BINDS'] = binds
     
     # Initialize extensions
     db.init_app(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            configure_engine(engine, app.config)
+    
+    app.extensions['db_replicas'] = replica_bind_keys(app)
+    if app.extensions['db_replicas']:
+        app.before_request(choose_replica)
+        app.after_request(mark_writes)
     jwt = JWTManager(app)
     
+    # Authenticated users are loaded through a short-TTL cache shared across requests
+    app.extensions['user_cache'] = UserCache(
+        max_entries=app.config.get('USER_CACHE_SIZE', 1024),
+        ttl=app.config.get('USER_CACHE_TTL', 30)
+    )
+    
+    # Serialized comment/reaction responses, keyed by report version
+    app.extensions['response_cache'] = ResponseCache(
+        max_entries=app.config.get('RESPONSE_CACHE_SIZE', 2048),
+        ttl=app.config.get('RESPONSE_CACHE_TTL', 300)
+    )
+    
+    # Live report events for SSE clients
+    app.extensions['event_bus'] = EventBus(
+        subscriber_buffer=app.config.get('SSE_SUBSCRIBER_BUFFER', 100),
+        max_subscribers=app.config.get('SSE_MAX_SUBSCRIBERS', 5000)
+    )
+    
+    # Token versions: deactivating or demoting a user revokes the tokens issued before
+    app.extensions['token_versions'] = TokenVersionCache(
+        refresh_interval=app.config.get('TOKEN_VERSION_REFRESH_SECONDS', 5)
+    )
+    
+    @jwt.user_lookup_loader
+    def user_lookup_callback(_jwt_header, jwt_data):
+        # Tokens carrying authorization claims need no database access
+        if 'is_active' in jwt_data:
+            return TokenUser(int(jwt_data['sub']), jwt_data)
+        return load_user(jwt_data['sub'])
+    
+    @jwt.token_in_blocklist_loader
+    def token_revoked_callback(_jwt_header, jwt_data):
+        try:
+            user_id = int(jwt_data['sub'])
+        except (TypeError, ValueError):
+            return True
+        return get_token_versions().is_revoked(user_id, jwt_data.get('ver', 0))
+    
+    @jwt.revoked_token_loader
+    def revoked_token_callback(_jwt_header, jwt_data):
+        return {'message': 'Token revocado'}, 401
+    
+    @jwt.user_lookup_error_loader
+    def user_lookup_error_callback(_jwt_header, jwt_data):
+        return {'message': 'Usuario no válido'}, 401
+    
     # Configure CORS
-    CORS(app, origins=['http://localhost:3000', 'https://your-frontend-domain.com'])
+    CORS(app, origins=['http://localhost:3000', 'https://your-frontend-domain.com'], expose_headers=['X-Next-Cursor', 'ETag'])
     
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix='/api')
@@ -42,121 +124,141 @@ def create_app():
     app.register_blueprint(comments_bp, url_prefix='/api')
     app.register_blueprint(reactions_bp, url_prefix='/api')
     app.register_blueprint(user_bp, url_prefix='/api') 
-    # Create database tables and seed data
-    with app.app_context():
-        db.create_all()
-        seed_database()
+    app.register_blueprint(reports_bp, url_prefix='/api')
+    app.register_blueprint(changes_bp, url_prefix='/api')
+    
+    register_commands(app)
+    
+    # Password hashing runs in a bounded process pool, logins are throttled per username and IP
+    app.extensions['password_hasher'] = PasswordHasher(
+        method=app.config.get('PASSWORD_HASH_METHOD', 'scrypt'),
+        workers=app.config.get('PASSWORD_HASH_WORKERS', 2),
+        max_queue=app.config.get('PASSWORD_HASH_MAX_QUEUE', 32),
+        timeout=app.config.get('PASSWORD_HASH_TIMEOUT', 10)
+    )
+    app.extensions['login_throttle'] = LoginThrottle(
+        max_per_username=app.config.get('LOGIN_MAX_ATTEMPTS_PER_USERNAME', 10),
+        max_per_ip=app.config.get('LOGIN_MAX_ATTEMPTS_PER_IP', 50),
+        window=app.config.get('LOGIN_THROTTLE_WINDOW', 60)
+    )
+    
+    # Background threads belong to the serving process: start them with its first request
+    @app.before_request
+    def ensure_background_services():
+        start_background_services(app)
+    
+    # Frontend files are indexed once, so serving them needs no filesystem lookups
+    app.extensions['static_manifest'] = StaticManifest(
+        app.static_folder,
+        hashed_pattern=app.config['STATIC_HASHED_PATTERN'],
+        auto_reload=app.config.get('STATIC_AUTO_RELOAD', False) or app.debug
+    )
     
     # Serve frontend files
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
     def serve(path):
-        static_folder_path = app.static_folder
-        if static_folder_path is None:
+        if app.static_folder is None:
             return "Static folder not configured", 404
-
-        if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-            return send_from_directory(static_folder_path, path)
-        else:
-            index_path = os.path.join(static_folder_path, 'index.html')
-            if os.path.exists(index_path):
-                return send_from_directory(static_folder_path, 'index.html')
-            else:
+        
+        manifest = app.extensions['static_manifest']
+        asset = manifest.lookup(path) if path != "" else None
+        if asset is None:
+            # Client-side routes get the SPA entry point
+            asset = manifest.lookup('index.html')
+            if asset is None:
                 return "index.html not found", 404
+        
+        return send_static_asset(asset)
     
     # Health check endpoint
     @app.route('/health')
     def health_check():
-        return {'status': 'healthy', 'message': 'PowerBI Backend API is running'}, 200
+        circuit_breakers = PowerBIService.get_circuit_state()
+        degraded = any(breaker['state'] != 'closed' for breaker in circuit_breakers)
+        health = {
+            'status': 'degraded' if degraded else 'healthy',
+            'message': 'PowerBI Backend API is running',
+            'powerbi': {'circuit_breakers': circuit_breakers}
+        }
+        # Failed and dropped buffered writes are otherwise only visible in the logs
+        write_behind = app.extensions.get('write_behind')
+        if write_behind is not None:
+            health['write_behind'] = write_behind.stats()
+        return health, 200
     
     return app
 
-def seed_database():
-    """Seed database with initial data"""
-    try:
-        # Create admin user if not exists
-        admin_user = User.query.filter_by(username='admin').first()
-        if not admin_user:
-            admin_user = User(
-                username='admin',
-                is_admin=True,
-                email='admin@example.com'
-            )
-            admin_user.set_password('admin123')
-            db.session.add(admin_user)
-        
-        # Create regular user if not exists
-        regular_user = User.query.filter_by(username='user').first()
-        if not regular_user:
-            regular_user = User(
-                username='user',
-                is_admin=False,
-                email='user@example.com'
-            )
-            regular_user.set_password('user123')
-            db.session.add(regular_user)
+_background_lock = threading.Lock()
+
+def start_background_services(app):
+    """Start the write-behind buffer and catalog sync worker, once per process"""
+    if app.extensions.get('background_started'):
+        return
+    
+    with _background_lock:
+        if app.extensions.get('background_started'):
+            return
         
-        # Create default report if not exists
-        default_report = Report.query.filter_by(powerbi_report_id='default-report').first()
-        if not default_report:
-            default_report = Report(
-                name='Dashboard Principal',
-                description='Dashboard principal de la aplicación',
-                powerbi_report_id='default-report',
-                powerbi_workspace_id='default-workspace'
+        # Optional write-behind mode for like and reaction toggles
+        if app.config.get('WRITE_BEHIND_ENABLED'):
+            write_behind = WriteBehindBuffer(
+                app,
+                flush_interval=app.config.get('WRITE_BEHIND_FLUSH_MS', 200) / 1000,
+                flush_max_events=app.config.get('WRITE_BEHIND_FLUSH_EVENTS', 500),
+                max_pending=app.config.get('WRITE_BEHIND_MAX_PENDING', 10000)
             )
-            db.session.add(default_report)
-        
-        db.session.commit()
-        
-        # Add sample comments if none exist
-        if Comment.query.count() == 0:
-            sample_comments = [
-                Comment(
-                    user_id=regular_user.id if regular_user else 2,
-                    report_id=default_report.id if default_report else 1,
-                    content='Excelente análisis de ventas. Los datos del Q4 muestran una tendencia muy positiva.',
-                    likes=5
-                ),
-                Comment(
-                    user_id=admin_user.id if admin_user else 1,
-                    report_id=default_report.id if default_report else 1,
-                    content='Gracias por el feedback. Hemos actualizado el dashboard con métricas adicionales.',
-                    likes=3
-                )
-            ]
-            
-            for comment in sample_comments:
-                db.session.add(comment)
+            write_behind.start()
+            app.extensions['write_behind'] = write_behind
         
-        # Add sample reactions if none exist
-        if Reaction.query.count() == 0:
-            sample_reactions = [
-                Reaction(
-                    user_id=regular_user.id if regular_user else 2,
-                    report_id=default_report.id if default_report else 1,
-                    reaction_type='me_interesa'
-                ),
-                Reaction(
-                    user_id=admin_user.id if admin_user else 1,
-                    report_id=default_report.id if default_report else 1,
-                    reaction_type='aporta'
-                )
-            ]
-            
-            for reaction in sample_reactions:
-                db.session.add(reaction)
+        # Keep the report catalog in sync with Power BI in the background
+        sync_interval = app.config.get('POWERBI_CATALOG_SYNC_INTERVAL', 0)
+        if app.config.get('POWERBI_CATALOG_SYNC_IN_PROCESS') and sync_interval and (app.config.get('POWERBI_CATALOG_WORKSPACES') or app.config.get('POWERBI_WORKSPACE_ID')):
+            CatalogSyncWorker(app, sync_interval).start()
         
-        db.session.commit()
-        print("Database seeded successfully!")
-        
-    except Exception as e:
-        db.session.rollback()
-        print(f"Error seeding database: {str(e)}")
+        app.extensions['background_started'] = True
+
+_legacy_app = None
+_legacy_app_lock = threading.Lock()
 
-# Create app instance
-app = create_app()
+def __getattr__(name):
+    """``src.main:app`` for deployments started with ``gunicorn src.main:app`` or ``flask run``
+    
+    Built on first access only, so importing this module stays free of side
+    effects. Like before the factory existed, it also creates missing tables
+    and seed data; new deployments should run ``flask init-db`` and
+    ``flask seed-db`` once and serve with ``python -m src.serve``.
+    
+    The number of workers is unknown here, so the write-behind buffer (which
+    needs a single worker) stays off; ``python -m src.serve --workers 1``
+    enables it.
+    """
+    global _legacy_app
+    if name != 'app':
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    from src.database.seed import init_database, seed_database
+    
+    with _legacy_app_lock:
+        if _legacy_app is None:
+            app = create_app()
+            if app.config.get('WRITE_BEHIND_ENABLED'):
+                app.logger.warning('WRITE_BEHIND_ENABLED ignored for src.main:app; serve with python -m src.serve --workers 1')
+                app.config['WRITE_BEHIND_ENABLED'] = False
+            with app.app_context():
+                init_database()
+                seed_database()
+            _legacy_app = app
+    return _legacy_app
 
 if __name__ == '__main__':
+    # Development server: create and seed the local database on the fly
+    from src.database.seed import init_database, seed_database
+    
+    app = create_app()
+    # A single process, so it can sync the report catalog itself
+    app.config['POWERBI_CATALOG_SYNC_IN_PROCESS'] = True
+    with app.app_context():
+        init_database()
+        seed_database()
     app.run(host='0.0.0.0', port=5000, debug=True)
-
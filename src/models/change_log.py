@@ -0,0 +1,159 @@
+from src.models.user import db
+from datetime import datetime, timedelta
+from sqlalchemy import event, insert, select
+from sqlalchemy.exc import IntegrityError
+from src.database.routing import primary_reads
+
+# Session.info key of the changes recorded in the current transaction
+PENDING_CHANGES_KEY = 'pending_changes'
+
+class ChangeLogEntry(db.Model):
+    __tablename__ = 'change_log'
+    
+    # Append-only: one row per comment, like and reaction mutation, written when the
+    # mutation's transaction commits. seq orders the feed in commit order and is never
+    # reused, even after the newest rows were pruned (AUTOINCREMENT on SQLite).
+    seq = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    report_id = db.Column(db.Integer, nullable=False)
+    entity = db.Column(db.String(20), nullable=False)
+    entity_id = db.Column(db.Integer)
+    action = db.Column(db.String(20), nullable=False)
+    user_id = db.Column(db.Integer)
+    data = db.Column(db.JSON)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = {'sqlite_autoincrement': True}
+    
+    def to_dict(self):
+        """Convert change to dictionary"""
+        return {
+            'seq': self.seq,
+            'report_id': self.report_id,
+            'entity': self.entity,
+            'entity_id': self.entity_id,
+            'action': self.action,
+            'user_id': self.user_id,
+            'data': self.data or {},
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+    
+    @staticmethod
+    def record(report_id, entity, action, entity_id=None, user_id=None, data=None):
+        """Record a change of the current transaction; the caller is responsible for committing
+        
+        The row is inserted when the transaction commits (see
+        ``write_pending_changes``). A change recorded inside a savepoint is
+        discarded if that savepoint is rolled back.
+        """
+        session = db.session()
+        if not session.in_transaction():
+            # So that a rollback before anything else runs also discards the change
+            session.begin()
+        session.info.setdefault(PENDING_CHANGES_KEY, []).append((session.get_nested_transaction(), ChangeLogEntry(
+            report_id=report_id,
+            entity=entity,
+            entity_id=entity_id,
+            action=action,
+            user_id=user_id,
+            data=data,
+            created_at=datetime.utcnow()
+        )))
+    
+    @staticmethod
+    def get_since(since, limit):
+        """Get up to ``limit`` changes after sequence ``since``, in order
+        
+        Sequence numbers follow commit order, so once a seq is visible every
+        lower one is too and a consumer advancing ``since`` never skips a
+        change. Returns the changes and whether more are available.
+        """
+        session = db.session()
+        if not writers_are_serialized(session):
+            # Wait for the transactions inserting changes right now to commit
+            ChangeLogLock.acquire(session, shared=False)
+        changes = ChangeLogEntry.query.filter(
+            ChangeLogEntry.seq > since
+        ).order_by(ChangeLogEntry.seq).limit(limit + 1).all()
+        return changes[:limit], len(changes) > limit
+    
+    @staticmethod
+    def prune(older_than_days):
+        """Delete changes older than ``older_than_days``, returns how many were deleted"""
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        return ChangeLogEntry.query.filter(
+            ChangeLogEntry.created_at < cutoff
+        ).delete(synchronize_session=False)
+    
+    def __repr__(self):
+        return f'<ChangeLogEntry {self.seq} {self.entity} {self.action}>'
+
+class ChangeLogLock(db.Model):
+    __tablename__ = 'change_log_lock'
+    
+    # A single row (server profile only): transactions share it from the insert of
+    # their changes to the commit, feed readers take it exclusively
+    id = db.Column(db.Integer, primary_key=True)
+    
+    # SQL Server ignores FOR UPDATE / FOR SHARE and takes table hints instead
+    MSSQL_HINTS = {True: 'WITH (HOLDLOCK, ROWLOCK)', False: 'WITH (XLOCK, HOLDLOCK, ROWLOCK)'}
+    
+    @staticmethod
+    def acquire(session, shared):
+        """Lock the row, shared or exclusive, until the end of the session's transaction"""
+        statement = select(ChangeLogLock.id).where(ChangeLogLock.id == 1).with_for_update(read=shared)
+        statement = statement.with_hint(ChangeLogLock.__table__, ChangeLogLock.MSSQL_HINTS[shared], 'mssql')
+        
+        with primary_reads(session):
+            if session.execute(statement).first() is None:
+                # First use; a concurrent insert wins the race through the primary key
+                try:
+                    with session.begin_nested():
+                        session.execute(insert(ChangeLogLock).values(id=1))
+                except IntegrityError:
+                    pass
+                ChangeLogLock.acquire(session, shared)
+    
+    def __repr__(self):
+        return f'<ChangeLogLock {self.id}>'
+
+def writers_are_serialized(session):
+    """Whether the database runs one write transaction at a time (SQLite)"""
+    with primary_reads(session):
+        return session.get_bind(mapper=ChangeLogEntry.__mapper__).dialect.name == 'sqlite'
+
+@event.listens_for(db.session, 'before_commit')
+def write_pending_changes(session):
+    """Insert the changes recorded in the transaction, in commit order
+    
+    On SQLite a transaction keeps the write lock from its first write to its
+    commit, so sequence numbers already follow commit order. Elsewhere
+    transactions hold the lock row shared from the insert to the commit and
+    do not wait for each other; ``get_since`` takes it exclusively, so it
+    waits until every sequence number handed out so far is committed.
+    """
+    if session.in_nested_transaction():
+        return
+    changes = session.info.pop(PENDING_CHANGES_KEY, None)
+    if changes:
+        if not writers_are_serialized(session):
+            ChangeLogLock.acquire(session, shared=True)
+        session.add_all([change for _, change in changes])
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def discard_pending_changes(session, previous_transaction):
+    """Forget the changes of a rolled back transaction or savepoint"""
+    if previous_transaction.parent is None:
+        session.info.pop(PENDING_CHANGES_KEY, None)
+    elif previous_transaction.nested and session.info.get(PENDING_CHANGES_KEY):
+        session.info[PENDING_CHANGES_KEY] = [
+            (savepoint, change) for savepoint, change in session.info[PENDING_CHANGES_KEY]
+            if not _within(savepoint, previous_transaction)
+        ]
+
+def _within(transaction, ancestor):
+    """Whether ``transaction`` is ``ancestor`` or nested inside it"""
+    while transaction is not None:
+        if transaction is ancestor:
+            return True
+        transaction = transaction.parent
+    return False
@@ -1,5 +1,24 @@
-from src.models.user import db
+from src.models.user import db, User
+from src.models.report import ReportVersion
+from src.models.change_log import ChangeLogEntry
 from datetime import datetime
+from sqlalchemy import and_, or_, delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, load_only
+
+# Fields returned by Comment.to_dict, in response order
+COMMENT_FIELDS = ('id', 'usuario', 'contenido', 'fecha', 'esAdmin', 'likes', 'userLiked')
+
+# Columns each field needs loaded (id and created_at are always loaded for the cursor)
+COMMENT_FIELD_COLUMNS = {
+    'id': (),
+    'usuario': ('user_id',),
+    'contenido': ('content',),
+    'fecha': (),
+    'esAdmin': ('user_id',),
+    'likes': ('likes',),
+    'userLiked': ()
+}
 
 class Comment(db.Model):
     __tablename__ = 'comments'
@@ -13,24 +32,98 @@ class Comment(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
     
+    # Covers the listing query (active comments of a report ordered by created_at, id).
+    # Partial on backends that support it, so soft-deleted comments stay out of the index.
+    __table_args__ = (
+        db.Index(
+            'ix_comments_active_report_created', 'report_id', 'created_at', 'id',
+            sqlite_where=db.text('is_active = 1'),
+            postgresql_where=db.text('is_active'),
+            mssql_where=db.text('is_active = 1')
+        ),
+    )
+    
     # Relationships
     comment_likes = db.relationship('CommentLike', backref='comment', lazy=True, cascade='all, delete-orphan')
     
-    def to_dict(self, current_user_id=None):
-        """Convert comment to dictionary"""
-        user_liked = False
-        if current_user_id:
-            user_liked = any(like.user_id == current_user_id for like in self.comment_likes)
-        
-        return {
-            'id': self.id,
-            'usuario': self.user.username,
-            'contenido': self.content,
-            'fecha': self.created_at.isoformat() if self.created_at else None,
-            'esAdmin': self.user.is_admin,
-            'likes': self.likes,
-            'userLiked': user_liked
-        }
+    def to_dict(self, current_user_id=None, fields=None, liked_ids=None):
+        """Convert comment to dictionary, optionally limited to ``fields``
+        
+        ``liked_ids`` is the set of comment ids liked by the current user, as
+        returned by CommentLike.get_liked_ids; pass it when serializing many
+        comments so userLiked does not need a query per comment.
+        """
+        if fields is None:
+            fields = COMMENT_FIELDS
+        
+        data = {}
+        if 'id' in fields:
+            data['id'] = self.id
+        if 'usuario' in fields:
+            data['usuario'] = self.user.username
+        if 'contenido' in fields:
+            data['contenido'] = self.content
+        if 'fecha' in fields:
+            data['fecha'] = self.created_at.isoformat() if self.created_at else None
+        if 'esAdmin' in fields:
+            data['esAdmin'] = self.user.is_admin
+        if 'likes' in fields:
+            data['likes'] = self.likes
+        if 'userLiked' in fields:
+            user_liked = False
+            if liked_ids is not None:
+                user_liked = self.id in liked_ids
+            elif current_user_id:
+                user_liked = CommentLike.query.filter_by(
+                    user_id=current_user_id,
+                    comment_id=self.id
+                ).first() is not None
+            data['userLiked'] = user_liked
+        
+        return data
+    
+    @staticmethod
+    def get_page(report_id, limit, after=None, fields=None):
+        """Get one page of active comments for a report, newest first
+        
+        Uses keyset pagination on (created_at, id): ``after`` is the
+        (created_at, id) of the last comment of the previous page. A ``limit``
+        of None returns every remaining comment. Returns the comments and
+        whether there are more after them.
+        """
+        query = Comment.query.filter(
+            Comment.report_id == report_id,
+            Comment.is_active == True
+        )
+        
+        if after is not None:
+            created_at, comment_id = after
+            query = query.filter(or_(
+                Comment.created_at < created_at,
+                and_(Comment.created_at == created_at, Comment.id < comment_id)
+            ))
+        
+        if fields is not None:
+            columns = {'id', 'created_at'}
+            for field in fields:
+                columns.update(COMMENT_FIELD_COLUMNS[field])
+            query = query.options(load_only(*[getattr(Comment, column) for column in columns]))
+        
+        # Load authors in the same query instead of one lazy load per comment
+        if fields is None or 'usuario' in fields or 'esAdmin' in fields:
+            query = query.options(joinedload(Comment.user).load_only(User.username, User.is_admin))
+        
+        query = query.order_by(
+            Comment.created_at.desc(),
+            Comment.id.desc()
+        )
+        
+        if limit is None:
+            return query.all(), False
+        
+        comments = query.limit(limit + 1).all()
+        
+        return comments[:limit], len(comments) > limit
     
     def __repr__(self):
         return f'<Comment {self.id} by {self.user.username}>'
@@ -44,7 +137,131 @@ class CommentLike(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Unique constraint to prevent duplicate likes
-    __table_args__ = (db.UniqueConstraint('user_id', 'comment_id', name='unique_user_comment_like'),)
+    # The unique constraint also serves lookups by user_id; the index serves lookups by comment
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'comment_id', name='unique_user_comment_like'),
+        db.Index('ix_comment_likes_comment', 'comment_id'),
+    )
+    
+    @staticmethod
+    def toggle(user_id, comment_id):
+        """Atomically add or remove a user's like, returns (action, likes)
+        
+        The like row is deleted or inserted and the comment counter adjusted
+        with ``likes = likes +/- 1`` in the database, so concurrent toggles
+        never lose updates. The caller is responsible for committing.
+        """
+        deleted = db.session.execute(
+            delete(CommentLike).where(
+                CommentLike.user_id == user_id,
+                CommentLike.comment_id == comment_id
+            )
+        ).rowcount
+        
+        if deleted:
+            return 'removed', CommentLike._add_to_counter(comment_id, -1, user_id)
+        
+        if CommentLike._insert_like(user_id, comment_id):
+            return 'added', CommentLike._add_to_counter(comment_id, 1, user_id)
+        
+        # A concurrent request from the same user added the like first
+        return 'added', db.session.execute(
+            select(Comment.likes).where(Comment.id == comment_id)
+        ).scalar()
+    
+    @staticmethod
+    def set_liked(user_id, comment_id, liked):
+        """Make a user's like on a comment match ``liked``, returns the new count or None if unchanged
+        
+        The caller is responsible for committing.
+        """
+        if liked:
+            if CommentLike._insert_like(user_id, comment_id):
+                return CommentLike._add_to_counter(comment_id, 1, user_id)
+            return None
+        
+        deleted = db.session.execute(
+            delete(CommentLike).where(
+                CommentLike.user_id == user_id,
+                CommentLike.comment_id == comment_id
+            )
+        ).rowcount
+        
+        if deleted:
+            return CommentLike._add_to_counter(comment_id, -1, user_id)
+        return None
+    
+    @staticmethod
+    def _insert_like(user_id, comment_id):
+        """Insert a like unless it already exists, returns whether it was inserted"""
+        dialect = db.session.get_bind().dialect.name
+        
+        if dialect in ('sqlite', 'postgresql'):
+            if dialect == 'sqlite':
+                from sqlalchemy.dialects.sqlite import insert as upsert
+            else:
+                from sqlalchemy.dialects.postgresql import insert as upsert
+            
+            statement = upsert(CommentLike).values(
+                user_id=user_id,
+                comment_id=comment_id,
+                created_at=datetime.utcnow()
+            ).on_conflict_do_nothing(index_elements=['user_id', 'comment_id'])
+            return db.session.execute(statement).rowcount == 1
+        
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(CommentLike).values(
+                    user_id=user_id,
+                    comment_id=comment_id,
+                    created_at=datetime.utcnow()
+                ))
+            return True
+        except IntegrityError:
+            return False
+    
+    @staticmethod
+    def _add_to_counter(comment_id, delta, user_id):
+        """Add ``delta`` to a comment's like counter in the database, returns the new count
+        
+        Also bumps the comments version of the comment's report and records
+        the change in the change log.
+        """
+        statement = update(Comment).where(Comment.id == comment_id).values(
+            likes=func.coalesce(Comment.likes, 0) + delta
+        )
+        
+        if db.session.get_bind().dialect.update_returning:
+            # Single round trip: the new value comes back with the update
+            row = db.session.execute(statement.returning(Comment.likes, Comment.report_id)).first()
+        else:
+            db.session.execute(statement)
+            row = db.session.execute(
+                select(Comment.likes, Comment.report_id).where(Comment.id == comment_id)
+            ).first()
+        
+        if row is None:
+            return None
+        
+        ReportVersion.bump(row.report_id, comments=True)
+        ChangeLogEntry.record(
+            row.report_id, 'comment_like', 'added' if delta > 0 else 'removed',
+            entity_id=comment_id, user_id=user_id, data={'likes': row.likes}
+        )
+        return row.likes
+    
+    @staticmethod
+    def get_liked_ids(user_id, comment_ids):
+        """Get the ids of the given comments that a user liked, in one query"""
+        if not user_id or not comment_ids:
+            return set()
+        
+        rows = db.session.query(CommentLike.comment_id).filter(
+            CommentLike.user_id == user_id,
+            CommentLike.comment_id.in_(comment_ids)
+        ).all()
+        
+        return {row.comment_id for row in rows}
     
     def __repr__(self):
         return f'<CommentLike {self.user_id} -> {self.comment_id}>'
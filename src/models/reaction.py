@@ -1,5 +1,9 @@
 from src.models.user import db
+from src.models.report import ReportVersion
+from src.models.change_log import ChangeLogEntry
 from datetime import datetime
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
 
 class Reaction(db.Model):
     __tablename__ = 'reactions'
@@ -11,7 +15,11 @@ class Reaction(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Unique constraint to prevent duplicate reactions of same type
-    __table_args__ = (db.UniqueConstraint('user_id', 'report_id', 'reaction_type', name='unique_user_report_reaction'),)
+    # The unique constraint also serves lookups by (user_id, report_id); the index serves stats by report
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'report_id', 'reaction_type', name='unique_user_report_reaction'),
+        db.Index('ix_reactions_report_type', 'report_id', 'reaction_type'),
+    )
     
     def to_dict(self):
         """Convert reaction to dictionary"""
@@ -25,20 +33,184 @@ class Reaction(db.Model):
     
     @staticmethod
     def get_reaction_stats(report_id):
-        """Get reaction statistics for a report"""
+        """Get reaction statistics for a report (from the maintained counters)"""
+        counters = ReactionCounter.query.filter(
+            ReactionCounter.report_id == report_id,
+            ReactionCounter.count > 0
+        ).order_by(
+            ReactionCounter.reaction_type
+        ).all()
+        
+        return [{'tipo': counter.reaction_type, 'count': counter.count} for counter in counters]
+    
+    @staticmethod
+    def get_reaction_stats_bulk(report_ids):
+        """Get reaction statistics for many reports in one query, as {report_id: stats}"""
+        stats = {report_id: [] for report_id in report_ids}
+        if not report_ids:
+            return stats
+        
+        counters = ReactionCounter.query.filter(
+            ReactionCounter.report_id.in_(report_ids),
+            ReactionCounter.count > 0
+        ).order_by(
+            ReactionCounter.report_id,
+            ReactionCounter.reaction_type
+        ).all()
+        
+        for counter in counters:
+            stats[counter.report_id].append({'tipo': counter.reaction_type, 'count': counter.count})
+        
+        return stats
+    
+    @staticmethod
+    def get_user_reaction_type(user_id, report_id):
+        """Get the reaction type a user currently has on a report, or None"""
+        row = db.session.query(Reaction.reaction_type).filter_by(
+            user_id=user_id,
+            report_id=report_id
+        ).first()
+        return row.reaction_type if row else None
+    
+    @staticmethod
+    def set_user_reaction(user_id, report_id, reaction_type):
+        """Make ``reaction_type`` (or no reaction, if None) the user's only reaction on a report
+        
+        Counters, the report version and the change log are updated in the same
+        transaction.
+        Returns whether anything changed; the caller is responsible for committing.
+        """
+        existing_reactions = Reaction.query.filter_by(
+            user_id=user_id,
+            report_id=report_id
+        ).all()
+        
+        changed = False
+        kept = False
+        for reaction in existing_reactions:
+            if reaction.reaction_type == reaction_type:
+                kept = True
+                continue
+            db.session.delete(reaction)
+            ReactionCounter.increment(report_id, reaction.reaction_type, -1)
+            ChangeLogEntry.record(
+                report_id, 'reaction', 'removed',
+                entity_id=reaction.id, user_id=user_id, data={'tipo': reaction.reaction_type}
+            )
+            changed = True
+        
+        if reaction_type and not kept:
+            reaction = Reaction(
+                user_id=user_id,
+                report_id=report_id,
+                reaction_type=reaction_type
+            )
+            db.session.add(reaction)
+            db.session.flush()
+            ReactionCounter.increment(report_id, reaction_type, 1)
+            ChangeLogEntry.record(
+                report_id, 'reaction', 'added',
+                entity_id=reaction.id, user_id=user_id, data={'tipo': reaction_type}
+            )
+            changed = True
+        
+        if changed:
+            ReportVersion.bump(report_id, reactions=True)
+        
+        return changed
+    
+    @staticmethod
+    def count_reactions(report_id=None):
+        """Count reactions per (report, type) straight from the reactions table"""
         from sqlalchemy import func
         
-        stats = db.session.query(
+        query = db.session.query(
+            Reaction.report_id,
             Reaction.reaction_type,
             func.count(Reaction.id).label('count')
-        ).filter(
-            Reaction.report_id == report_id
-        ).group_by(
-            Reaction.reaction_type
-        ).all()
+        )
+        
+        if report_id is not None:
+            query = query.filter(Reaction.report_id == report_id)
         
-        return [{'tipo': stat.reaction_type, 'count': stat.count} for stat in stats]
+        rows = query.group_by(Reaction.report_id, Reaction.reaction_type).all()
+        
+        return {(row.report_id, row.reaction_type): row.count for row in rows}
     
     def __repr__(self):
         return f'<Reaction {self.reaction_type} by {self.user_id} on {self.report_id}>'
 
+
+
+class ReactionCounter(db.Model):
+    __tablename__ = 'reaction_counters'
+    
+    report_id = db.Column(db.Integer, db.ForeignKey('reports.id'), primary_key=True)
+    reaction_type = db.Column(db.String(20), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    @staticmethod
+    def increment(report_id, reaction_type, delta=1):
+        """Atomically add ``delta`` to a counter in the current transaction"""
+        result = db.session.execute(
+            update(ReactionCounter).where(
+                ReactionCounter.report_id == report_id,
+                ReactionCounter.reaction_type == reaction_type
+            ).values(count=ReactionCounter.count + delta)
+        )
+        
+        if result.rowcount == 0:
+            # First reaction of this type for the report; a concurrent insert wins the race
+            # through the primary key, so retry as an update inside a savepoint
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(insert(ReactionCounter).values(
+                        report_id=report_id,
+                        reaction_type=reaction_type,
+                        count=max(delta, 0)
+                    ))
+            except IntegrityError:
+                ReactionCounter.increment(report_id, reaction_type, delta)
+    
+    @staticmethod
+    def reconcile(report_id=None):
+        """Rebuild counters from the reactions table, returns the drift that was found
+        
+        The caller is responsible for committing.
+        """
+        expected = Reaction.count_reactions(report_id)
+        
+        query = ReactionCounter.query
+        if report_id is not None:
+            query = query.filter(ReactionCounter.report_id == report_id)
+        actual = {(counter.report_id, counter.reaction_type): counter for counter in query.all()}
+        
+        drift = []
+        for key in sorted(set(expected) | set(actual), key=lambda item: (item[0], item[1])):
+            expected_count = expected.get(key, 0)
+            counter = actual.get(key)
+            actual_count = counter.count if counter else 0
+            
+            if expected_count == actual_count:
+                continue
+            
+            drift.append({
+                'report_id': key[0],
+                'tipo': key[1],
+                'expected': expected_count,
+                'actual': actual_count
+            })
+            
+            if counter:
+                counter.count = expected_count
+            else:
+                db.session.add(ReactionCounter(
+                    report_id=key[0],
+                    reaction_type=key[1],
+                    count=expected_count
+                ))
+        
+        return drift
+    
+    def __repr__(self):
+        return f'<ReactionCounter {self.reaction_type} on {self.report_id}: {self.count}>'
@@ -1,5 +1,8 @@
 from src.models.user import db
 from datetime import datetime
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+from src.database.routing import primary_reads
 
 class Report(db.Model):
     __tablename__ = 'reports'
@@ -9,6 +12,8 @@ class Report(db.Model):
     description = db.Column(db.String(500))
     powerbi_report_id = db.Column(db.String(100), unique=True, nullable=False)
     powerbi_workspace_id = db.Column(db.String(100), nullable=False)
+    embed_url = db.Column(db.String(500))
+    dataset_id = db.Column(db.String(100))
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -25,6 +30,8 @@ class Report(db.Model):
             'description': self.description,
             'powerbi_report_id': self.powerbi_report_id,
             'powerbi_workspace_id': self.powerbi_workspace_id,
+            'embed_url': self.embed_url,
+            'dataset_id': self.dataset_id,
             'is_active': self.is_active,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
@@ -32,3 +39,108 @@ class Report(db.Model):
     def __repr__(self):
         return f'<Report {self.name}>'
 
+
+class CatalogSyncRun(db.Model):
+    __tablename__ = 'catalog_sync_runs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    duration_ms = db.Column(db.Integer, default=0)
+    workspaces = db.Column(db.String(500))
+    inserted = db.Column(db.Integer, default=0)
+    updated = db.Column(db.Integer, default=0)
+    deactivated = db.Column(db.Integer, default=0)
+    unchanged = db.Column(db.Integer, default=0)
+    status = db.Column(db.String(20), nullable=False)
+    error = db.Column(db.String(500))
+    
+    def to_dict(self):
+        """Convert sync run to dictionary"""
+        return {
+            'id': self.id,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'duration_ms': self.duration_ms,
+            'workspaces': self.workspaces.split(',') if self.workspaces else [],
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'deactivated': self.deactivated,
+            'unchanged': self.unchanged,
+            'status': self.status,
+            'error': self.error
+        }
+    
+    def __repr__(self):
+        return f'<CatalogSyncRun {self.id} {self.status}>'
+
+
+
+class ReportVersion(db.Model):
+    __tablename__ = 'report_versions'
+    
+    # Bumped by every write that changes what GET /comments or GET /reactions return for
+    # the report; responses derive their ETag and server-side cache key from it.
+    report_id = db.Column(db.Integer, db.ForeignKey('reports.id'), primary_key=True)
+    comments_version = db.Column(db.Integer, nullable=False, default=0)
+    reactions_version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    @staticmethod
+    def get(report_id):
+        """Get (comments_version, reactions_version) for a report, in one primary key lookup
+        
+        Read from the primary: a lagging replica would key responses and
+        ETags by an outdated version.
+        """
+        with primary_reads(db.session):
+            row = db.session.query(
+                ReportVersion.comments_version,
+                ReportVersion.reactions_version
+            ).filter_by(report_id=report_id).first()
+        return (row.comments_version, row.reactions_version) if row else (0, 0)
+    
+    @staticmethod
+    def get_many(report_ids):
+        """Get {report_id: (comments_version, reactions_version)} for many reports in one query (from the primary)"""
+        versions = {report_id: (0, 0) for report_id in report_ids}
+        if not report_ids:
+            return versions
+        
+        with primary_reads(db.session):
+            rows = db.session.query(
+                ReportVersion.report_id,
+                ReportVersion.comments_version,
+                ReportVersion.reactions_version
+            ).filter(ReportVersion.report_id.in_(report_ids)).all()
+        
+        for row in rows:
+            versions[row.report_id] = (row.comments_version, row.reactions_version)
+        return versions
+    
+    @staticmethod
+    def bump(report_id, comments=False, reactions=False):
+        """Atomically bump a report's versions in the current transaction"""
+        values = {'updated_at': datetime.utcnow()}
+        if comments:
+            values['comments_version'] = ReportVersion.comments_version + 1
+        if reactions:
+            values['reactions_version'] = ReportVersion.reactions_version + 1
+        
+        result = db.session.execute(
+            update(ReportVersion).where(ReportVersion.report_id == report_id).values(**values)
+        )
+        
+        if result.rowcount == 0:
+            # First write for the report; a concurrent insert wins through the primary key
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(insert(ReportVersion).values(
+                        report_id=report_id,
+                        comments_version=int(comments),
+                        reactions_version=int(reactions),
+                        updated_at=datetime.utcnow()
+                    ))
+            except IntegrityError:
+                ReportVersion.bump(report_id, comments=comments, reactions=reactions)
+    
+    def __repr__(self):
+        return f'<ReportVersion {self.report_id} c{self.comments_version} r{self.reactions_version}>'
@@ -1,8 +1,10 @@
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+from src.database.routing import RoutingSession
 
-db = SQLAlchemy()
+# Reads of read-only requests can go to a replica (see src/database/routing.py)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -42,3 +44,33 @@ class User(db.Model):
     def __repr__(self):
         return f'<User {self.username}>'
 
+
+
+class UserTokenVersion(db.Model):
+    __tablename__ = 'user_token_versions'
+    
+    # Tokens carry the version current when they were issued; bumping it revokes older ones.
+    # No foreign key: the row must outlive a deleted user to keep that user's tokens revoked.
+    user_id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    @staticmethod
+    def bump(user_id):
+        """Revoke every token issued to a user so far; the caller is responsible for committing"""
+        from sqlalchemy import update
+        
+        result = db.session.execute(
+            update(UserTokenVersion).where(
+                UserTokenVersion.user_id == user_id
+            ).values(
+                version=UserTokenVersion.version + 1,
+                updated_at=datetime.utcnow()
+            )
+        )
+        
+        if result.rowcount == 0:
+            db.session.add(UserTokenVersion(user_id=user_id, version=1, updated_at=datetime.utcnow()))
+    
+    def __repr__(self):
+        return f'<UserTokenVersion {self.user_id} v{self.version}>'
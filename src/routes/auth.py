@@ -1,8 +1,12 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, jwt_required
 from marshmallow import ValidationError
 from src.models.user import User, db
 from src.utils.schemas import LoginSchema
+from src.services.user_cache import load_user
+from src.services.token_revocation import user_claims
+from src.services.password_hasher import HasherBusyError, get_password_hasher, get_login_throttle
+from src.utils.decorators import get_current_user_id
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -17,12 +21,23 @@ def login():
         username = data['username']
         password = data['password']
         
+        # Reject cheaply before any hashing when the username or IP is over its limit
+        if not get_login_throttle().allow(username, request.remote_addr or ''):
+            return jsonify({'message': 'Demasiados intentos, intente más tarde'}), 429
+        
         # Find user by username
         user = User.query.filter_by(username=username).first()
         
-        if user and user.check_password(password):
-            # Create access token
-            access_token = create_access_token(identity=user.id)
+        hasher = get_password_hasher()
+        
+        if user and hasher.verify(user.password_hash, password):
+            # Transparently upgrade hashes made with older cost parameters
+            if hasher.needs_rehash(user.password_hash):
+                user.password_hash = hasher.hash(password)
+                db.session.commit()
+            
+            # Create access token carrying the claims needed to authorize requests
+            access_token = create_access_token(identity=str(user.id), additional_claims=user_claims(user))
             
             return jsonify({
                 'success': True,
@@ -34,7 +49,10 @@ def login():
             
     except ValidationError as e:
         return jsonify({'message': 'Datos de entrada inválidos', 'errors': e.messages}), 400
+    except HasherBusyError:
+        return jsonify({'message': 'Servidor ocupado, intente más tarde'}), 503, {'Retry-After': '1'}
     except Exception as e:
+        db.session.rollback()
         return jsonify({'message': 'Error interno del servidor'}), 500
 
 @auth_bp.route('/auth/refresh', methods=['POST'])
@@ -42,14 +60,15 @@ def login():
 def refresh():
     """Refresh JWT token"""
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = get_current_user_id()
+        # Fresh from the database: the new token's claims must reflect current privileges
         user = User.query.get(current_user_id)
         
         if not user or not user.is_active:
             return jsonify({'message': 'Usuario no válido'}), 401
         
         # Create new access token
-        new_token = create_access_token(identity=user.id)
+        new_token = create_access_token(identity=str(user.id), additional_claims=user_claims(user))
         
         return jsonify({
             'token': new_token
@@ -63,8 +82,9 @@ def refresh():
 def get_current_user():
     """Get current user information"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        current_user_id = get_current_user_id()
+        # The token only carries authorization claims; the profile comes from the user cache
+        user = load_user(current_user_id)
         
         if not user or not user.is_active:
             return jsonify({'message': 'Usuario no encontrado'}), 404
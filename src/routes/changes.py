@@ -0,0 +1,37 @@
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required, current_user
+from src.models.change_log import ChangeLogEntry
+
+changes_bp = Blueprint('changes', __name__)
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+
+@changes_bp.route('/changes', methods=['GET'])
+@jwt_required()
+def get_changes():
+    """Get comment, like and reaction changes across all reports after ``since`` (admin only)
+    
+    Consumers store ``next_since`` and pass it back as ``since``; while
+    ``has_more`` is true the next page is available immediately.
+    """
+    try:
+        user = current_user
+        
+        if not user or not user.is_admin:
+            return jsonify({'message': 'Se requieren privilegios de administrador'}), 403
+        
+        since = request.args.get('since', 0, type=int)
+        limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        
+        changes, has_more = ChangeLogEntry.get_since(since, limit)
+        
+        return jsonify({
+            'changes': [change.to_dict() for change in changes],
+            'next_since': changes[-1].seq if changes else since,
+            'has_more': has_more
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'message': 'Error al obtener cambios'}), 500
@@ -1,38 +1,122 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, current_user
 from marshmallow import ValidationError
-from src.models.user import User, db
-from src.models.comment import Comment, CommentLike
-from src.models.report import Report
+from src.models.user import db
+from src.models.comment import Comment, CommentLike, COMMENT_FIELDS
+from src.models.report import Report, ReportVersion
+from src.models.change_log import ChangeLogEntry
 from src.utils.schemas import CommentSchema
+from src.utils.pagination import encode_cursor, decode_cursor
+from src.services.write_behind import consistent_reads, get_write_behind
+from src.services.response_cache import cached_json_response
+from src.services.event_bus import publish_event
+from src.utils.decorators import get_current_user_id
 
 comments_bp = Blueprint('comments', __name__)
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def get_comments_page(report_id, limit, after=None, fields=None, current_user_id=None):
+    """Serialize one page of a report's comments for a viewer, returns (comments, next cursor or None)"""
+    # Rows and buffered likes from the same side of any write-behind flush
+    with consistent_reads():
+        comments, has_more = Comment.get_page(report_id, limit, after=after, fields=fields)
+        
+        # Liked status for the whole page in one query
+        liked_ids = set()
+        if fields is None or 'userLiked' in fields:
+            liked_ids = CommentLike.get_liked_ids(current_user_id, [comment.id for comment in comments])
+        
+        # Convert to dict with user liked status
+        comments_data = [
+            comment.to_dict(current_user_id, fields=fields, liked_ids=liked_ids)
+            for comment in comments
+        ]
+        
+        # Likes still waiting in the write-behind buffer
+        write_behind = get_write_behind()
+        if write_behind and comments:
+            comment_ids = [comment.id for comment in comments]
+            liked_overrides = write_behind.liked_overrides(current_user_id, comment_ids) if current_user_id else {}
+            like_deltas = write_behind.like_deltas(comment_ids)
+            for comment, comment_data in zip(comments, comments_data):
+                if 'userLiked' in comment_data and comment.id in liked_overrides:
+                    comment_data['userLiked'] = liked_overrides[comment.id]
+                if 'likes' in comment_data:
+                    comment_data['likes'] = (comment_data['likes'] or 0) + like_deltas.get(comment.id, 0)
+    
+    next_cursor = None
+    if has_more:
+        last = comments[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    
+    return comments_data, next_cursor
+
 @comments_bp.route('/comments', methods=['GET'])
 def get_comments():
-    """Get comments for a report"""
+    """Get a page of comments for a report
+    
+    Pages are requested with ``limit`` and ``cursor``; the cursor for the
+    next page is returned in the ``X-Next-Cursor`` header. Without either,
+    every comment of the report is returned, as before pagination existed. ``fields`` limits
+    the returned fields to a comma-separated subset. Responses carry an
+    ETag derived from the report's comments version.
+    """
     try:
         report_id = request.args.get('report_id', 1, type=int)  # Default to report 1
+        cursor = request.args.get('cursor')
+        
+        # Unpaginated unless the client asks for pages
+        limit = None
+        if 'limit' in request.args or cursor:
+            limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+            limit = max(1, min(limit, MAX_PAGE_SIZE))
+        
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor)
+            except ValueError:
+                return jsonify({'message': 'Cursor inválido'}), 400
+        
+        fields = None
+        fields_param = request.args.get('fields')
+        if fields_param:
+            fields = [field.strip() for field in fields_param.split(',') if field.strip()]
+            invalid_fields = [field for field in fields if field not in COMMENT_FIELDS]
+            if invalid_fields:
+                return jsonify({'message': f"Campos inválidos: {', '.join(invalid_fields)}"}), 400
+        
         current_user_id = None
         
         # Try to get current user if authenticated
         try:
             from flask_jwt_extended import verify_jwt_in_request
             verify_jwt_in_request(optional=True)
-            current_user_id = get_jwt_identity()
+            current_user_id = get_current_user_id()
         except:
             pass
         
-        # Get comments for the report
-        comments = Comment.query.filter_by(
-            report_id=report_id, 
-            is_active=True
-        ).order_by(Comment.created_at.desc()).all()
+        # Everything the response depends on; the viewer only matters for userLiked
+        write_behind = get_write_behind()
+        viewer_id = current_user_id if fields is None or 'userLiked' in fields else None
+        cache_key = (
+            'comments', report_id, ReportVersion.get(report_id)[0],
+            write_behind.generation if write_behind else 0,
+            viewer_id, limit, cursor, tuple(fields) if fields else None
+        )
         
-        # Convert to dict with user liked status
-        comments_data = [comment.to_dict(current_user_id) for comment in comments]
+        def build_response():
+            comments_data, next_cursor = get_comments_page(report_id, limit, after, fields, current_user_id)
+            
+            response = jsonify(comments_data)
+            if next_cursor:
+                response.headers['X-Next-Cursor'] = next_cursor
+            return response
         
-        return jsonify(comments_data), 200
+        # 304 on a matching If-None-Match, before any comment query runs
+        return cached_json_response(cache_key, build_response)
         
     except Exception as e:
         return jsonify({'message': 'Error al obtener comentarios'}), 500
@@ -42,8 +126,7 @@ def get_comments():
 def create_comment():
     """Create a new comment"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = current_user
         
         if not user or not user.is_active:
             return jsonify({'message': 'Usuario no válido'}), 401
@@ -69,15 +152,24 @@ def create_comment():
         
         # Create new comment
         comment = Comment(
-            user_id=current_user_id,
+            user_id=user.id,
             report_id=report_id,
             content=data['contenido']
         )
         
         db.session.add(comment)
+        db.session.flush()
+        ReportVersion.bump(report_id, comments=True)
+        ChangeLogEntry.record(
+            report_id, 'comment', 'created',
+            entity_id=comment.id, user_id=user.id, data={'contenido': comment.content}
+        )
         db.session.commit()
         
-        return jsonify(comment.to_dict(current_user_id)), 201
+        # Viewer-independent fields only: every live client gets the same event
+        publish_event(report_id, 'comment_created', comment.to_dict(fields=COMMENT_FIELDS[:-1]))
+        
+        return jsonify(comment.to_dict(user.id)), 201
         
     except ValidationError as e:
         return jsonify({'message': 'Datos de entrada inválidos', 'errors': e.messages}), 400
@@ -90,44 +182,33 @@ def create_comment():
 def toggle_comment_like(comment_id):
     """Toggle like on a comment"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = current_user
         
         if not user or not user.is_active:
             return jsonify({'message': 'Usuario no válido'}), 401
         
         # Check if comment exists
-        comment = Comment.query.get(comment_id)
-        if not comment:
+        comment_exists = db.session.query(Comment.id, Comment.report_id).filter_by(id=comment_id).first()
+        if not comment_exists:
             return jsonify({'message': 'Comentario no encontrado'}), 404
         
-        # Check if user already liked this comment
-        existing_like = CommentLike.query.filter_by(
-            user_id=current_user_id,
-            comment_id=comment_id
-        ).first()
-        
-        if existing_like:
-            # Remove like
-            db.session.delete(existing_like)
-            comment.likes = max(0, comment.likes - 1)
-            action = 'removed'
+        # Buffer the toggle when write-behind is enabled and has room
+        write_behind = get_write_behind()
+        result = write_behind.toggle_like(user.id, comment_id) if write_behind else None
+        
+        if result:
+            action, likes = result
         else:
-            # Add like
-            new_like = CommentLike(
-                user_id=current_user_id,
-                comment_id=comment_id
-            )
-            db.session.add(new_like)
-            comment.likes += 1
-            action = 'added'
+            # Add or remove the like and update the counter atomically in the database
+            action, likes = CommentLike.toggle(user.id, comment_id)
+            db.session.commit()
         
-        db.session.commit()
+        publish_event(comment_exists.report_id, 'comment_likes', {'id': comment_id, 'likes': likes})
         
         return jsonify({
             'success': True,
             'action': action,
-            'likes': comment.likes
+            'likes': likes
         }), 200
         
     except Exception as e:
@@ -139,8 +220,7 @@ def toggle_comment_like(comment_id):
 def delete_comment(comment_id):
     """Delete a comment (only by owner or admin)"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = current_user
         
         if not user or not user.is_active:
             return jsonify({'message': 'Usuario no válido'}), 401
@@ -151,13 +231,17 @@ def delete_comment(comment_id):
             return jsonify({'message': 'Comentario no encontrado'}), 404
         
         # Check if user can delete this comment
-        if comment.user_id != current_user_id and not user.is_admin:
+        if comment.user_id != user.id and not user.is_admin:
             return jsonify({'message': 'No tienes permisos para eliminar este comentario'}), 403
         
         # Soft delete
         comment.is_active = False
+        ReportVersion.bump(comment.report_id, comments=True)
+        ChangeLogEntry.record(comment.report_id, 'comment', 'deleted', entity_id=comment.id, user_id=user.id)
         db.session.commit()
         
+        publish_event(comment.report_id, 'comment_deleted', {'id': comment_id})
+        
         return jsonify({'success': True, 'message': 'Comentario eliminado'}), 200
         
     except Exception as e:
@@ -1,8 +1,11 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from src.models.user import User
+from flask_jwt_extended import jwt_required, current_user
+from marshmallow import ValidationError
+from src.models.user import db
 from src.models.report import Report
 from src.services.powerbi_service import PowerBIService
+from src.services.catalog_sync import CatalogSyncService
+from src.utils.schemas import MultiEmbedTokenSchema
 
 powerbi_bp = Blueprint('powerbi', __name__)
 
@@ -11,19 +14,20 @@ powerbi_bp = Blueprint('powerbi', __name__)
 def get_report_url():
     """Get Power BI embed URL and access token"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = current_user
         
         if not user or not user.is_active:
             return jsonify({'message': 'Usuario no válido'}), 401
         
         # Get report_id from query parameters (optional)
         report_id = request.args.get('report_id')
+        dataset_id = request.args.get('dataset_id')
         
         # Generate embed token
         embed_data = PowerBIService.generate_embed_token(
             report_id=report_id,
-            user_permissions=user.to_dict()
+            user_permissions=user.to_dict(),
+            dataset_id=dataset_id
         )
         
         return jsonify(embed_data), 200
@@ -31,25 +35,48 @@ def get_report_url():
     except Exception as e:
         return jsonify({'message': 'Error al obtener URL del reporte'}), 500
 
+@powerbi_bp.route('/powerbi/embed-token', methods=['POST'])
+@jwt_required()
+def get_multi_report_embed():
+    """Get embed URLs and one shared access token for several reports"""
+    try:
+        user = current_user
+        
+        if not user or not user.is_active:
+            return jsonify({'message': 'Usuario no válido'}), 401
+        
+        # Validate input data
+        schema = MultiEmbedTokenSchema()
+        data = schema.load(request.get_json())
+        
+        reports = [(report['report_id'], report['dataset_id']) for report in data['reports']]
+        
+        # Generate one embed token for all reports
+        embed_data = PowerBIService.generate_multi_embed_token(
+            reports=reports,
+            user_permissions=user.to_dict()
+        )
+        
+        return jsonify(embed_data), 200
+        
+    except ValidationError as e:
+        return jsonify({'message': 'Datos de entrada inválidos', 'errors': e.messages}), 400
+    except Exception as e:
+        return jsonify({'message': 'Error al obtener URLs de los reportes'}), 500
+
 @powerbi_bp.route('/powerbi/reports', methods=['GET'])
 @jwt_required()
 def get_reports():
     """Get list of available Power BI reports"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = current_user
         
         if not user or not user.is_active:
             return jsonify({'message': 'Usuario no válido'}), 401
         
-        # Get reports from database
+        # Reports are kept up to date by the catalog sync, never fetched per request
         reports = Report.query.filter_by(is_active=True).all()
         
-        # If no reports in database, get from Power BI API
-        if not reports:
-            powerbi_reports = PowerBIService.get_reports_list()
-            return jsonify(powerbi_reports), 200
-        
         # Return reports from database
         return jsonify([report.to_dict() for report in reports]), 200
         
@@ -61,8 +88,7 @@ def get_reports():
 def create_report():
     """Create a new report entry (admin only)"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = current_user
         
         if not user or not user.is_admin:
             return jsonify({'message': 'Se requieren privilegios de administrador'}), 403
@@ -92,3 +118,52 @@ def create_report():
         db.session.rollback()
         return jsonify({'message': 'Error al crear reporte'}), 500
 
+
+@powerbi_bp.route('/powerbi/catalog-sync', methods=['GET'])
+@jwt_required()
+def get_catalog_sync_runs():
+    """Get recent report catalog sync runs (admin only)"""
+    try:
+        user = current_user
+        
+        if not user or not user.is_admin:
+            return jsonify({'message': 'Se requieren privilegios de administrador'}), 403
+        
+        runs = CatalogSyncService.get_recent_runs()
+        
+        return jsonify([run.to_dict() for run in runs]), 200
+        
+    except Exception as e:
+        return jsonify({'message': 'Error al obtener sincronizaciones del catálogo'}), 500
+
+@powerbi_bp.route('/powerbi/catalog-sync', methods=['POST'])
+@jwt_required()
+def run_catalog_sync():
+    """Sync the report catalog from Power BI now (admin only)"""
+    try:
+        user = current_user
+        
+        if not user or not user.is_admin:
+            return jsonify({'message': 'Se requieren privilegios de administrador'}), 403
+        
+        run = CatalogSyncService.sync()
+        
+        return jsonify(run.to_dict()), 200
+        
+    except Exception as e:
+        return jsonify({'message': 'Error al sincronizar catálogo de reportes'}), 500
+
+@powerbi_bp.route('/powerbi/cache-stats', methods=['GET'])
+@jwt_required()
+def get_cache_stats():
+    """Get Power BI token cache counters (admin only)"""
+    try:
+        user = current_user
+        
+        if not user or not user.is_admin:
+            return jsonify({'message': 'Se requieren privilegios de administrador'}), 403
+        
+        return jsonify(PowerBIService.get_cache_stats()), 200
+        
+    except Exception as e:
+        return jsonify({'message': 'Error al obtener estadísticas de caché'}), 500
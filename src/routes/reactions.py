@@ -1,31 +1,147 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, current_user
 from marshmallow import ValidationError
-from src.models.user import User, db
+from src.models.user import db
 from src.models.reaction import Reaction
-from src.models.report import Report
+from src.models.report import Report, ReportVersion
 from src.utils.schemas import ReactionSchema
+from src.services.write_behind import consistent_reads, get_write_behind
+from src.services.response_cache import cached_json_response
+from src.services.event_bus import publish_event
 
 reactions_bp = Blueprint('reactions', __name__)
 
+MAX_BULK_REPORTS = 500
+
+def apply_pending_reactions(stats, deltas):
+    """Add not yet flushed write-behind deltas to a report's stats"""
+    if not deltas:
+        return stats
+    counts = {stat['tipo']: stat['count'] for stat in stats}
+    for reaction_type, delta in deltas.items():
+        counts[reaction_type] = counts.get(reaction_type, 0) + delta
+    return [
+        {'tipo': reaction_type, 'count': count}
+        for reaction_type, count in sorted(counts.items()) if count > 0
+    ]
+
+def with_default_stats(stats):
+    """Stats for a report nobody reacted to yet list every type with count 0"""
+    if stats:
+        return stats
+    return [
+        {'tipo': 'me_interesa', 'count': 0},
+        {'tipo': 'increible', 'count': 0},
+        {'tipo': 'aporta', 'count': 0}
+    ]
+
+def get_report_reaction_stats(report_id):
+    """Get a report's reaction stats, including not yet flushed reactions"""
+    with consistent_reads():
+        stats = Reaction.get_reaction_stats(report_id)
+        
+        # Reactions still waiting in the write-behind buffer
+        write_behind = get_write_behind()
+        if write_behind:
+            stats = apply_pending_reactions(stats, write_behind.reaction_deltas(report_id))
+    
+    return with_default_stats(stats)
+
+def get_user_report_reactions(user_id, report_id):
+    """Get a user's reactions on a report, including a not yet flushed one"""
+    with consistent_reads():
+        reactions = Reaction.query.filter_by(
+            user_id=user_id,
+            report_id=report_id
+        ).all()
+        
+        # A reaction still waiting in the write-behind buffer replaces the stored ones
+        write_behind = get_write_behind()
+        buffered, reaction_type = write_behind.reaction_override(user_id, report_id) if write_behind else (False, None)
+    
+    reactions_data = [reaction.to_dict() for reaction in reactions]
+    
+    if buffered:
+        reactions_data = [data for data in reactions_data if data['tipo'] == reaction_type]
+        if reaction_type and not reactions_data:
+            reactions_data = [{
+                'id': None,
+                'user_id': user_id,
+                'report_id': report_id,
+                'tipo': reaction_type,
+                'created_at': None
+            }]
+    
+    return reactions_data
+
 @reactions_bp.route('/reactions', methods=['GET'])
 def get_reactions():
-    """Get reaction statistics for a report"""
+    """Get reaction statistics for a report, with an ETag derived from its reactions version"""
     try:
         report_id = request.args.get('report_id', 1, type=int)  # Default to report 1
         
-        # Get reaction statistics
-        stats = Reaction.get_reaction_stats(report_id)
+        # Stats are the same for every viewer
+        write_behind = get_write_behind()
+        cache_key = (
+            'reactions', report_id, ReportVersion.get(report_id)[1],
+            write_behind.generation if write_behind else 0
+        )
+        
+        def build_response():
+            return jsonify(get_report_reaction_stats(report_id))
+        
+        # 304 on a matching If-None-Match, before any reaction query runs
+        return cached_json_response(cache_key, build_response)
         
-        # If no reactions found, return default structure
-        if not stats:
-            stats = [
-                {'tipo': 'me_interesa', 'count': 0},
-                {'tipo': 'increible', 'count': 0},
-                {'tipo': 'aporta', 'count': 0}
+    except Exception as e:
+        return jsonify({'message': 'Error al obtener reacciones'}), 500
+
+@reactions_bp.route('/reactions/stats', methods=['GET'])
+def get_reactions_bulk():
+    """Get reaction statistics for many reports at once
+    
+    ``report_ids`` is a comma-separated list of report ids; without it,
+    every active report is included. Returns ``{report_id: stats}`` with the
+    same stats as GET /reactions, and an ETag derived from the reports'
+    reactions versions.
+    """
+    try:
+        report_ids_param = request.args.get('report_ids')
+        if report_ids_param:
+            try:
+                report_ids = sorted({int(report_id) for report_id in report_ids_param.split(',') if report_id.strip()})
+            except ValueError:
+                return jsonify({'message': 'report_ids inválidos'}), 400
+            if len(report_ids) > MAX_BULK_REPORTS:
+                return jsonify({'message': f'Máximo {MAX_BULK_REPORTS} reportes por solicitud'}), 400
+        else:
+            report_ids = [
+                row.id for row in db.session.query(Report.id).filter(
+                    Report.is_active == True
+                ).order_by(Report.id).all()
             ]
         
-        return jsonify(stats), 200
+        # One version lookup for all the reports; any reaction on any of them changes the key
+        write_behind = get_write_behind()
+        versions = ReportVersion.get_many(report_ids)
+        cache_key = (
+            'reaction_stats', tuple(report_ids),
+            tuple(versions[report_id][1] for report_id in report_ids),
+            write_behind.generation if write_behind else 0
+        )
+        
+        def build_response():
+            result = {}
+            with consistent_reads():
+                stats_by_report = Reaction.get_reaction_stats_bulk(report_ids)
+                for report_id, stats in stats_by_report.items():
+                    if write_behind:
+                        stats = apply_pending_reactions(stats, write_behind.reaction_deltas(report_id))
+                    result[str(report_id)] = with_default_stats(stats)
+            
+            return jsonify(result)
+        
+        return cached_json_response(cache_key, build_response)
         
     except Exception as e:
         return jsonify({'message': 'Error al obtener reacciones'}), 500
@@ -35,8 +151,7 @@ def get_reactions():
 def create_reaction():
     """Create or update a reaction"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = current_user
         
         if not user or not user.is_active:
             return jsonify({'message': 'Usuario no válido'}), 401
@@ -62,38 +177,33 @@ def create_reaction():
             db.session.flush()  # Get the ID without committing
             report_id = report.id
         
-        # Check if user already has this reaction for this report
-        existing_reaction = Reaction.query.filter_by(
-            user_id=current_user_id,
-            report_id=report_id,
-            reaction_type=reaction_type
-        ).first()
-        
-        if existing_reaction:
-            # Remove existing reaction (toggle off)
-            db.session.delete(existing_reaction)
-            action = 'removed'
+        # Buffer the toggle when write-behind is enabled and has room
+        write_behind = get_write_behind()
+        result = write_behind.toggle_reaction(user.id, report_id, reaction_type) if write_behind else None
+        
+        if result:
+            action, current_type = result
         else:
-            # Remove any other reaction from this user for this report
-            other_reactions = Reaction.query.filter_by(
-                user_id=current_user_id,
-                report_id=report_id
-            ).all()
-            
-            for reaction in other_reactions:
-                db.session.delete(reaction)
+            # Toggle: the same reaction again removes it, a different one replaces the current one
+            current_type = Reaction.get_user_reaction_type(user.id, report_id)
             
-            # Add new reaction
-            new_reaction = Reaction(
-                user_id=current_user_id,
-                report_id=report_id,
-                reaction_type=reaction_type
-            )
-            db.session.add(new_reaction)
-            action = 'added'
+            if current_type == reaction_type:
+                Reaction.set_user_reaction(user.id, report_id, None)
+                action = 'removed'
+            else:
+                Reaction.set_user_reaction(user.id, report_id, reaction_type)
+                action = 'added'
         
         db.session.commit()
         
+        # Counter deltas for live clients
+        deltas = {}
+        if current_type:
+            deltas[current_type] = -1
+        if action == 'added':
+            deltas[reaction_type] = 1
+        publish_event(report_id, 'reactions', {'report_id': report_id, 'deltas': deltas})
+        
         return jsonify({
             'success': True,
             'action': action,
@@ -111,8 +221,7 @@ def create_reaction():
 def get_user_reactions():
     """Get current user's reactions for a report"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = current_user
         
         if not user or not user.is_active:
             return jsonify({'message': 'Usuario no válido'}), 401
@@ -120,12 +229,9 @@ def get_user_reactions():
         report_id = request.args.get('report_id', 1, type=int)
         
         # Get user's reactions for this report
-        reactions = Reaction.query.filter_by(
-            user_id=current_user_id,
-            report_id=report_id
-        ).all()
+        reactions_data = get_user_report_reactions(user.id, report_id)
         
-        return jsonify([reaction.to_dict() for reaction in reactions]), 200
+        return jsonify(reactions_data), 200
         
     except Exception as e:
         return jsonify({'message': 'Error al obtener reacciones del usuario'}), 500
@@ -0,0 +1,132 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from flask import Blueprint, Response, current_app, jsonify
+from flask_jwt_extended import jwt_required, current_user
+from src.models.user import db
+from src.models.report import Report
+from src.services.event_bus import SubscriberLimitError, format_event, get_event_bus
+from src.services.powerbi_service import PowerBIService
+from src.routes.comments import DEFAULT_PAGE_SIZE, get_comments_page
+from src.routes.reactions import get_report_reaction_stats, get_user_report_reactions
+from src.utils.decorators import get_current_user_id
+
+reports_bp = Blueprint('reports', __name__)
+
+# Runs Power BI embed token requests next to the bootstrap's database queries
+_embed_executor = None
+_embed_executor_lock = threading.Lock()
+
+def _get_embed_executor():
+    global _embed_executor
+    if _embed_executor is None:
+        with _embed_executor_lock:
+            if _embed_executor is None:
+                _embed_executor = ThreadPoolExecutor(
+                    max_workers=current_app.config.get('BOOTSTRAP_EMBED_WORKERS', 16),
+                    thread_name_prefix='bootstrap-embed'
+                )
+    return _embed_executor
+
+@reports_bp.route('/reports/<int:report_id>/bootstrap', methods=['GET'])
+@jwt_required()
+def report_bootstrap(report_id):
+    """Get everything needed to open a report in one request
+    
+    Returns the report, its embed config, the first page of comments, the
+    reaction stats and the viewer's own reactions. The Power BI embed token
+    is requested concurrently with the database queries; if it fails or is
+    too slow, ``embed`` is null and the rest is still returned.
+    """
+    try:
+        current_user_id = get_current_user_id()
+        user = current_user
+        
+        if not user or not user.is_active:
+            return jsonify({'message': 'Usuario no válido'}), 401
+        
+        report = Report.query.get(report_id)
+        if not report or not report.is_active:
+            return jsonify({'message': 'Reporte no encontrado'}), 404
+        
+        app = current_app._get_current_object()
+        powerbi_report_id = report.powerbi_report_id
+        dataset_id = report.dataset_id
+        user_permissions = user.to_dict()
+        
+        def fetch_embed():
+            with app.app_context():
+                return PowerBIService.generate_embed_token(
+                    report_id=powerbi_report_id,
+                    user_permissions=user_permissions,
+                    dataset_id=dataset_id
+                )
+        
+        embed_future = _get_embed_executor().submit(fetch_embed)
+        
+        comments, next_cursor = get_comments_page(report_id, DEFAULT_PAGE_SIZE, current_user_id=current_user_id)
+        reactions = get_report_reaction_stats(report_id)
+        user_reactions = get_user_report_reactions(current_user_id, report_id)
+        
+        try:
+            embed = embed_future.result(timeout=current_app.config.get('BOOTSTRAP_EMBED_TIMEOUT', 10))
+        except FutureTimeoutError:
+            current_app.logger.warning(f"Embed token for report {report_id} timed out during bootstrap")
+            embed = None
+        except Exception as e:
+            current_app.logger.error(f"Error getting embed token during bootstrap: {str(e)}")
+            embed = None
+        
+        return jsonify({
+            'report': report.to_dict(),
+            'embed': embed,
+            'comments': comments,
+            'comments_next_cursor': next_cursor,
+            'reactions': reactions,
+            'user_reactions': user_reactions
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'message': 'Error al cargar el reporte'}), 500
+
+@reports_bp.route('/reports/<int:report_id>/events', methods=['GET'])
+def report_events(report_id):
+    """Stream a report's comment, like and reaction events (Server-Sent Events)
+    
+    Events: ``comment_created``, ``comment_deleted``, ``comment_likes`` and
+    ``reactions`` (counter deltas by type). A ``resync`` event means the
+    client fell behind and should refetch /comments and /reactions.
+    """
+    try:
+        report = db.session.query(Report.id).filter_by(id=report_id).first()
+        if not report:
+            return jsonify({'message': 'Reporte no encontrado'}), 404
+        
+        bus = get_event_bus()
+        subscription = bus.subscribe(report_id)
+    except SubscriberLimitError:
+        return jsonify({'message': 'Servidor ocupado, intente más tarde'}), 503, {'Retry-After': '5'}
+    except Exception as e:
+        return jsonify({'message': 'Error al abrir el stream de eventos'}), 500
+    finally:
+        # The stream can stay open for hours: never hold a database connection for it
+        db.session.remove()
+    
+    heartbeat = current_app.config.get('SSE_HEARTBEAT_SECONDS', 15)
+    
+    def stream():
+        try:
+            yield 'retry: 3000\n\n'
+            while not subscription.closed:
+                events = subscription.wait(heartbeat)
+                if not events:
+                    # Keeps proxies from closing idle connections and detects gone clients
+                    yield ': keepalive\n\n'
+                    continue
+                yield ''.join(format_event(*event) for event in events)
+        finally:
+            bus.unsubscribe(subscription)
+    
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
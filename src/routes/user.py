@@ -1,5 +1,9 @@
 from flask import Blueprint, jsonify, request
-from src.models.user import User, db
+from src.models.user import User, UserTokenVersion, db
+from src.services.user_cache import get_user_cache
+from src.services.token_revocation import get_token_versions
+from src.services.password_hasher import HasherBusyError, get_password_hasher
+from src.utils.decorators import admin_required, get_current_user_id
 
 user_bp = Blueprint('user', __name__)
 
@@ -15,7 +19,10 @@ def create_user():
         username=data['username'],
         email=data['email']
     )
-    user.set_password(data['password'])  # ✅ Esta línea es nueva
+    try:
+        user.password_hash = get_password_hasher().hash(data['password'])
+    except HasherBusyError:
+        return jsonify({'message': 'Servidor ocupado, intente más tarde'}), 503, {'Retry-After': '1'}
     db.session.add(user)
     db.session.commit()
     return jsonify(user.to_dict()), 201
@@ -26,17 +33,44 @@ def get_user(user_id):
     return jsonify(user.to_dict())
 
 @user_bp.route('/users/<int:user_id>', methods=['PUT'])
+@admin_required()
 def update_user(user_id):
     user = User.query.get_or_404(user_id)
     data = request.json
+    
+    # Admins cannot change their own role or deactivate themselves
+    changes_role = 'esAdmin' in data and bool(data['esAdmin']) != user.is_admin
+    changes_state = 'is_active' in data and bool(data['is_active']) != user.is_active
+    if user_id == get_current_user_id() and (changes_role or changes_state):
+        return jsonify({'message': 'No puedes cambiar tu propio rol o estado'}), 403
+    
     user.username = data.get('username', user.username)
     user.email = data.get('email', user.email)
+    
+    # Demotion or deactivation revokes the tokens already issued with the old claims
+    revoke = False
+    if 'esAdmin' in data and bool(data['esAdmin']) != user.is_admin:
+        user.is_admin = bool(data['esAdmin'])
+        revoke = not user.is_admin
+    if 'is_active' in data and bool(data['is_active']) != user.is_active:
+        user.is_active = bool(data['is_active'])
+        revoke = revoke or not user.is_active
+    if revoke:
+        UserTokenVersion.bump(user_id)
+    
     db.session.commit()
+    get_user_cache().invalidate(user_id)
+    if revoke:
+        get_token_versions().reload(user_id)
     return jsonify(user.to_dict())
 
 @user_bp.route('/users/<int:user_id>', methods=['DELETE'])
+@admin_required()
 def delete_user(user_id):
     user = User.query.get_or_404(user_id)
     db.session.delete(user)
+    UserTokenVersion.bump(user_id)
     db.session.commit()
+    get_user_cache().invalidate(user_id)
+    get_token_versions().reload(user_id)
     return '', 204
@@ -0,0 +1,214 @@
+"""Production server: ``python -m src.serve [--worker-class sync|gthread|gevent] ...``
+
+Runs the app under gunicorn with the app preloaded in the master, so workers
+share its memory copy-on-write. Settings default to the SERVER_* values in
+src/config.py; command-line options override them. Send SIGHUP to reload
+workers gracefully and SIGTERM to drain and stop.
+
+The write-behind buffer is per process, so WRITE_BEHIND_ENABLED requires a
+single worker (scale it with threads or gevent instead). The report catalog
+is synced by one ``flask sync-reports --interval`` process started next to
+the workers, never by the workers themselves.
+"""
+import importlib.util
+import os
+import subprocess
+import sys
+import threading
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+import click
+from src.config import Config
+
+
+def build_options(config, **overrides):
+    """Build gunicorn settings from config, with non-None overrides applied"""
+    options = {
+        'bind': config.SERVER_BIND,
+        'worker_class': config.SERVER_WORKER_CLASS,
+        'workers': config.SERVER_WORKERS,
+        'threads': config.SERVER_THREADS,
+        'worker_connections': config.SERVER_WORKER_CONNECTIONS,
+        'timeout': config.SERVER_TIMEOUT,
+        'graceful_timeout': config.SERVER_GRACEFUL_TIMEOUT,
+        'keepalive': config.SERVER_KEEPALIVE,
+        'max_requests': config.SERVER_MAX_REQUESTS,
+        'max_requests_jitter': config.SERVER_MAX_REQUESTS_JITTER,
+        'preload_app': config.SERVER_PRELOAD,
+        'accesslog': config.SERVER_ACCESS_LOG or None
+    }
+    for key, value in overrides.items():
+        if value is not None:
+            options[key] = value
+    if options['worker_class'] != 'gthread':
+        options['threads'] = 1
+    return options
+
+
+def limit_streams(app, options):
+    """Cap SSE streams per worker so they cannot take every request thread
+
+    Under sync and gthread workers a stream holds its thread for as long as
+    it is open; one thread is always left for regular requests. gevent
+    workers serve streams on greenlets and keep the configured limit.
+    """
+    if options['worker_class'] == 'gevent':
+        return
+
+    event_bus = app.extensions['event_bus']
+    limit = max(0, options['threads'] - 1)
+    if event_bus.max_subscribers > limit:
+        app.logger.warning(
+            f"SSE streams limited to {limit} per worker with {options['worker_class']} workers "
+            f"({options['threads']} threads); use --worker-class gevent for live events at scale"
+        )
+        event_bus.max_subscribers = limit
+
+
+def catalog_sync_command(config):
+    """Command line of the catalog sync process, or None when the sync is disabled"""
+    interval = config.POWERBI_CATALOG_SYNC_INTERVAL
+    if not interval or not (config.POWERBI_CATALOG_WORKSPACES or config.POWERBI_WORKSPACE_ID):
+        return None
+    return [
+        sys.executable, '-m', 'flask', '--app', 'src.main:create_app',
+        'sync-reports', '--interval', str(interval)
+    ]
+
+
+def when_ready(server):
+    """Start the catalog sync process once, next to the workers"""
+    command = catalog_sync_command(Config)
+    if command is None:
+        return
+    server.catalog_sync = subprocess.Popen(command, cwd=PROJECT_ROOT)
+    server.log.info(f"Catalog sync process started (pid {server.catalog_sync.pid})")
+
+
+def on_exit(server):
+    """Stop the catalog sync process with the server"""
+    process = getattr(server, 'catalog_sync', None)
+    if process is not None and process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def post_fork(server, worker):
+    """Drop database connections inherited from the master; each worker opens its own"""
+    app = server.app.application
+    if app is None:
+        return
+
+    from src.models.user import db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    """End SSE streams as soon as the worker starts shutting down, so it can drain within graceful_timeout"""
+    def close_streams_on_exit():
+        while worker.alive:
+            time.sleep(0.5)
+        event_bus = worker.app.application.extensions.get('event_bus')
+        if event_bus is not None:
+            event_bus.close()
+
+    threading.Thread(target=close_streams_on_exit, name='drain-streams', daemon=True).start()
+
+
+def worker_exit(server, worker):
+    """Once a worker has drained: flush buffered writes and stop the hashing pool"""
+    app = worker.app.application
+    if app is None:
+        return
+
+    write_behind = app.extensions.get('write_behind')
+    if write_behind is not None:
+        write_behind.stop()
+
+    password_hasher = app.extensions.get('password_hasher')
+    if password_hasher is not None:
+        password_hasher.shutdown()
+
+
+def run(options):
+    from gunicorn.app.base import BaseApplication
+
+    class Server(BaseApplication):
+
+        def __init__(self, options):
+            self.options = options
+            self.application = None
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+            self.cfg.set('when_ready', when_ready)
+            self.cfg.set('on_exit', on_exit)
+            self.cfg.set('post_fork', post_fork)
+            self.cfg.set('post_worker_init', post_worker_init)
+            self.cfg.set('worker_exit', worker_exit)
+
+        def load(self):
+            # With preload_app this runs once in the master, before forking
+            if self.application is None:
+                from src.main import create_app
+
+                self.application = create_app()
+                # Synced by the catalog sync process instead (see when_ready)
+                self.application.config['POWERBI_CATALOG_SYNC_IN_PROCESS'] = False
+                limit_streams(self.application, self.options)
+            return self.application
+
+    Server(options).run()
+
+
+@click.command()
+@click.option('--bind', help='Address to listen on (host:port).')
+# The default goes through the choice too, so an unknown SERVER_WORKER_CLASS is rejected
+@click.option('--worker-class', type=click.Choice(('sync', 'gthread', 'gevent')), default=Config.SERVER_WORKER_CLASS,
+              show_default=True, help='Worker model.')
+@click.option('--workers', type=int, help='Worker processes.')
+@click.option('--threads', type=int, help='Threads per worker (gthread).')
+@click.option('--worker-connections', type=int, help='Concurrent connections per worker (gevent).')
+@click.option('--preload/--no-preload', 'preload_app', default=None, help='Load the app before forking.')
+def main(bind, worker_class, workers, threads, worker_connections, preload_app):
+    """Serve the application with gunicorn."""
+    options = build_options(
+        Config,
+        bind=bind,
+        worker_class=worker_class,
+        workers=workers,
+        threads=threads,
+        worker_connections=worker_connections,
+        preload_app=preload_app
+    )
+
+    if Config.WRITE_BEHIND_ENABLED and options['workers'] > 1:
+        # Each worker would buffer its own toggles, invisible to the others' reads
+        raise click.ClickException('WRITE_BEHIND_ENABLED requiere un solo worker (--workers 1)')
+
+    if importlib.util.find_spec('gunicorn') is None:
+        raise click.ClickException('gunicorn no está instalado (pip install gunicorn)')
+
+    if options['worker_class'] == 'gevent':
+        if importlib.util.find_spec('gevent') is None:
+            raise click.ClickException('gevent no está instalado (pip install gevent)')
+        from gevent import monkey
+        # Patch before the app is loaded, so the preloaded app's locks and sockets are cooperative
+        monkey.patch_all()
+
+    run(options)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from src.models.user import db
+from src.models.report import Report, CatalogSyncRun
+from src.services.powerbi_service import PowerBIService
+
+
+class CatalogSyncService:
+
+    @staticmethod
+    def get_workspaces():
+        """Get the workspaces whose reports are synced into the catalog"""
+        workspaces = current_app.config.get('POWERBI_CATALOG_WORKSPACES')
+        if not workspaces:
+            workspaces = [current_app.config.get('POWERBI_WORKSPACE_ID')]
+        return [workspace for workspace in workspaces if workspace]
+
+    @staticmethod
+    def sync(workspace_ids=None):
+        """Sync Power BI reports into the reports table
+
+        Reports are upserted by powerbi_report_id and only written when a field
+        changed. Active reports that disappeared from a workspace are
+        deactivated; workspaces that could not be listed are left untouched.
+        """
+        if workspace_ids is None:
+            workspace_ids = CatalogSyncService.get_workspaces()
+
+        started_at = datetime.utcnow()
+        started = time.perf_counter()
+        run = CatalogSyncRun(
+            started_at=started_at,
+            workspaces=','.join(workspace_ids),
+            inserted=0,
+            updated=0,
+            deactivated=0,
+            unchanged=0,
+            status='success'
+        )
+
+        try:
+            failed = []
+            for workspace_id in workspace_ids:
+                powerbi_reports = PowerBIService.fetch_workspace_reports(workspace_id)
+                if powerbi_reports is None:
+                    failed.append(workspace_id)
+                    continue
+                CatalogSyncService._sync_workspace(workspace_id, powerbi_reports, run)
+
+            if failed:
+                run.status = 'partial' if len(failed) < len(workspace_ids) else 'failed'
+                run.error = f"No se pudieron listar los workspaces: {', '.join(failed)}"[:500]
+
+            run.duration_ms = int((time.perf_counter() - started) * 1000)
+            db.session.add(run)
+            db.session.commit()
+
+        except Exception as e:
+            db.session.rollback()
+            run = CatalogSyncRun(
+                started_at=started_at,
+                workspaces=','.join(workspace_ids),
+                duration_ms=int((time.perf_counter() - started) * 1000),
+                inserted=0,
+                updated=0,
+                deactivated=0,
+                unchanged=0,
+                status='failed',
+                error=str(e)[:500]
+            )
+            db.session.add(run)
+            db.session.commit()
+
+        current_app.logger.info(
+            f"Catalog sync {run.status} in {run.duration_ms}ms: {run.inserted} inserted, "
+            f"{run.updated} updated, {run.deactivated} deactivated, {run.unchanged} unchanged"
+        )
+        return run
+
+    @staticmethod
+    def _sync_workspace(workspace_id, powerbi_reports, run):
+        """Upsert one workspace's reports, counting row changes on ``run``"""
+        report_ids = [report['id'] for report in powerbi_reports if report.get('id')]
+
+        existing = {}
+        if report_ids:
+            for report in Report.query.filter(Report.powerbi_report_id.in_(report_ids)).all():
+                existing[report.powerbi_report_id] = report
+
+        for powerbi_report in powerbi_reports:
+            report_id = powerbi_report.get('id')
+            if not report_id:
+                continue
+
+            values = {
+                'name': (powerbi_report.get('name') or report_id)[:100],
+                'description': (powerbi_report.get('description') or '')[:500],
+                'powerbi_workspace_id': workspace_id,
+                'embed_url': powerbi_report.get('embedUrl'),
+                'dataset_id': powerbi_report.get('datasetId'),
+                'is_active': True
+            }
+
+            report = existing.get(report_id)
+            if report is None:
+                db.session.add(Report(powerbi_report_id=report_id, **values))
+                run.inserted += 1
+                continue
+
+            changed = False
+            for field, value in values.items():
+                if getattr(report, field) != value:
+                    setattr(report, field, value)
+                    changed = True
+
+            if changed:
+                run.updated += 1
+            else:
+                run.unchanged += 1
+
+        # Deactivate reports that are no longer in the workspace
+        stale_query = Report.query.filter(
+            Report.powerbi_workspace_id == workspace_id,
+            Report.is_active == True
+        )
+        if report_ids:
+            stale_query = stale_query.filter(~Report.powerbi_report_id.in_(report_ids))
+
+        for report in stale_query.all():
+            report.is_active = False
+            run.deactivated += 1
+
+    @staticmethod
+    def get_recent_runs(limit=20):
+        """Get the most recent sync runs"""
+        return CatalogSyncRun.query.order_by(CatalogSyncRun.started_at.desc()).limit(limit).all()
+
+
+class CatalogSyncWorker:
+    """Background thread running CatalogSyncService.sync every ``interval`` seconds"""
+
+    def __init__(self, app, interval):
+        self.app = app
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='catalog-sync', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    CatalogSyncService.sync()
+            except Exception as e:
+                self.app.logger.error(f"Error syncing report catalog: {str(e)}")
+            self._stop.wait(self.interval)
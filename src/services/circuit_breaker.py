@@ -0,0 +1,97 @@
+import threading
+import time
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open"""
+
+    def __init__(self, name, retry_in):
+        super().__init__(f"Circuit '{name}' is open, retry in {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Closed / open / half-open circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail fast for ``recovery_timeout`` seconds. It then goes half-open
+    and lets ``half_open_max_calls`` trial calls through: a success closes the
+    circuit again, a failure re-opens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=5, recovery_timeout=30, half_open_max_calls=1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self.total_failures = 0
+        self.rejected_calls = 0
+
+    def before_call(self):
+        """Reserve a call, or raise CircuitOpenError when the circuit is open"""
+        with self._lock:
+            if self._state == self.OPEN:
+                retry_in = self._opened_at + self.recovery_timeout - time.monotonic()
+                if retry_in > 0:
+                    self.rejected_calls += 1
+                    raise CircuitOpenError(self.name, retry_in)
+                self._state = self.HALF_OPEN
+                self._half_open_calls = 0
+
+            if self._state == self.HALF_OPEN:
+                if self._half_open_calls >= self.half_open_max_calls:
+                    self.rejected_calls += 1
+                    raise CircuitOpenError(self.name, 0)
+                self._half_open_calls += 1
+
+    def release_call(self):
+        """Give back a reserved call that ended without a success or failure verdict"""
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._half_open_calls > 0:
+                self._half_open_calls -= 1
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._half_open_calls = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self.total_failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._half_open_calls = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() >= self._opened_at + self.recovery_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def to_dict(self):
+        """Convert breaker state to dictionary"""
+        state = self.state
+        with self._lock:
+            return {
+                'name': self.name,
+                'state': state,
+                'consecutive_failures': self._failures,
+                'total_failures': self.total_failures,
+                'rejected_calls': self.rejected_calls,
+                'retry_in': max(0.0, round(self._opened_at + self.recovery_timeout - time.monotonic(), 1))
+                if state == self.OPEN else 0.0
+            }
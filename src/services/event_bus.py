@@ -0,0 +1,140 @@
+import itertools
+import json
+import threading
+from collections import deque
+from flask import current_app
+
+
+class SubscriberLimitError(Exception):
+    """Raised when the event bus already has as many subscribers as it accepts"""
+
+
+class Subscription:
+    """One client's bounded event buffer for a report"""
+
+    def __init__(self, bus, report_id, max_buffer):
+        self.bus = bus
+        self.report_id = report_id
+        self.max_buffer = max_buffer
+        self._events = deque()
+        self._ready = threading.Condition(threading.Lock())
+        self._resync = False
+        self.closed = False
+
+    def push(self, event):
+        """Queue an event; on overflow the buffer is replaced by a single resync"""
+        with self._ready:
+            if self._resync:
+                return
+            if len(self._events) >= self.max_buffer:
+                # Slow client: drop what it missed and tell it to refetch instead
+                self._events.clear()
+                self._resync = True
+                self.bus._count('resyncs')
+            else:
+                self._events.append(event)
+            self._ready.notify()
+
+    def wait(self, timeout):
+        """Wait up to ``timeout`` seconds and return the queued events (empty on timeout)"""
+        with self._ready:
+            if not self._events and not self._resync and not self.closed:
+                self._ready.wait(timeout)
+            if self._resync:
+                self._resync = False
+                return [(next(self.bus._ids), 'resync', {'report_id': self.report_id})]
+            events = list(self._events)
+            self._events.clear()
+            return events
+
+    def close(self):
+        with self._ready:
+            self.closed = True
+            self._ready.notify()
+
+
+class EventBus:
+    """In-process pub/sub of report events for SSE streams.
+
+    Publishing only copies the report's subscriber list under the bus lock
+    and appends to each bounded buffer, so a slow or stalled client costs at
+    most ``subscriber_buffer`` events of memory and never blocks writers.
+    Events only reach clients connected to the same process.
+    """
+
+    def __init__(self, subscriber_buffer=100, max_subscribers=5000):
+        self.subscriber_buffer = subscriber_buffer
+        self.max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._ids = itertools.count(1)
+        self._subscriber_count = 0
+        self.published = 0
+        self.resyncs = 0
+
+    def subscribe(self, report_id):
+        """Register a subscriber for a report's events"""
+        with self._lock:
+            if self._subscriber_count >= self.max_subscribers:
+                raise SubscriberLimitError()
+            subscription = Subscription(self, report_id, self.subscriber_buffer)
+            self._subscribers.setdefault(report_id, set()).add(subscription)
+            self._subscriber_count += 1
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.report_id)
+            if subscribers is None or subscription not in subscribers:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.report_id]
+            self._subscriber_count -= 1
+
+    def publish(self, report_id, event, data):
+        """Send an event to every subscriber of a report (call after the write is committed)"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(report_id, ()))
+            self.published += 1
+        if not subscribers:
+            return
+        message = (next(self._ids), event, data)
+        for subscription in subscribers:
+            subscription.push(message)
+
+    def close(self):
+        """Wake every subscriber so its stream ends"""
+        with self._lock:
+            subscribers = [s for report_subscribers in self._subscribers.values() for s in report_subscribers]
+        for subscription in subscribers:
+            subscription.close()
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self):
+        """Return bus counters"""
+        with self._lock:
+            return {
+                'subscribers': self._subscriber_count,
+                'reports': len(self._subscribers),
+                'published': self.published,
+                'resyncs': self.resyncs
+            }
+
+
+def format_event(event_id, event, data):
+    """Serialize an event as a Server-Sent Events frame"""
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def get_event_bus():
+    """Get the application's event bus"""
+    return current_app.extensions['event_bus']
+
+
+def publish_event(report_id, event, data):
+    """Publish a report event on the application's event bus"""
+    get_event_bus().publish(report_id, event, data)
@@ -0,0 +1,152 @@
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+
+from src.services.circuit_breaker import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying: throttling and transient server errors
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+
+class PowerBIHttpClient:
+    """HTTP client shared by every Power BI / Azure AD call.
+
+    Wraps a single keep-alive ``requests.Session`` with a bounded connection
+    pool, applies connect/read timeouts to every call, retries throttled and
+    transient failures with jittered exponential backoff (honoring
+    ``Retry-After``) and logs the latency of each call. Each host gets its own
+    circuit breaker, so an outage fails fast instead of tying up workers.
+    """
+
+    def __init__(self, connect_timeout=3.05, read_timeout=15, max_retries=3,
+                 backoff_factor=0.5, backoff_max=10, pool_size=20,
+                 breaker_failure_threshold=5, breaker_recovery_timeout=30):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.breaker_failure_threshold = breaker_failure_threshold
+        self.breaker_recovery_timeout = breaker_recovery_timeout
+        self._breakers = {}
+        self._breakers_lock = threading.Lock()
+
+        self.session = requests.Session()
+        # Retries are handled here so Retry-After and logging stay in one place
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def request(self, method, url, **kwargs):
+        """Send a request through the host's circuit breaker.
+
+        Raises CircuitOpenError without touching the network while the
+        circuit is open.
+        """
+        breaker = self.breaker_for(url)
+        breaker.before_call()
+        try:
+            response = self._send_with_retries(method, url, **kwargs)
+        except requests.RequestException:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            # Anything else says nothing about the dependency, but must not keep a half-open slot
+            breaker.release_call()
+            raise
+        if response.status_code in RETRY_STATUSES:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def breaker_for(self, url):
+        """Get the circuit breaker guarding the host of ``url``"""
+        host = urlsplit(url).netloc
+        with self._breakers_lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    host,
+                    failure_threshold=self.breaker_failure_threshold,
+                    recovery_timeout=self.breaker_recovery_timeout
+                )
+                self._breakers[host] = breaker
+            return breaker
+
+    def breaker_states(self):
+        """Return the state of every circuit breaker"""
+        with self._breakers_lock:
+            breakers = list(self._breakers.values())
+        return [breaker.to_dict() for breaker in breakers]
+
+    def _send_with_retries(self, method, url, **kwargs):
+        """Send a request, retrying on 429/5xx and connection errors"""
+        kwargs.setdefault('timeout', self.timeout)
+        attempt = 0
+
+        while True:
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                logger.warning(f"{method} {url} failed after {elapsed_ms:.0f}ms (attempt {attempt + 1}): {e}")
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            logger.info(f"{method} {url} -> {response.status_code} in {elapsed_ms:.0f}ms (attempt {attempt + 1})")
+
+            if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                return response
+
+            delay = self._retry_after(response)
+            if delay is None:
+                delay = self._backoff(attempt)
+            # Release the connection back to the pool before sleeping
+            response.close()
+            time.sleep(min(delay, self.backoff_max))
+            attempt += 1
+
+    def _backoff(self, attempt):
+        """Full-jitter exponential backoff"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_factor * (2 ** attempt)))
+
+    @staticmethod
+    def _retry_after(response):
+        """Parse a Retry-After header given in seconds or as an HTTP date"""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,136 @@
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class HasherBusyError(Exception):
+    """Raised when the hashing pool already has as much work queued as it accepts,
+    or does not finish a hash in time"""
+
+
+def _hash_password(password, method):
+    return generate_password_hash(password, method=method)
+
+
+def _check_password(password_hash, password):
+    return check_password_hash(password_hash, password)
+
+
+class PasswordHasher:
+    """Runs password hashing in a bounded process pool.
+
+    Hashing is CPU-bound and deliberately slow, so it is kept off the request
+    threads. At most ``max_queue`` hashes are queued or running; beyond that
+    callers get HasherBusyError immediately instead of piling up. A slot is
+    only freed when its hash actually finishes, so callers that time out do
+    not let more work in. The pool is created on first use and its processes
+    are spawned, so they never inherit a multithreaded server's state.
+    """
+
+    def __init__(self, method='scrypt', workers=2, max_queue=32, timeout=10):
+        self.method = method
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_queue)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._hash_prefix = None
+
+    def hash(self, password):
+        """Hash a password with the configured method"""
+        return self._run(_hash_password, password, self.method)
+
+    def verify(self, password_hash, password):
+        """Check a password against a stored hash"""
+        return self._run(_check_password, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """Whether a stored hash was made with other method or cost parameters"""
+        if self._hash_prefix is None:
+            # e.g. "scrypt:32768:8:1", with werkzeug's defaults filled in
+            self._hash_prefix = self.hash('').split('$', 1)[0]
+        return password_hash.split('$', 1)[0] != self._hash_prefix
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusyError()
+        try:
+            future = self._get_executor().submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Still queued: drop it; already running: its slot stays taken until it ends
+            future.cancel()
+            raise HasherBusyError()
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+        return self._executor
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+class LoginThrottle:
+    """Sliding-window attempt limiter keyed by username and by client IP"""
+
+    def __init__(self, max_per_username=10, max_per_ip=50, window=60, max_keys=100000):
+        self.max_per_username = max_per_username
+        self.max_per_ip = max_per_ip
+        self.window = window
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._attempts = {}
+
+    def allow(self, username, ip):
+        """Record an attempt, returns False when the username or IP is over its limit"""
+        now = time.monotonic()
+        keys = (('user', username.lower(), self.max_per_username), ('ip', ip, self.max_per_ip))
+        with self._lock:
+            if len(self._attempts) > self.max_keys:
+                self._prune(now)
+
+            windows = []
+            for kind, value, limit in keys:
+                attempts = self._attempts.setdefault((kind, value), deque())
+                while attempts and attempts[0] <= now - self.window:
+                    attempts.popleft()
+                if len(attempts) >= limit:
+                    return False
+                windows.append(attempts)
+
+            for attempts in windows:
+                attempts.append(now)
+            return True
+
+    def _prune(self, now):
+        for key in [key for key, attempts in self._attempts.items()
+                    if not attempts or attempts[-1] <= now - self.window]:
+            del self._attempts[key]
+
+
+def get_password_hasher():
+    """Get the application's password hasher"""
+    return current_app.extensions['password_hasher']
+
+
+def get_login_throttle():
+    """Get the application's login throttle"""
+    return current_app.extensions['login_throttle']
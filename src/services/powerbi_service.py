@@ -1,23 +1,57 @@
-import requests
 import json
+import threading
 from datetime import datetime, timedelta
 from flask import current_app
+from src.services.circuit_breaker import CircuitOpenError
+from src.services.token_cache import AccessTokenCache, EmbedTokenCache
 
 class PowerBIService:
     
+    # Shared by every request handled by this process
+    token_cache = AccessTokenCache()
+    embed_cache = None
+    http_client = None
+    # Last successful report list, served while Power BI is unavailable
+    last_reports = None
+    _init_lock = threading.Lock()
+    
     @staticmethod
     def get_access_token():
-        """Get access token for Power BI API"""
+        """Get access token for Power BI API (cached until shortly before expiry)"""
         try:
-            tenant_id = current_app.config['POWERBI_TENANT_ID']
-            client_id = current_app.config['POWERBI_CLIENT_ID']
-            client_secret = current_app.config['POWERBI_CLIENT_SECRET']
+            tenant_id = current_app.config.get('POWERBI_TENANT_ID')
+            client_id = current_app.config.get('POWERBI_CLIENT_ID')
+            client_secret = current_app.config.get('POWERBI_CLIENT_SECRET')
             
             if not all([tenant_id, client_id, client_secret]):
                 # Return mock token for development
                 return "mock-powerbi-access-token"
             
-            url = f"https://login.microsoftonline.com/{tenant_id}/oauth2/v2.0/token"
+            refresh_margin = current_app.config.get('POWERBI_TOKEN_REFRESH_MARGIN', 300)
+            
+            return PowerBIService.token_cache.get(
+                (tenant_id, client_id),
+                lambda: PowerBIService._request_access_token(tenant_id, client_id, client_secret),
+                refresh_margin=refresh_margin
+            )
+                
+        except Exception as e:
+            current_app.logger.error(f"Error getting Power BI token: {str(e)}")
+            return None
+    
+    @staticmethod
+    def get_circuit_state():
+        """Get the state of the circuit breakers guarding Power BI and Azure AD"""
+        if PowerBIService.http_client is None:
+            return []
+        return PowerBIService.http_client.breaker_states()
+    
+    @staticmethod
+    def _request_access_token(tenant_id, client_id, client_secret):
+        """Request a new access token from Azure AD, returns (token, expires_in)"""
+        try:
+            authority_url = current_app.config.get('POWERBI_AUTHORITY_URL', 'https://login.microsoftonline.com')
+            url = f"{authority_url}/{tenant_id}/oauth2/v2.0/token"
             
             headers = {
                 'Content-Type': 'application/x-www-form-urlencoded'
@@ -30,26 +64,34 @@ class PowerBIService:
                 'scope': 'https://analysis.windows.net/powerbi/api/.default'
             }
             
-            response = requests.post(url, headers=headers, data=data)
+            response = PowerBIService._get_http_client().post(url, headers=headers, data=data)
             
             if response.status_code == 200:
                 token_data = response.json()
-                return token_data.get('access_token')
+                return token_data.get('access_token'), int(token_data.get('expires_in', 3599))
             else:
                 current_app.logger.error(f"Failed to get Power BI token: {response.text}")
-                return None
+                return None, 0
                 
         except Exception as e:
             current_app.logger.error(f"Error getting Power BI token: {str(e)}")
-            return None
+            return None, 0
     
     @staticmethod
-    def generate_embed_token(report_id=None, user_permissions=None):
-        """Generate embed token for Power BI report"""
+    def get_cache_stats():
+        """Get access token cache counters"""
+        return {
+            'access_token': PowerBIService.token_cache.stats(),
+            'embed_token': PowerBIService.embed_cache.stats() if PowerBIService.embed_cache else None
+        }
+    
+    @staticmethod
+    def generate_embed_token(report_id=None, user_permissions=None, dataset_id=None, access_level='View'):
+        """Generate embed token for Power BI report (cached per report and identity)"""
         try:
             access_token = PowerBIService.get_access_token()
             
-            if not access_token or access_token == "mock-powerbi-access-token":
+            if access_token == "mock-powerbi-access-token":
                 # Return mock data for development
                 return {
                     'embedUrl': 'https://app.powerbi.com/reportEmbed?reportId=sample-report&autoAuth=true&ctid=sample-tenant',
@@ -63,11 +105,68 @@ class PowerBIService:
             if not report_id:
                 report_id = 'default-report-id'
             
+            identity = PowerBIService._effective_identity(user_permissions)
+            cache_key = (workspace_id, report_id, access_level, dataset_id, identity)
+            
+            # Background refreshes run outside the request, so they need their own app context
+            app = current_app._get_current_object()
+            
+            def fetch():
+                with app.app_context():
+                    return PowerBIService._request_embed_token(
+                        workspace_id, report_id, dataset_id, access_level, identity
+                    )
+            
+            embed_cache = PowerBIService._get_embed_cache()
+            
+            embed_data = None
+            if access_token is None:
+                # Azure AD unavailable (or its circuit is open): no new embed token can be requested
+                current_app.logger.warning("No Power BI access token, serving the last known-good embed token")
+            else:
+                try:
+                    embed_data = embed_cache.get(cache_key, fetch)
+                except CircuitOpenError as e:
+                    current_app.logger.warning(f"Power BI unavailable, skipping embed token request: {str(e)}")
+            
+            if embed_data is None:
+                # Degraded mode: last known-good token, as long as it has not expired
+                embed_data = embed_cache.peek(cache_key)
+            
+            if embed_data is None:
+                # Return mock data as fallback
+                return {
+                    'embedUrl': f"https://app.powerbi.com/reportEmbed?reportId={report_id}&groupId={workspace_id}",
+                    'accessToken': 'mock-powerbi-embed-token',
+                    'expiration': (datetime.utcnow() + timedelta(hours=1)).isoformat() + 'Z'
+                }
+            
+            return embed_data
+                
+        except Exception as e:
+            current_app.logger.error(f"Error generating embed token: {str(e)}")
+            # Return mock data as fallback
+            return {
+                'embedUrl': 'https://app.powerbi.com/reportEmbed?reportId=sample-report&autoAuth=true&ctid=sample-tenant',
+                'accessToken': 'mock-powerbi-embed-token',
+                'expiration': (datetime.utcnow() + timedelta(hours=1)).isoformat() + 'Z'
+            }
+    
+    @staticmethod
+    def _request_embed_token(workspace_id, report_id, dataset_id, access_level, identity):
+        """Call GenerateToken for a report, returns None when no token could be generated"""
+        try:
+            access_token = PowerBIService.get_access_token()
+            
+            if not access_token:
+                return None
+            
             # Get embed URL
             embed_url = f"https://app.powerbi.com/reportEmbed?reportId={report_id}&groupId={workspace_id}"
             
             # Generate embed token
-            embed_token_url = f"https://api.powerbi.com/v1.0/myorg/groups/{workspace_id}/reports/{report_id}/GenerateToken"
+            api_url = current_app.config.get('POWERBI_API_URL', 'https://api.powerbi.com')
+            embed_token_url = f"{api_url}/v1.0/myorg/groups/{workspace_id}/reports/{report_id}/GenerateToken"
             
             headers = {
                 'Authorization': f'Bearer {access_token}',
@@ -76,11 +175,18 @@ class PowerBIService:
             
             # Token request body
             token_request = {
-                'accessLevel': 'View',
+                'accessLevel': access_level,
                 'allowSaveAs': False
             }
             
-            response = requests.post(embed_token_url, headers=headers, json=token_request)
+            if identity:
+                username, roles = identity
+                effective_identity = {'username': username, 'roles': list(roles)}
+                if dataset_id:
+                    effective_identity['datasets'] = [dataset_id]
+                token_request['identities'] = [effective_identity]
+            
+            response = PowerBIService._get_http_client().post(embed_token_url, headers=headers, json=token_request)
             
             if response.status_code == 200:
                 token_data = response.json()
@@ -91,21 +197,185 @@ class PowerBIService:
                 }
             else:
                 current_app.logger.error(f"Failed to generate embed token: {response.text}")
+                return None
+                
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            current_app.logger.error(f"Error generating embed token: {str(e)}")
+            return None
+    
+    @staticmethod
+    def generate_multi_embed_token(reports, user_permissions=None):
+        """Generate one embed token covering several reports (GenerateToken v2)
+        
+        ``reports`` is a list of ``(report_id, dataset_id)`` pairs.
+        """
+        try:
+            access_token = PowerBIService.get_access_token()
+            
+            if access_token == "mock-powerbi-access-token":
+                # Return mock data for development
+                return PowerBIService._mock_multi_embed_data(reports, 'sample-workspace')
+            
+            workspace_id = current_app.config['POWERBI_WORKSPACE_ID']
+            identity = PowerBIService._effective_identity(user_permissions)
+            
+            # Order-independent, so every dashboard with the same tiles shares a token
+            resources = tuple(sorted(set((report_id, dataset_id or '') for report_id, dataset_id in reports)))
+            cache_key = (workspace_id, resources, 'View', identity)
+            
+            app = current_app._get_current_object()
+            
+            def fetch():
+                with app.app_context():
+                    return PowerBIService._request_multi_embed_token(workspace_id, resources, identity)
+            
+            embed_cache = PowerBIService._get_embed_cache()
+            
+            embed_data = None
+            if access_token is None:
+                # Azure AD unavailable (or its circuit is open): no new embed token can be requested
+                current_app.logger.warning("No Power BI access token, serving the last known-good embed token")
+            else:
+                try:
+                    embed_data = embed_cache.get(cache_key, fetch)
+                except CircuitOpenError as e:
+                    current_app.logger.warning(f"Power BI unavailable, skipping embed token request: {str(e)}")
+            
+            if embed_data is None:
+                embed_data = embed_cache.peek(cache_key)
+            
+            if embed_data is None:
                 # Return mock data as fallback
+                return PowerBIService._mock_multi_embed_data(reports, workspace_id)
+            
+            return embed_data
+            
+        except Exception as e:
+            current_app.logger.error(f"Error generating multi-report embed token: {str(e)}")
+            return PowerBIService._mock_multi_embed_data(reports, 'sample-workspace')
+    
+    @staticmethod
+    def _request_multi_embed_token(workspace_id, resources, identity):
+        """Call GenerateToken v2 for several reports, returns None when no token could be generated"""
+        try:
+            access_token = PowerBIService.get_access_token()
+            
+            if not access_token:
+                return None
+            
+            api_url = current_app.config.get('POWERBI_API_URL', 'https://api.powerbi.com')
+            url = f"{api_url}/v1.0/myorg/GenerateToken"
+            
+            headers = {
+                'Authorization': f'Bearer {access_token}',
+                'Content-Type': 'application/json'
+            }
+            
+            report_ids = [report_id for report_id, _ in resources]
+            dataset_ids = sorted(set(dataset_id for _, dataset_id in resources if dataset_id))
+            
+            token_request = {
+                'reports': [{'id': report_id, 'allowEdit': False} for report_id in report_ids],
+                'datasets': [{'id': dataset_id} for dataset_id in dataset_ids],
+                'targetWorkspaces': [{'id': workspace_id}]
+            }
+            
+            if identity:
+                username, roles = identity
+                token_request['identities'] = [{
+                    'username': username,
+                    'roles': list(roles),
+                    'datasets': dataset_ids
+                }]
+            
+            response = PowerBIService._get_http_client().post(url, headers=headers, json=token_request)
+            
+            if response.status_code == 200:
+                token_data = response.json()
                 return {
-                    'embedUrl': embed_url,
-                    'accessToken': 'mock-powerbi-embed-token',
-                    'expiration': (datetime.utcnow() + timedelta(hours=1)).isoformat() + 'Z'
+                    'reports': [
+                        {
+                            'reportId': report_id,
+                            'embedUrl': f"https://app.powerbi.com/reportEmbed?reportId={report_id}&groupId={workspace_id}"
+                        }
+                        for report_id in report_ids
+                    ],
+                    'accessToken': token_data.get('token'),
+                    'expiration': token_data.get('expiration')
                 }
+            else:
+                current_app.logger.error(f"Failed to generate multi-report embed token: {response.text}")
+                return None
                 
+        except CircuitOpenError:
+            raise
         except Exception as e:
-            current_app.logger.error(f"Error generating embed token: {str(e)}")
-            # Return mock data as fallback
-            return {
-                'embedUrl': 'https://app.powerbi.com/reportEmbed?reportId=sample-report&autoAuth=true&ctid=sample-tenant',
-                'accessToken': 'mock-powerbi-embed-token',
-                'expiration': (datetime.utcnow() + timedelta(hours=1)).isoformat() + 'Z'
-            }
+            current_app.logger.error(f"Error generating multi-report embed token: {str(e)}")
+            return None
+    
+    @staticmethod
+    def _mock_multi_embed_data(reports, workspace_id):
+        """Mock multi-report embed data for development and fallbacks"""
+        return {
+            'reports': [
+                {
+                    'reportId': report_id,
+                    'embedUrl': f"https://app.powerbi.com/reportEmbed?reportId={report_id}&groupId={workspace_id}"
+                }
+                for report_id, _ in reports
+            ],
+            'accessToken': 'mock-powerbi-embed-token',
+            'expiration': (datetime.utcnow() + timedelta(hours=1)).isoformat() + 'Z'
+        }
+    
+    @staticmethod
+    def _effective_identity(user_permissions):
+        """Build the RLS identity for a user, or None when RLS is disabled"""
+        if not current_app.config.get('POWERBI_RLS_ENABLED') or not user_permissions:
+            return None
+        
+        if user_permissions.get('esAdmin'):
+            role = current_app.config.get('POWERBI_RLS_ADMIN_ROLE', 'Admin')
+        else:
+            role = current_app.config.get('POWERBI_RLS_USER_ROLE', 'User')
+        
+        # Hashable so it can be part of the cache key
+        return (user_permissions['username'], (role,))
+    
+    @staticmethod
+    def _get_http_client():
+        """Get the process-wide Power BI HTTP client, creating it from config on first use"""
+        if PowerBIService.http_client is None:
+            with PowerBIService._init_lock:
+                if PowerBIService.http_client is None:
+                    # Imported here so importing the service does not pull in requests
+                    from src.services.http_client import PowerBIHttpClient
+                    
+                    PowerBIService.http_client = PowerBIHttpClient(
+                        connect_timeout=current_app.config.get('POWERBI_HTTP_CONNECT_TIMEOUT', 3.05),
+                        read_timeout=current_app.config.get('POWERBI_HTTP_READ_TIMEOUT', 15),
+                        max_retries=current_app.config.get('POWERBI_HTTP_MAX_RETRIES', 3),
+                        backoff_factor=current_app.config.get('POWERBI_HTTP_BACKOFF_FACTOR', 0.5),
+                        pool_size=current_app.config.get('POWERBI_HTTP_POOL_SIZE', 20),
+                        breaker_failure_threshold=current_app.config.get('POWERBI_BREAKER_FAILURE_THRESHOLD', 5),
+                        breaker_recovery_timeout=current_app.config.get('POWERBI_BREAKER_RECOVERY_TIMEOUT', 30)
+                    )
+        return PowerBIService.http_client
+    
+    @staticmethod
+    def _get_embed_cache():
+        """Get the process-wide embed token cache, creating it from config on first use"""
+        if PowerBIService.embed_cache is None:
+            with PowerBIService._init_lock:
+                if PowerBIService.embed_cache is None:
+                    PowerBIService.embed_cache = EmbedTokenCache(
+                        max_entries=current_app.config.get('POWERBI_EMBED_CACHE_SIZE', 256),
+                        safety_margin=current_app.config.get('POWERBI_EMBED_TOKEN_MARGIN', 300),
+                        refresh_ahead=current_app.config.get('POWERBI_EMBED_REFRESH_AHEAD', 600)
+                    )
+        return PowerBIService.embed_cache
     
     @staticmethod
     def get_reports_list():
@@ -113,7 +383,7 @@ class PowerBIService:
         try:
             access_token = PowerBIService.get_access_token()
             
-            if not access_token or access_token == "mock-powerbi-access-token":
+            if access_token == "mock-powerbi-access-token":
                 # Return mock data for development
                 return [
                     {
@@ -129,23 +399,61 @@ class PowerBIService:
                 ]
             
             workspace_id = current_app.config['POWERBI_WORKSPACE_ID']
-            url = f"https://api.powerbi.com/v1.0/myorg/groups/{workspace_id}/reports"
+            api_url = current_app.config.get('POWERBI_API_URL', 'https://api.powerbi.com')
+            url = f"{api_url}/v1.0/myorg/groups/{workspace_id}/reports"
             
             headers = {
                 'Authorization': f'Bearer {access_token}',
                 'Content-Type': 'application/json'
             }
             
-            response = requests.get(url, headers=headers)
+            response = PowerBIService._get_http_client().get(url, headers=headers)
             
             if response.status_code == 200:
                 reports_data = response.json()
-                return reports_data.get('value', [])
+                PowerBIService.last_reports = reports_data.get('value', [])
+                return PowerBIService.last_reports
             else:
                 current_app.logger.error(f"Failed to get reports list: {response.text}")
-                return []
+                return PowerBIService.last_reports or []
                 
+        except CircuitOpenError as e:
+            current_app.logger.warning(f"Power BI unavailable, serving last report list: {str(e)}")
+            return PowerBIService.last_reports or []
         except Exception as e:
             current_app.logger.error(f"Error getting reports list: {str(e)}")
-            return []
+            return PowerBIService.last_reports or []
 
+    
+    @staticmethod
+    def fetch_workspace_reports(workspace_id):
+        """Get the reports of a workspace, returns None when they could not be listed
+        
+        Unlike get_reports_list this never falls back to mock or cached data, so
+        callers can tell an empty workspace from a failed call.
+        """
+        try:
+            access_token = PowerBIService.get_access_token()
+            
+            if not access_token or access_token == "mock-powerbi-access-token":
+                return None
+            
+            api_url = current_app.config.get('POWERBI_API_URL', 'https://api.powerbi.com')
+            url = f"{api_url}/v1.0/myorg/groups/{workspace_id}/reports"
+            
+            headers = {
+                'Authorization': f'Bearer {access_token}',
+                'Content-Type': 'application/json'
+            }
+            
+            response = PowerBIService._get_http_client().get(url, headers=headers)
+            
+            if response.status_code == 200:
+                return response.json().get('value', [])
+            else:
+                current_app.logger.error(f"Failed to list reports of workspace {workspace_id}: {response.text}")
+                return None
+                
+        except Exception as e:
+            current_app.logger.error(f"Error listing reports of workspace {workspace_id}: {str(e)}")
+            return None
@@ -0,0 +1,112 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, request
+from src.models.user import db
+from src.database.routing import primary_reads
+
+
+class ResponseCache:
+    """LRU cache of serialized GET responses, keyed by report version.
+
+    Keys include the version of the data they were built from, so a write
+    never has to find and evict entries: it bumps the version and the next
+    request misses. The TTL only bounds staleness for data the version does
+    not cover (e.g. a renamed author).
+    """
+
+    def __init__(self, max_entries=2048, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key):
+        """Get (body, headers) for a key, or None"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry[2]:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0], entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+        return None
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def set(self, key, body, headers=None):
+        with self._lock:
+            self._entries[key] = (body, headers or {}, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return cache counters"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+                'cached_responses': len(self._entries)
+            }
+
+
+def get_response_cache():
+    """Get the application's response cache"""
+    return current_app.extensions['response_cache']
+
+
+def make_etag(key):
+    """Derive a (weak) ETag value from a cache key"""
+    return hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:20]
+
+
+def cached_json_response(key, build):
+    """Answer a GET from the version-keyed cache, honoring If-None-Match
+
+    ``key`` must capture everything the response depends on. ``build`` is
+    only called on a cache miss and returns the Flask response to cache; it
+    reads from the primary, like the versions in ``key``, so an entry never
+    holds data older than its key. Only 200 responses are cached.
+    """
+    cache = get_response_cache()
+    etag = make_etag(key)
+
+    if request.if_none_match.contains_weak(etag):
+        cache.record_not_modified()
+        response = current_app.response_class(status=304)
+    else:
+        cached = cache.get(key)
+        if cached is not None:
+            body, headers = cached
+            response = current_app.response_class(body, status=200, mimetype='application/json')
+            response.headers.update(headers)
+        else:
+            with primary_reads(db.session):
+                response = build()
+            if response.status_code != 200:
+                return response
+            headers = {
+                name: value for name, value in response.headers.items()
+                if name.startswith('X-')
+            }
+            cache.set(key, response.get_data(), headers)
+
+    response.set_etag(etag, weak=True)
+    # Responses may depend on the viewer; clients must revalidate before reuse
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
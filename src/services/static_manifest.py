@@ -0,0 +1,150 @@
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+import time
+from flask import current_app, request, send_file
+
+# Precompressed siblings, in order of preference: (Accept-Encoding token, file suffix)
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+class StaticAsset:
+    """One file of the static folder, with its precompressed variants"""
+
+    __slots__ = ('path', 'mimetype', 'encoding', 'size', 'mtime', 'etag', 'variants', 'immutable')
+
+    def __init__(self, path, mimetype, encoding, size, mtime, etag, variants, immutable):
+        self.path = path
+        self.mimetype = mimetype
+        # Content-Encoding of a file requested by its compressed name (e.g. app.js.gz)
+        self.encoding = encoding
+        self.size = size
+        self.mtime = mtime
+        self.etag = etag
+        self.variants = variants
+        self.immutable = immutable
+
+
+class StaticManifest:
+    """In-memory index of the static folder.
+
+    Built once at startup, so lookups never touch the filesystem. With
+    ``auto_reload`` (development) the folder is rescanned at most every
+    ``reload_interval`` seconds and the index rebuilt when a file changed.
+    """
+
+    def __init__(self, root, hashed_pattern, auto_reload=False, reload_interval=1.0):
+        self.root = root
+        self.hashed_pattern = re.compile(hashed_pattern)
+        self.auto_reload = auto_reload
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._assets = {}
+        self._signature = None
+        self._next_check = 0.0
+        self.build()
+
+    def build(self):
+        """Scan the static folder and replace the index"""
+        files = self._scan()
+        assets = {}
+        for name, (full_path, size, mtime) in files.items():
+            mimetype, encoding = mimetypes.guess_type(name)
+            variants = {}
+            for encoding, suffix in ENCODINGS:
+                if name + suffix in files:
+                    variants[encoding] = files[name + suffix][0]
+
+            assets[name] = StaticAsset(
+                path=full_path,
+                mimetype=mimetype or 'application/octet-stream',
+                encoding=encoding,
+                size=size,
+                mtime=mtime,
+                etag=self._hash_file(full_path),
+                variants=variants,
+                immutable=bool(self.hashed_pattern.search(os.path.basename(name)))
+            )
+
+        with self._lock:
+            self._assets = assets
+            self._signature = self._make_signature(files)
+        return len(assets)
+
+    def lookup(self, name):
+        """Get the asset for a request path, or None"""
+        if self.auto_reload:
+            self._maybe_reload()
+        return self._assets.get(name)
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.reload_interval
+        if self._make_signature(self._scan()) != self._signature:
+            self.build()
+
+    def _scan(self):
+        files = {}
+        if not self.root or not os.path.isdir(self.root):
+            return files
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                full_path = os.path.join(directory, filename)
+                name = os.path.relpath(full_path, self.root).replace(os.sep, '/')
+                stat = os.stat(full_path)
+                files[name] = (full_path, stat.st_size, stat.st_mtime)
+        return files
+
+    @staticmethod
+    def _make_signature(files):
+        return frozenset((name, size, mtime) for name, (_, size, mtime) in files.items())
+
+    @staticmethod
+    def _hash_file(path):
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                digest.update(chunk)
+        return digest.hexdigest()[:20]
+
+
+def get_static_manifest():
+    """Get the application's static manifest"""
+    return current_app.extensions['static_manifest']
+
+
+def send_static_asset(asset):
+    """Send an asset, precompressed if the client accepts it, with validators and cache headers"""
+    path, etag, encoding = asset.path, asset.etag, asset.encoding
+    for candidate, _ in ENCODINGS:
+        if candidate in asset.variants and request.accept_encodings[candidate]:
+            path, etag, encoding = asset.variants[candidate], f'{asset.etag}-{candidate}', candidate
+            break
+
+    response = send_file(
+        path,
+        mimetype=asset.mimetype,
+        download_name=os.path.basename(asset.path),
+        conditional=True,
+        etag=etag,
+        last_modified=asset.mtime
+    )
+
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if asset.variants:
+        response.vary.add('Accept-Encoding')
+
+    if asset.immutable:
+        # Content-hashed names never change content: cache for a year without revalidating
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    elif asset.mimetype == 'text/html':
+        # The SPA entry point must be revalidated so new deploys are picked up
+        response.headers['Cache-Control'] = 'no-cache'
+    else:
+        response.headers['Cache-Control'] = f"public, max-age={current_app.config.get('STATIC_MAX_AGE', 3600)}"
+    return response
@@ -0,0 +1,220 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+
+class AccessTokenCache:
+    """Process-wide cache for Azure AD access tokens.
+
+    Tokens are kept until ``refresh_margin`` seconds before they expire
+    (or halfway through their lifetime for very short-lived tokens). Once
+    inside that margin a single caller refreshes the token while concurrent
+    callers keep using the still-valid one; if there is no valid token at all,
+    concurrent callers wait for the refresh in flight instead of issuing their
+    own (single-flight).
+    """
+
+    def __init__(self, refresh_margin=300, wait_timeout=30):
+        self.refresh_margin = refresh_margin
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._refreshed = threading.Condition(self._lock)
+        self._entries = {}
+        self._refreshing = set()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.failures = 0
+
+    def get(self, key, fetch, refresh_margin=None):
+        """Return a cached token for ``key`` or obtain one with ``fetch``.
+
+        ``fetch`` must return a ``(token, expires_in)`` tuple, or
+        ``(None, 0)`` when no token could be obtained.
+        """
+        if refresh_margin is None:
+            refresh_margin = self.refresh_margin
+        with self._lock:
+            deadline = time.monotonic() + self.wait_timeout
+            while True:
+                now = time.monotonic()
+                entry = self._entries.get(key)
+                valid = entry is not None and now < entry[1]
+                if valid and now < entry[2]:
+                    self.hits += 1
+                    return entry[0]
+                if key not in self._refreshing:
+                    break
+                if valid:
+                    # Someone else is already refreshing, the old token still works
+                    self.hits += 1
+                    return entry[0]
+                remaining = deadline - now
+                if remaining <= 0:
+                    self.failures += 1
+                    return None
+                self._refreshed.wait(remaining)
+
+            self.misses += 1
+            self._refreshing.add(key)
+
+        token, expires_in = None, 0
+        try:
+            token, expires_in = fetch()
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+                if token:
+                    now = time.monotonic()
+                    # Short-lived tokens refresh halfway through instead of on every call
+                    refresh_in = max(expires_in - refresh_margin, expires_in / 2)
+                    self._entries[key] = (token, now + expires_in, now + refresh_in)
+                    self.refreshes += 1
+                else:
+                    self.failures += 1
+                    entry = self._entries.get(key)
+                    if entry is not None and time.monotonic() < entry[1]:
+                        # Refresh failed but the previous token has not expired yet
+                        token = entry[0]
+                self._refreshed.notify_all()
+
+        return token
+
+    def invalidate(self, key=None):
+        """Drop one cached token, or all of them"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        """Return cache counters"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'refreshes': self.refreshes,
+                'failures': self.failures,
+                'cached_tokens': len(self._entries)
+            }
+
+
+class EmbedTokenCache:
+    """Bounded LRU cache for Power BI embed tokens.
+
+    Entries are keyed by everything that changes the token Power BI issues
+    (workspace, report, access level and effective identity), so a token is
+    never shared between identities. Tokens are reused until ``safety_margin``
+    seconds before their expiration; entries that are read at least
+    ``hot_threshold`` times are renewed in the background once they enter the
+    ``refresh_ahead`` window, so requests keep getting a cached token.
+    """
+
+    def __init__(self, max_entries=256, safety_margin=300, refresh_ahead=600,
+                 hot_threshold=2, refresh_workers=2):
+        self.max_entries = max_entries
+        self.safety_margin = safety_margin
+        self.refresh_ahead = refresh_ahead
+        self.hot_threshold = hot_threshold
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._refreshing = set()
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers,
+                                            thread_name_prefix='embed-token-refresh')
+        self.hits = 0
+        self.misses = 0
+        self.background_refreshes = 0
+        self.evictions = 0
+
+    def get(self, key, fetch):
+        """Return cached embed data for ``key`` or obtain it with ``fetch``.
+
+        ``fetch`` returns a dict with an ISO ``expiration``, or ``None`` when
+        the result must not be cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            now = time.time()
+            if entry is not None and now < entry['expires_at'] - self.safety_margin:
+                self._entries.move_to_end(key)
+                entry['reads'] += 1
+                self.hits += 1
+                if (entry['reads'] >= self.hot_threshold
+                        and now >= entry['expires_at'] - self.safety_margin - self.refresh_ahead
+                        and key not in self._refreshing):
+                    self._refreshing.add(key)
+                    self._executor.submit(self._refresh, key, fetch)
+                return dict(entry['data'])
+            self.misses += 1
+
+        data = fetch()
+        if data is not None:
+            self._store(key, data)
+        return data
+
+    def peek(self, key):
+        """Return cached embed data for ``key`` while it has not expired, ignoring the safety margin"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() < entry['expires_at']:
+                return dict(entry['data'])
+            return None
+
+    def _refresh(self, key, fetch):
+        try:
+            data = fetch()
+            if data is not None:
+                self._store(key, data)
+                with self._lock:
+                    self.background_refreshes += 1
+        except Exception:
+            pass
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _store(self, key, data):
+        expires_at = _parse_expiration(data.get('expiration'))
+        if expires_at is None:
+            return
+        with self._lock:
+            self._entries[key] = {'data': dict(data), 'expires_at': expires_at, 'reads': 0}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key=None):
+        """Drop one cached embed token, or all of them"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        """Return cache counters"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'background_refreshes': self.background_refreshes,
+                'evictions': self.evictions,
+                'cached_tokens': len(self._entries)
+            }
+
+
+def _parse_expiration(value):
+    """Convert a Power BI ISO-8601 expiration into a POSIX timestamp"""
+    if not value:
+        return None
+    try:
+        expiration = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if expiration.tzinfo is None:
+        expiration = expiration.replace(tzinfo=timezone.utc)
+    return expiration.timestamp()
@@ -0,0 +1,115 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from src.models.user import UserTokenVersion, db
+from src.database.routing import primary_reads
+
+
+class TokenVersionCache:
+    """In-memory copy of user_token_versions, refreshed incrementally.
+
+    The per-request revocation check is a dict lookup. At most every
+    ``refresh_interval`` seconds one request pulls the rows changed since the
+    last refresh (with a small overlap for commits sharing a timestamp).
+    A bump is seen at once by the process that made it (see ``reload``) and
+    within ``refresh_interval`` seconds by the others.
+    """
+
+    OVERLAP = timedelta(seconds=2)
+
+    def __init__(self, refresh_interval=5):
+        self.refresh_interval = refresh_interval
+        self._versions = {}
+        self._last_seen = None
+        self._next_refresh = 0.0
+        self._refresh_lock = threading.Lock()
+        self._store_lock = threading.Lock()
+
+    def version_for(self, user_id):
+        """Get the current token version of a user"""
+        self._maybe_refresh()
+        return self._versions.get(user_id, 0)
+
+    def is_revoked(self, user_id, token_version):
+        """Check whether a token issued at ``token_version`` has been revoked"""
+        return token_version < self.version_for(user_id)
+
+    def reload(self, user_id):
+        """Reload one user's version now, in the request that bumped it"""
+        with primary_reads(db.session):
+            row = UserTokenVersion.query.populate_existing().get(user_id)
+        if row is not None:
+            self._store({user_id: row.version})
+
+    def _store(self, changes):
+        # Versions only grow, so a refresh that started before a reload cannot undo it
+        with self._store_lock:
+            versions = dict(self._versions)
+            for user_id, version in changes.items():
+                versions[user_id] = max(version, versions.get(user_id, 0))
+            self._versions = versions
+
+    def _maybe_refresh(self):
+        if time.monotonic() < self._next_refresh:
+            return
+        # Only one request refreshes; the others keep using the current copy
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            query = UserTokenVersion.query
+            if self._last_seen is not None:
+                query = query.filter(UserTokenVersion.updated_at >= self._last_seen - self.OVERLAP)
+
+            # Incremental reloads must not see a lagging replica, or changes would be skipped for good
+            with primary_reads(db.session):
+                rows = query.all()
+
+            for row in rows:
+                if row.updated_at and (self._last_seen is None or row.updated_at > self._last_seen):
+                    self._last_seen = row.updated_at
+
+            if self._last_seen is None:
+                self._last_seen = datetime.utcnow()
+            self._store({row.user_id: row.version for row in rows})
+            self._next_refresh = time.monotonic() + self.refresh_interval
+        finally:
+            self._refresh_lock.release()
+
+
+class TokenUser:
+    """Authenticated user built from signed JWT claims, without a database lookup"""
+
+    __slots__ = ('id', 'username', 'is_admin', 'is_active')
+
+    def __init__(self, user_id, claims):
+        self.id = user_id
+        self.username = claims.get('username')
+        self.is_admin = claims.get('is_admin', False)
+        self.is_active = claims.get('is_active', False)
+
+    def to_dict(self):
+        """Convert user to dictionary (the subset of User.to_dict held in the token)"""
+        return {
+            'id': self.id,
+            'username': self.username,
+            'esAdmin': self.is_admin
+        }
+
+    def __repr__(self):
+        return f'<TokenUser {self.username}>'
+
+
+def get_token_versions():
+    """Get the application's token version cache"""
+    return current_app.extensions['token_versions']
+
+
+def user_claims(user):
+    """Authorization claims embedded in a user's access tokens"""
+    return {
+        'username': user.username,
+        'is_admin': bool(user.is_admin),
+        'is_active': bool(user.is_active),
+        'ver': get_token_versions().version_for(user.id)
+    }
@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from src.models.user import User, db
+from src.database.routing import primary_reads
+
+
+class CachedUser:
+    """Read-only snapshot of a User that can be shared across requests and threads"""
+
+    __slots__ = ('id', 'username', 'email', 'is_admin', 'is_active', 'created_at')
+
+    def __init__(self, user):
+        self.id = user.id
+        self.username = user.username
+        self.email = user.email
+        self.is_admin = user.is_admin
+        self.is_active = user.is_active
+        self.created_at = user.created_at
+
+    def to_dict(self):
+        """Convert user to dictionary (same shape as User.to_dict)"""
+        return {
+            'id': self.id,
+            'username': self.username,
+            'esAdmin': self.is_admin,
+            'email': self.email,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+    def __repr__(self):
+        return f'<CachedUser {self.username}>'
+
+
+class UserCache:
+    """Short-TTL LRU cache of authenticated users, shared across requests"""
+
+    def __init__(self, max_entries=1024, ttl=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id):
+        """Get a user snapshot, loading it from the database on a miss or after expiry"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and now < entry[1]:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # A lagging replica would hand out a deactivated or demoted user for a whole TTL
+        with primary_reads(db.session):
+            user = User.query.get(user_id)
+        if user is None:
+            return None
+
+        cached_user = CachedUser(user)
+        with self._lock:
+            self._entries[user_id] = (cached_user, now + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return cached_user
+
+    def invalidate(self, user_id=None):
+        """Drop one user, or every user, from the cache"""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+    def stats(self):
+        """Return cache counters"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'cached_users': len(self._entries)}
+
+
+def get_user_cache():
+    """Get the application's user cache"""
+    return current_app.extensions['user_cache']
+
+
+def load_user(user_id):
+    """Load the user for a JWT identity through the cache"""
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return None
+    return get_user_cache().get(user_id)
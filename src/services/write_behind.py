@@ -0,0 +1,368 @@
+import atexit
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from flask import current_app
+from src.models.user import db
+from src.models.comment import Comment, CommentLike
+from src.models.reaction import Reaction
+
+
+class WriteBehindBuffer:
+    """Coalescing write-behind buffer for like and reaction toggles.
+
+    Toggles are recorded as the desired final state per (user, target), so
+    repeated toggles by the same user collapse into at most one write. A
+    background thread applies pending states in one transaction every
+    ``flush_interval`` seconds or as soon as ``flush_max_events`` are
+    pending. Pending and in-flight states are overlaid on reads, so users see
+    their own writes before they are flushed.
+
+    Each entry remembers the state it replaced (``base``), which is what lets
+    reads adjust counts by ``desired - base`` without touching the database.
+    Reads that combine database rows with the overlays run inside
+    ``consistent_reads``, so a flush never commits a batch between the two.
+
+    A write that keeps failing is retried with exponential backoff and only
+    dropped after ``max_attempts``; drops are counted in ``stats()``.
+    """
+
+    # Toggles of the same (user, target) are serialized through one of these locks
+    KEY_LOCKS = 64
+
+    def __init__(self, app, flush_interval=0.2, flush_max_events=500, max_pending=10000, max_attempts=5):
+        self.app = app
+        self.flush_interval = flush_interval
+        self.flush_max_events = flush_max_events
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._key_locks = [threading.Lock() for _ in range(self.KEY_LOCKS)]
+        self._pending = {}
+        self._inflight = {}
+        self._flushing = threading.Lock()
+        self._gate = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._committing = False
+        self._stopped = False
+        self.flushed_events = 0
+        self.flushes = 0
+        self.coalesced_events = 0
+        self.failed_writes = 0
+        self.dropped_events = 0
+        # Bumped on every buffered change, so cached responses that overlay pending writes go stale
+        self.generation = 0
+        self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self, timeout=10):
+        """Stop accepting writes and drain everything still pending"""
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._wakeup.notify_all()
+        self._thread.join(timeout)
+        # Retries are not delayed any more: each failure counts towards max_attempts
+        while self.flush(force=True) or self.stats()['pending']:
+            pass
+
+    # Writes
+
+    def toggle_like(self, user_id, comment_id):
+        """Buffer a like toggle, returns (action, likes) or None when the buffer is full"""
+        key = ('like', user_id, comment_id)
+        with self._key_lock(key):
+            state = self._current_state(key, lambda: CommentLike.query.filter_by(
+                user_id=user_id,
+                comment_id=comment_id
+            ).first() is not None)
+            if state is None:
+                return None
+
+            liked = not state[0]
+            if not self._set_desired(key, liked, state[1]):
+                return None
+
+        with self.consistent_reads():
+            likes = db.session.query(Comment.likes).filter_by(id=comment_id).scalar() or 0
+            likes += self.like_deltas([comment_id]).get(comment_id, 0)
+        return ('added' if liked else 'removed'), likes
+
+    def toggle_reaction(self, user_id, report_id, reaction_type):
+        """Buffer a reaction toggle, returns (action, previous type) or None when the buffer is full"""
+        key = ('reaction', user_id, report_id)
+        with self._key_lock(key):
+            state = self._current_state(key, lambda: Reaction.get_user_reaction_type(user_id, report_id))
+            if state is None:
+                return None
+
+            desired = None if state[0] == reaction_type else reaction_type
+            if not self._set_desired(key, desired, state[1]):
+                return None
+        return ('removed' if desired is None else 'added'), state[0]
+
+    def _key_lock(self, key):
+        """Lock held from loading a key's state to recording its new desired state"""
+        return self._key_locks[hash(key) % self.KEY_LOCKS]
+
+    def _current_state(self, key, load):
+        """Return (effective state, base) for a key, loading it from the database if needed"""
+        with self._lock:
+            if self._stopped:
+                return None
+            if key in self._pending:
+                entry = self._pending[key]
+                return entry['desired'], entry['base']
+            if key in self._inflight:
+                # Being flushed right now: that state is what the database will hold
+                desired = self._inflight[key]['desired']
+                return desired, desired
+        value = load()
+        return value, value
+
+    def _set_desired(self, key, desired, base):
+        """Record the desired state for a key, returns False when the buffer is full"""
+        with self._lock:
+            if self._stopped:
+                return False
+            if key in self._pending:
+                base = self._pending[key]['base']
+                self.coalesced_events += 1
+            elif len(self._pending) >= self.max_pending:
+                return False
+
+            if desired == base:
+                # Toggled back to where it started: nothing to write
+                self._pending.pop(key, None)
+            else:
+                self._pending[key] = {'desired': desired, 'base': base, 'attempts': 0, 'retry_at': 0.0}
+            self.generation += 1
+
+            if len(self._pending) >= self.flush_max_events:
+                self._wakeup.notify()
+        return True
+
+    # Read overlays
+
+    @contextmanager
+    def consistent_reads(self):
+        """Read database rows and overlays inside the block, without a flush committing in between
+
+        Otherwise a read could see a batch already committed while its
+        entries are still in flight, and count them twice.
+        """
+        with self._gate:
+            while self._committing:
+                self._gate.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._gate:
+                self._readers -= 1
+                if not self._readers:
+                    self._gate.notify_all()
+
+    @contextmanager
+    def _exclusive(self):
+        """Wait for the readers inside consistent_reads, and keep new ones out"""
+        with self._gate:
+            self._committing = True
+            while self._readers:
+                self._gate.wait()
+        try:
+            yield
+        finally:
+            with self._gate:
+                self._committing = False
+                self._gate.notify_all()
+
+    def liked_overrides(self, user_id, comment_ids):
+        """Get {comment_id: liked} for a user's not yet flushed likes"""
+        wanted = set(comment_ids)
+        overrides = {}
+        with self._lock:
+            for source in (self._inflight, self._pending):
+                for (kind, entry_user, comment_id), entry in source.items():
+                    if kind == 'like' and entry_user == user_id and comment_id in wanted:
+                        overrides[comment_id] = entry['desired']
+        return overrides
+
+    def like_deltas(self, comment_ids):
+        """Get {comment_id: delta} of like counts not yet flushed"""
+        wanted = set(comment_ids)
+        deltas = {}
+        with self._lock:
+            for source in (self._inflight, self._pending):
+                for (kind, _, comment_id), entry in source.items():
+                    if kind == 'like' and comment_id in wanted:
+                        deltas[comment_id] = deltas.get(comment_id, 0) + int(entry['desired']) - int(entry['base'])
+        return deltas
+
+    def reaction_override(self, user_id, report_id):
+        """Get (True, reaction_type) for a user's not yet flushed reaction, or (False, None)"""
+        key = ('reaction', user_id, report_id)
+        with self._lock:
+            for source in (self._pending, self._inflight):
+                if key in source:
+                    return True, source[key]['desired']
+        return False, None
+
+    def reaction_deltas(self, report_id):
+        """Get {reaction_type: delta} of reaction counts not yet flushed for a report"""
+        deltas = {}
+        with self._lock:
+            for source in (self._inflight, self._pending):
+                for (kind, _, entry_report), entry in source.items():
+                    if kind != 'reaction' or entry_report != report_id:
+                        continue
+                    if entry['base']:
+                        deltas[entry['base']] = deltas.get(entry['base'], 0) - 1
+                    if entry['desired']:
+                        deltas[entry['desired']] = deltas.get(entry['desired'], 0) + 1
+        return deltas
+
+    # Flushing
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if self._stopped:
+                    return
+                if len(self._pending) < self.flush_max_events:
+                    self._wakeup.wait(self.flush_interval)
+                if self._stopped:
+                    return
+            try:
+                self.flush()
+            except Exception as e:
+                self.app.logger.error(f"Error flushing write-behind buffer: {str(e)}")
+
+    def flush(self, force=False):
+        """Apply every pending state that is due (all of them with ``force``), in one transaction"""
+        with self._flushing:
+            now = time.monotonic()
+            with self._lock:
+                batch = [
+                    (key, entry) for key, entry in self._pending.items()
+                    if force or entry['retry_at'] <= now
+                ]
+                if not batch:
+                    return 0
+                for key, _ in batch:
+                    del self._pending[key]
+                self._inflight = dict(batch)
+
+            started = time.perf_counter()
+            failed = []
+            with self.app.app_context():
+                try:
+                    for key, entry in batch:
+                        self._apply(key, entry['desired'])
+                    # Committing and forgetting the batch is atomic for consistent_reads
+                    with self._exclusive():
+                        db.session.commit()
+                        self._finish(batch)
+                except Exception as e:
+                    db.session.rollback()
+                    self.app.logger.error(f"Write-behind batch failed, retrying one by one: {str(e)}")
+                    failed = self._apply_individually(batch)
+
+            self.app.logger.debug(
+                f"Flushed {len(batch) - len(failed)} buffered writes in {(time.perf_counter() - started) * 1000:.0f}ms"
+            )
+            return len(batch) - len(failed)
+
+    def _apply_individually(self, batch):
+        """Commit each write on its own, returns the entries that failed and were put back"""
+        failed = []
+        for key, entry in batch:
+            try:
+                self._apply(key, entry['desired'])
+                with self._exclusive():
+                    db.session.commit()
+                    self._finish([(key, entry)])
+            except Exception as e:
+                db.session.rollback()
+                self.app.logger.error(f"Buffered write {key} failed: {str(e)}")
+                failed.append((key, entry))
+
+        with self._exclusive():
+            self._retry_later(failed)
+        return failed
+
+    def _finish(self, batch):
+        """Forget committed entries of the in-flight batch"""
+        with self._lock:
+            for key, _ in batch:
+                self._inflight.pop(key, None)
+            self.flushes += 1
+            self.flushed_events += len(batch)
+
+    def _retry_later(self, failed):
+        """Put failed entries back in pending with exponential backoff, or drop them after max_attempts"""
+        with self._lock:
+            for key, entry in failed:
+                self._inflight.pop(key, None)
+                self.failed_writes += 1
+                attempts = entry['attempts'] + 1
+                # A toggle that arrived meanwhile took the failed state as its base;
+                # the database still holds the failed entry's base
+                newer = self._pending.pop(key, None)
+
+                if attempts >= self.max_attempts:
+                    self.dropped_events += 1
+                    self.app.logger.error(f"Dropping buffered write {key} after {attempts} attempts")
+                    if newer and newer['desired'] != entry['base']:
+                        self._pending[key] = dict(newer, base=entry['base'])
+                    # The users' view of this state flips back
+                    self.generation += 1
+                    continue
+
+                desired = newer['desired'] if newer else entry['desired']
+                if desired != entry['base']:
+                    self._pending[key] = {
+                        'desired': desired,
+                        'base': entry['base'],
+                        'attempts': attempts,
+                        'retry_at': time.monotonic() + self.flush_interval * 2 ** attempts
+                    }
+                else:
+                    self.generation += 1
+
+    @staticmethod
+    def _apply(key, desired):
+        kind, user_id, target_id = key
+        if kind == 'like':
+            CommentLike.set_liked(user_id, target_id, desired)
+        else:
+            Reaction.set_user_reaction(user_id, target_id, desired)
+
+    def stats(self):
+        """Return buffer counters"""
+        with self._lock:
+            return {
+                'pending': len(self._pending),
+                'inflight': len(self._inflight),
+                'flushes': self.flushes,
+                'flushed_events': self.flushed_events,
+                'coalesced_events': self.coalesced_events,
+                'failed_writes': self.failed_writes,
+                'dropped_events': self.dropped_events
+            }
+
+
+def get_write_behind():
+    """Get the application's write-behind buffer, or None when write-behind is disabled"""
+    return current_app.extensions.get('write_behind')
+
+
+def consistent_reads():
+    """Context for reads combined with the write-behind overlays (a no-op when write-behind is disabled)"""
+    write_behind = get_write_behind()
+    return write_behind.consistent_reads() if write_behind else nullcontext()
@@ -1,7 +1,6 @@
 from functools import wraps
 from flask import jsonify
-from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
-from src.models.user import User
+from flask_jwt_extended import current_user, get_jwt_identity, verify_jwt_in_request
 
 def admin_required():
     """Decorator to require admin privileges"""
@@ -9,8 +8,7 @@ def admin_required():
         @wraps(f)
         def decorated_function(*args, **kwargs):
             verify_jwt_in_request()
-            current_user_id = get_jwt_identity()
-            user = User.query.get(current_user_id)
+            user = current_user
             
             if not user or not user.is_admin:
                 return jsonify({'message': 'Se requieren privilegios de administrador'}), 403
@@ -23,8 +21,15 @@ def get_current_user():
     """Get current user from JWT token"""
     try:
         verify_jwt_in_request()
-        current_user_id = get_jwt_identity()
-        return User.query.get(current_user_id)
+        return current_user._get_current_object()
     except:
         return None
 
+
+def get_current_user_id():
+    """Get the current user's id from the JWT identity, or None without a token"""
+    identity = get_jwt_identity()
+    try:
+        return int(identity) if identity is not None else None
+    except (TypeError, ValueError):
+        return None
@@ -12,3 +12,10 @@ class ReactionSchema(Schema):
     tipo = fields.Str(required=True, validate=validate.OneOf(['me_interesa', 'increible', 'aporta']))
     report_id = fields.Int(required=True)
 
+
+class EmbedReportSchema(Schema):
+    report_id = fields.Str(required=True, validate=validate.Length(min=1, max=100))
+    dataset_id = fields.Str(load_default=None, validate=validate.Length(max=100))
+
+class MultiEmbedTokenSchema(Schema):
+    reports = fields.List(fields.Nested(EmbedReportSchema), required=True, validate=validate.Length(min=1, max=50))
@@ -0,0 +1,83 @@
+import pytest
+from src.config import Config
+from src.main import create_app
+from src.database.seed import init_database, seed_database
+from src.models.user import db
+from src.services.powerbi_service import PowerBIService
+from src.services.token_cache import AccessTokenCache
+
+
+def reset_powerbi_service():
+    """Forget the process-wide Power BI caches and HTTP client"""
+    if PowerBIService.http_client is not None:
+        PowerBIService.http_client.close()
+    PowerBIService.token_cache = AccessTokenCache()
+    PowerBIService.embed_cache = None
+    PowerBIService.http_client = None
+    PowerBIService.last_reports = None
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """Build a seeded app on a temporary SQLite database, with config overrides"""
+    apps = []
+
+    def make_app(**overrides):
+        settings = {
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'app.db'}",
+            'SQLALCHEMY_REPLICA_URIS': [],
+            'JWT_SECRET_KEY': 'test-jwt-secret-key-that-is-long-enough',
+            'POWERBI_CLIENT_ID': None,
+            'POWERBI_CLIENT_SECRET': None,
+            'POWERBI_TENANT_ID': None,
+            'POWERBI_WORKSPACE_ID': None,
+            'POWERBI_CATALOG_WORKSPACES': [],
+            'POWERBI_CATALOG_SYNC_INTERVAL': 0,
+            'WRITE_BEHIND_ENABLED': False,
+            'PASSWORD_HASH_WORKERS': 1
+        }
+        settings.update(overrides)
+        config_class = type('TestConfig', (Config,), settings)
+
+        app = create_app(config_class)
+        with app.app_context():
+            init_database()
+            seed_database()
+        apps.append(app)
+        return app
+
+    reset_powerbi_service()
+    yield make_app
+
+    for app in apps:
+        write_behind = app.extensions.get('write_behind')
+        if write_behind is not None:
+            write_behind.stop()
+        app.extensions['event_bus'].close()
+        app.extensions['password_hasher'].shutdown()
+        with app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+    reset_powerbi_service()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def login(client):
+    """Log in through the API, returns the Authorization header"""
+    def login(username='user', password='user123'):
+        response = client.post('/api/auth/login', json={'username': username, 'password': password})
+        assert response.status_code == 200, response.get_json()
+        return {'Authorization': f"Bearer {response.get_json()['token']}"}
+    return login
@@ -0,0 +1,75 @@
+from flask_jwt_extended import decode_token
+
+
+def token_of(headers):
+    return headers['Authorization'].split(' ', 1)[1]
+
+
+def test_tokens_carry_a_string_subject_and_authorization_claims(app, login):
+    with app.app_context():
+        claims = decode_token(token_of(login()))
+
+    assert claims['sub'] == '2'
+    assert (claims['username'], claims['is_admin'], claims['is_active'], claims['ver']) == ('user', False, True, 0)
+
+
+def test_invalid_credentials_are_rejected(client):
+    response = client.post('/api/auth/login', json={'username': 'user', 'password': 'incorrecta'})
+
+    assert response.status_code == 401
+
+
+def test_refresh_issues_a_new_token(client, login):
+    response = client.post('/api/auth/refresh', headers=login())
+
+    assert response.status_code == 200
+    assert client.get('/api/auth/me', headers={'Authorization': f"Bearer {response.get_json()['token']}"}).status_code == 200
+
+
+def test_only_admins_can_update_or_delete_users(client, login):
+    headers = login()
+
+    assert client.put('/api/users/2', json={'esAdmin': True}).status_code == 401
+    assert client.put('/api/users/2', json={'esAdmin': True}, headers=headers).status_code == 403
+    assert client.put('/api/users/1', json={'esAdmin': False}, headers=headers).status_code == 403
+    assert client.delete('/api/users/1', headers=headers).status_code == 403
+    assert client.get('/api/users/2').get_json()['esAdmin'] is False
+
+
+def test_admins_cannot_change_their_own_role_or_state(client, login):
+    headers = login('admin', 'admin123')
+
+    assert client.put('/api/users/1', json={'esAdmin': False}, headers=headers).status_code == 403
+    assert client.put('/api/users/1', json={'is_active': False}, headers=headers).status_code == 403
+    assert client.put('/api/users/1', json={'email': 'root@example.com'}, headers=headers).status_code == 200
+
+
+def test_deactivation_revokes_issued_tokens(client, login):
+    headers = login()
+    assert client.get('/api/auth/me', headers=headers).status_code == 200
+
+    response = client.put('/api/users/2', json={'is_active': False}, headers=login('admin', 'admin123'))
+    assert response.status_code == 200
+
+    response = client.get('/api/auth/me', headers=headers)
+    assert response.status_code == 401
+    assert response.get_json()['message'] == 'Token revocado'
+
+
+def test_revocation_applies_at_once_while_another_request_refreshes(app, client, login):
+    headers = login()
+    admin = login('admin', 'admin123')
+    token_versions = app.extensions['token_versions']
+
+    # A refresh in flight (holding the lock) must not delay the bump made by this process
+    with token_versions._refresh_lock:
+        assert client.put('/api/users/2', json={'is_active': False}, headers=admin).status_code == 200
+        assert client.get('/api/auth/me', headers=headers).status_code == 401
+
+
+def test_promotion_keeps_issued_tokens_valid(client, login):
+    headers = login()
+
+    client.put('/api/users/2', json={'esAdmin': True}, headers=login('admin', 'admin123'))
+
+    assert client.get('/api/auth/me', headers=headers).status_code == 200
@@ -0,0 +1,77 @@
+from src.models.report import Report, CatalogSyncRun
+from src.services.catalog_sync import CatalogSyncService, CatalogSyncWorker
+from src.services.powerbi_service import PowerBIService
+
+
+def workspace_reports(*reports):
+    return [{'id': report_id, 'name': name, 'embedUrl': f'url-{report_id}', 'datasetId': 'd'} for report_id, name in reports]
+
+
+def test_sync_inserts_updates_and_deactivates(app, monkeypatch):
+    listings = {'w1': workspace_reports(('r1', 'Ventas'), ('r2', 'Finanzas'))}
+    monkeypatch.setattr(PowerBIService, 'fetch_workspace_reports', staticmethod(lambda workspace_id: listings.get(workspace_id)))
+
+    with app.app_context():
+        run = CatalogSyncService.sync(['w1'])
+        assert (run.status, run.inserted, run.updated, run.deactivated) == ('success', 2, 0, 0)
+
+        listings['w1'] = workspace_reports(('r1', 'Ventas 2026'))
+        run = CatalogSyncService.sync(['w1'])
+        assert (run.inserted, run.updated, run.deactivated, run.unchanged) == (0, 1, 1, 0)
+
+        reports = {report.powerbi_report_id: report for report in Report.query.filter_by(powerbi_workspace_id='w1')}
+        assert reports['r1'].name == 'Ventas 2026' and reports['r1'].is_active
+        assert not reports['r2'].is_active
+        assert CatalogSyncRun.query.count() == 2
+
+
+def test_unreachable_workspace_is_left_untouched(app, monkeypatch):
+    listings = {'w1': workspace_reports(('r1', 'Ventas'))}
+    monkeypatch.setattr(PowerBIService, 'fetch_workspace_reports', staticmethod(lambda workspace_id: listings.get(workspace_id)))
+
+    with app.app_context():
+        CatalogSyncService.sync(['w1'])
+        run = CatalogSyncService.sync(['w1', 'w2'])
+        assert run.status == 'partial'
+
+        listings['w1'] = None
+        run = CatalogSyncService.sync(['w1'])
+        assert run.status == 'failed'
+        assert Report.query.filter_by(powerbi_report_id='r1').one().is_active
+
+
+def test_report_list_is_served_from_the_catalog(client, login, monkeypatch):
+    def unavailable(*args, **kwargs):
+        raise AssertionError('Power BI must not be called per request')
+
+    monkeypatch.setattr(PowerBIService, 'fetch_workspace_reports', staticmethod(unavailable))
+    monkeypatch.setattr(PowerBIService, 'get_reports_list', staticmethod(unavailable))
+
+    response = client.get('/api/powerbi/reports', headers=login())
+
+    assert response.status_code == 200
+    assert [report['powerbi_report_id'] for report in response.get_json()] == ['default-report']
+
+
+def test_sync_reports_command(app, monkeypatch):
+    monkeypatch.setattr(
+        PowerBIService, 'fetch_workspace_reports',
+        staticmethod(lambda workspace_id: workspace_reports(('r9', 'Operaciones')))
+    )
+
+    result = app.test_cli_runner().invoke(args=['sync-reports', '--workspace', 'w9'])
+
+    assert result.exit_code == 0, result.output
+    assert 'success: 1 inserted' in result.output
+
+
+def test_app_only_syncs_in_process_when_asked(make_app, monkeypatch):
+    started = []
+    monkeypatch.setattr(CatalogSyncWorker, 'start', lambda worker: started.append(worker.interval))
+    settings = {'POWERBI_CATALOG_WORKSPACES': ['w1'], 'POWERBI_CATALOG_SYNC_INTERVAL': 900}
+
+    make_app(**settings).test_client().get('/health')
+    assert started == []
+
+    make_app(POWERBI_CATALOG_SYNC_IN_PROCESS=True, **settings).test_client().get('/health')
+    assert started == [900]
@@ -0,0 +1,107 @@
+from sqlalchemy import text
+from src.models.user import db
+from src.models.change_log import ChangeLogEntry, ChangeLogLock
+from src.database.seed import init_database
+
+
+def record(report_id=1, action='created'):
+    ChangeLogEntry.record(report_id, 'comment', action)
+
+
+def test_feed_pages_through_changes_since(client, login):
+    headers = login()
+    for index in range(3):
+        client.post('/api/comments', json={'report_id': 1, 'contenido': f'Comentario {index}'}, headers=headers)
+    client.post('/api/comments/1/like', headers=headers)
+
+    admin = login('admin', 'admin123')
+    page = client.get('/api/changes?since=0&limit=3', headers=admin).get_json()
+    assert [change['action'] for change in page['changes']] == ['created'] * 3
+    assert page['has_more']
+
+    page = client.get(f"/api/changes?since={page['next_since']}&limit=3", headers=admin).get_json()
+    assert [(change['entity'], change['data']['likes']) for change in page['changes']] == [('comment_like', 6)]
+    assert not page['has_more']
+
+    page = client.get(f"/api/changes?since={page['next_since']}", headers=admin).get_json()
+    assert page['changes'] == [] and page['next_since'] > 0
+
+
+def test_feed_is_admin_only(client, login):
+    assert client.get('/api/changes', headers=login()).status_code == 403
+
+
+def test_rolled_back_changes_are_discarded(app):
+    with app.app_context():
+        record()
+        db.session.rollback()
+        record(action='updated')
+        db.session.commit()
+
+        assert [change.action for change in ChangeLogEntry.query] == ['updated']
+
+
+def test_changes_of_a_rolled_back_savepoint_are_discarded(app):
+    with app.app_context():
+        record(action='kept')
+        with db.session.begin_nested():
+            record(action='released')
+        savepoint = db.session.begin_nested()
+        record(action='discarded')
+        with db.session.begin_nested():
+            record(action='discarded')
+        savepoint.rollback()
+        db.session.commit()
+
+        assert [change.action for change in ChangeLogEntry.query.order_by(ChangeLogEntry.seq)] == ['kept', 'released']
+
+
+def test_seq_follows_commit_order(app):
+    with app.app_context():
+        record(action='first')
+        with app.app_context():
+            record(action='second')
+            db.session.commit()
+        db.session.commit()
+
+        changes, _ = ChangeLogEntry.get_since(0, 10)
+        assert [change.action for change in changes] == ['second', 'first']
+        # SQLite runs one writer at a time, so writers never touch the lock row
+        assert ChangeLogLock.query.count() == 0
+
+
+def test_seq_is_never_reused(app):
+    with app.app_context():
+        record()
+        db.session.commit()
+        newest = ChangeLogEntry.query.one().seq
+        ChangeLogEntry.query.delete()
+        db.session.commit()
+
+        record()
+        db.session.commit()
+        assert ChangeLogEntry.query.one().seq > newest
+
+
+def test_migration_adds_autoincrement_to_older_tables(app):
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.execute(text('DROP TABLE change_log'))
+            connection.execute(text(
+                'CREATE TABLE change_log (seq INTEGER NOT NULL PRIMARY KEY, report_id INTEGER NOT NULL, '
+                'entity VARCHAR(20) NOT NULL, entity_id INTEGER, action VARCHAR(20) NOT NULL, '
+                'user_id INTEGER, data JSON, created_at DATETIME NOT NULL)'
+            ))
+            connection.execute(text(
+                "INSERT INTO change_log (seq, report_id, entity, action, created_at) "
+                "VALUES (41, 1, 'comment', 'created', '2026-01-01 00:00:00')"
+            ))
+
+        init_database()
+
+        sql = db.session.execute(text("SELECT sql FROM sqlite_master WHERE name = 'change_log'")).scalar()
+        assert 'AUTOINCREMENT' in sql.upper()
+        ChangeLogEntry.query.delete()
+        record()
+        db.session.commit()
+        assert ChangeLogEntry.query.one().seq == 42
@@ -0,0 +1,102 @@
+import time
+from datetime import datetime, timedelta
+import pytest
+from src.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from src.services.http_client import PowerBIHttpClient
+from src.services.powerbi_service import PowerBIService
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker('aad', failure_threshold=3, recovery_timeout=30)
+
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.rejected_calls == 1
+
+
+def test_half_open_success_closes_the_breaker():
+    breaker = CircuitBreaker('aad', failure_threshold=1, recovery_timeout=0.05)
+    breaker.before_call()
+    breaker.record_failure()
+
+    time.sleep(0.06)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.before_call()
+    # Only one trial call at a time
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_failure_reopens_the_breaker():
+    breaker = CircuitBreaker('aad', failure_threshold=1, recovery_timeout=0.05)
+    breaker.before_call()
+    breaker.record_failure()
+
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_unexpected_error_releases_the_half_open_slot(monkeypatch):
+    client = PowerBIHttpClient(breaker_failure_threshold=1, breaker_recovery_timeout=0)
+    breaker = client.breaker_for('http://powerbi.test/')
+    breaker.before_call()
+    breaker.record_failure()
+
+    def broken_send(*args, **kwargs):
+        raise ValueError('bug')
+
+    monkeypatch.setattr(client, '_send_with_retries', broken_send)
+    for _ in range(3):
+        # A stuck slot would turn the later calls into CircuitOpenError
+        with pytest.raises(ValueError):
+            client.get('http://powerbi.test/reports')
+
+
+def test_open_circuit_fails_fast_without_network():
+    client = PowerBIHttpClient(max_retries=0, breaker_failure_threshold=2, connect_timeout=0.2)
+    # Nothing listens on port 9: every call is a connection error
+    for _ in range(2):
+        with pytest.raises(Exception):
+            client.get('http://127.0.0.1:9/reports')
+
+    started = time.monotonic()
+    with pytest.raises(CircuitOpenError):
+        client.get('http://127.0.0.1:9/reports')
+    assert time.monotonic() - started < 0.05
+    assert client.breaker_states()[0]['state'] == CircuitBreaker.OPEN
+
+
+def test_degraded_mode_serves_last_known_good_embed_token(make_app, monkeypatch):
+    app = make_app(
+        POWERBI_TENANT_ID='tenant',
+        POWERBI_CLIENT_ID='client',
+        POWERBI_CLIENT_SECRET='secret',
+        POWERBI_WORKSPACE_ID='workspace'
+    )
+    expiration = (datetime.utcnow() + timedelta(minutes=2)).isoformat() + 'Z'
+
+    # Azure AD is down: no access token can be obtained
+    monkeypatch.setattr(PowerBIService, 'get_access_token', staticmethod(lambda: None))
+
+    with app.app_context():
+        cache = PowerBIService._get_embed_cache()
+        key = ('workspace', 'r1', 'View', None, None)
+        # Inside the safety margin, so only degraded mode may still hand it out
+        cache._store(key, {'embedUrl': 'url', 'accessToken': 'last-good', 'expiration': expiration})
+
+        assert PowerBIService.generate_embed_token('r1')['accessToken'] == 'last-good'
+        assert PowerBIService.generate_embed_token('r2')['accessToken'] == 'mock-powerbi-embed-token'
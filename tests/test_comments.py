@@ -0,0 +1,162 @@
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from src.models.user import db, User
+from src.models.report import Report
+from src.models.comment import Comment, CommentLike
+from src.models.change_log import ChangeLogEntry
+
+
+def add_comments(app, count, report_id=1):
+    """Add ``count`` comments by the regular user, one second apart, returns their ids newest first"""
+    with app.app_context():
+        user = User.query.filter_by(username='user').one()
+        start = datetime(2026, 1, 1)
+        comments = [
+            Comment(user_id=user.id, report_id=report_id, content=f'Comentario {index}',
+                    likes=0, created_at=start + timedelta(seconds=index))
+            for index in range(count)
+        ]
+        db.session.add_all(comments)
+        db.session.commit()
+        return [comment.id for comment in reversed(comments)]
+
+
+def test_comments_are_unpaginated_without_limit_or_cursor(app, client):
+    add_comments(app, 60)
+
+    response = client.get('/api/comments?report_id=1')
+
+    assert response.status_code == 200
+    assert len(response.get_json()) == 62
+    assert 'X-Next-Cursor' not in response.headers
+
+
+def test_cursor_pages_cover_every_comment_once(app, client):
+    ids = add_comments(app, 25)
+
+    seen = []
+    response = client.get('/api/comments?report_id=1&limit=10')
+    while True:
+        seen += [comment['id'] for comment in response.get_json()]
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+        response = client.get(f'/api/comments?report_id=1&limit=10&cursor={cursor}')
+
+    # The seeded comments are the newest
+    assert seen[2:] == ids
+    assert len(seen) == len(set(seen)) == 27
+
+
+def test_page_size_defaults_and_is_capped(app, client):
+    add_comments(app, 250)
+
+    cursor = client.get('/api/comments?report_id=1&limit=1').headers['X-Next-Cursor']
+
+    assert len(client.get(f'/api/comments?report_id=1&cursor={cursor}').get_json()) == 50
+    assert len(client.get('/api/comments?report_id=1&limit=1000').get_json()) == 200
+
+
+def test_invalid_cursor_and_fields_are_rejected(client):
+    assert client.get('/api/comments?report_id=1&cursor=not-a-cursor').status_code == 400
+    assert client.get('/api/comments?report_id=1&fields=id,password').status_code == 400
+
+
+def test_fields_limit_the_returned_keys(client):
+    response = client.get('/api/comments?report_id=1&fields=id,likes')
+
+    assert response.status_code == 200
+    assert all(set(comment) == {'id', 'likes'} for comment in response.get_json())
+
+
+def add_report_with_liked_comments(app, count):
+    """Add a report with ``count`` comments, each liked by every user, returns its id"""
+    with app.app_context():
+        users = User.query.all()
+        report = Report(name=f'Reporte {count}', powerbi_report_id=f'report-{count}', powerbi_workspace_id='w')
+        db.session.add(report)
+        db.session.flush()
+        comments = [
+            Comment(user_id=users[index % len(users)].id, report_id=report.id,
+                    content=f'Comentario {index}', likes=len(users))
+            for index in range(count)
+        ]
+        db.session.add_all(comments)
+        db.session.flush()
+        db.session.add_all([
+            CommentLike(user_id=user.id, comment_id=comment.id) for comment in comments for user in users
+        ])
+        db.session.commit()
+        return report.id
+
+
+def count_listing_queries(app, client, headers, report_id):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = client.get(f'/api/comments?report_id={report_id}', headers=headers)
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    assert response.status_code == 200
+    return len(response.get_json()), len(statements)
+
+
+def test_listing_query_count_does_not_grow_with_comments(app, client, login):
+    headers = login()
+    one = add_report_with_liked_comments(app, 1)
+    many = add_report_with_liked_comments(app, 40)
+
+    # Warm up the per-process caches (user, token version) so both requests start alike
+    count_listing_queries(app, client, headers, 1)
+
+    assert count_listing_queries(app, client, headers, one)[1] == count_listing_queries(app, client, headers, many)[1]
+    assert count_listing_queries(app, client, headers, many)[0] == 40
+
+
+def test_concurrent_like_toggles_keep_the_counter_in_sync(app):
+    with app.app_context():
+        users = [User(username=f'stress{index}', email=f'stress{index}@example.com') for index in range(6)]
+        for user in users:
+            user.password_hash = 'unused'
+        comment = Comment(user_id=1, report_id=1, content='Comentario concurrido', likes=0)
+        db.session.add_all(users + [comment])
+        db.session.commit()
+        user_ids = [user.id for user in users]
+        comment_id = comment.id
+
+    errors = []
+
+    def toggle_many(user_id, times):
+        try:
+            for _ in range(times):
+                with app.app_context():
+                    CommentLike.toggle(user_id, comment_id)
+                    db.session.commit()
+        except Exception as e:
+            errors.append(e)
+
+    # Two threads per user, so the same user's toggles race with each other too
+    threads = [
+        threading.Thread(target=toggle_many, args=(user_id, times))
+        for user_id in user_ids for times in (7, 10)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    with app.app_context():
+        likes = db.session.get(Comment, comment_id).likes
+        rows = CommentLike.query.filter_by(comment_id=comment_id).count()
+        assert likes == rows
+        # Every user toggled 17 times: an odd count leaves each of them liking the comment
+        assert rows == len(user_ids)
+        assert ChangeLogEntry.query.filter_by(entity='comment_like', entity_id=comment_id).count() == 17 * len(user_ids)
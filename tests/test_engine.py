@@ -0,0 +1,36 @@
+from sqlalchemy import text
+from src.models.user import db
+from src.database.engine import build_engine_options, get_engine_profile
+
+
+def pragma(name):
+    return db.session.execute(text(f'PRAGMA {name}')).scalar()
+
+
+def test_profile_follows_the_database_url():
+    assert get_engine_profile({}, 'sqlite:///app.db') == 'sqlite'
+    assert get_engine_profile({}, 'postgresql://db/app') == 'server'
+    assert get_engine_profile({'DB_ENGINE_PROFILE': 'server'}, 'sqlite:///app.db') == 'server'
+
+
+def test_server_profile_pools_connections():
+    options = build_engine_options({'DB_POOL_SIZE': 4}, 'postgresql://db/app')
+
+    assert (options['pool_size'], options['max_overflow'], options['pool_pre_ping']) == (4, 20, True)
+    assert 'fast_executemany' not in options
+    assert build_engine_options({}, 'mssql+pyodbc://db/app?driver=ODBC')['fast_executemany'] is True
+
+
+def test_sqlite_profile_waits_on_locks():
+    options = build_engine_options({'SQLITE_BUSY_TIMEOUT_MS': 2500}, 'sqlite:///app.db')
+
+    assert options == {'connect_args': {'timeout': 2.5}}
+
+
+def test_sqlite_connections_get_the_profile_pragmas(make_app):
+    app = make_app(SQLITE_SYNCHRONOUS='FULL', SQLITE_BUSY_TIMEOUT_MS=1234)
+
+    with app.app_context():
+        assert pragma('journal_mode') == 'wal'
+        assert pragma('synchronous') == 2
+        assert pragma('busy_timeout') == 1234
@@ -0,0 +1,73 @@
+import pytest
+from src.services.event_bus import EventBus, SubscriberLimitError
+from src.serve import limit_streams
+
+
+def test_committed_writes_reach_report_subscribers(app, client, login):
+    bus = app.extensions['event_bus']
+    subscription = bus.subscribe(1)
+    other_report = bus.subscribe(2)
+
+    client.post('/api/comments', json={'report_id': 1, 'contenido': 'En vivo'}, headers=login())
+
+    events = subscription.wait(0)
+    assert [(event, data['contenido']) for _, event, data in events] == [('comment_created', 'En vivo')]
+    assert other_report.wait(0) == []
+
+
+def test_slow_subscribers_get_a_single_resync():
+    bus = EventBus(subscriber_buffer=2)
+    subscription = bus.subscribe(1)
+
+    for index in range(5):
+        bus.publish(1, 'comment_likes', {'id': index})
+
+    assert [event for _, event, _ in subscription.wait(0)] == ['resync']
+    assert subscription.wait(0) == []
+    assert bus.stats()['resyncs'] == 1
+
+
+def test_subscriber_limit():
+    bus = EventBus(max_subscribers=1)
+    subscription = bus.subscribe(1)
+
+    with pytest.raises(SubscriberLimitError):
+        bus.subscribe(2)
+
+    bus.unsubscribe(subscription)
+    bus.subscribe(2)
+
+
+def test_stream_is_refused_when_the_bus_is_full(app, client):
+    app.extensions['event_bus'].max_subscribers = 0
+
+    response = client.get('/api/reports/1/events')
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '5'
+    assert client.get('/api/reports/999/events').status_code == 404
+
+
+def test_stream_sends_events_and_ends_on_close(app, client):
+    bus = app.extensions['event_bus']
+    response = client.get('/api/reports/1/events')
+    chunks = iter(response.response)
+
+    assert response.mimetype == 'text/event-stream'
+    assert next(chunks) == b'retry: 3000\n\n'
+
+    bus.publish(1, 'comment_deleted', {'id': 7})
+    assert b'event: comment_deleted\ndata: {"id":7}' in next(chunks)
+
+    bus.close()
+    assert list(chunks) == []
+    assert bus.stats()['subscribers'] == 0
+
+
+def test_thread_workers_keep_a_thread_for_regular_requests(app):
+    limit_streams(app, {'worker_class': 'gthread', 'threads': 4})
+    assert app.extensions['event_bus'].max_subscribers == 3
+
+    app.extensions['event_bus'].max_subscribers = 5000
+    limit_streams(app, {'worker_class': 'gevent', 'threads': 1})
+    assert app.extensions['event_bus'].max_subscribers == 5000
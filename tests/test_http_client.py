@@ -0,0 +1,90 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from src.services.http_client import PowerBIHttpClient
+
+
+class FakePowerBI:
+    """Local HTTP server answering with queued (status, body, headers, delay) responses"""
+
+    def __init__(self):
+        self.responses = []
+        self.requests = []
+        self.client_ports = set()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                fake.requests.append(self.path)
+                fake.client_ports.add(self.client_address[1])
+                status, body, headers, delay = fake.responses.pop(0) if fake.responses else (200, {}, {}, 0)
+                time.sleep(delay)
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def queue(self, status, body=None, headers=None, delay=0):
+        self.responses.append((status, body or {}, headers or {}, delay))
+
+
+@pytest.fixture
+def powerbi():
+    fake = FakePowerBI()
+    yield fake
+    fake.server.shutdown()
+    fake.server.server_close()
+
+
+def test_throttled_request_is_retried_after_retry_after(powerbi):
+    client = PowerBIHttpClient(max_retries=2)
+    powerbi.queue(429, headers={'Retry-After': '0.1'})
+    powerbi.queue(200, {'value': []})
+
+    started = time.monotonic()
+    response = client.get(f'{powerbi.url}/reports')
+
+    assert response.status_code == 200
+    assert len(powerbi.requests) == 2
+    assert time.monotonic() - started >= 0.1
+
+
+def test_retries_stop_at_max_retries(powerbi):
+    client = PowerBIHttpClient(max_retries=1, backoff_factor=0.01)
+    for _ in range(3):
+        powerbi.queue(503)
+
+    assert client.get(f'{powerbi.url}/reports').status_code == 503
+    assert len(powerbi.requests) == 2
+
+
+def test_read_timeout_is_applied(powerbi):
+    client = PowerBIHttpClient(read_timeout=0.1, max_retries=0)
+    powerbi.queue(200, delay=0.5)
+
+    with pytest.raises(requests.Timeout):
+        client.get(f'{powerbi.url}/slow')
+
+
+def test_connections_are_kept_alive(powerbi):
+    client = PowerBIHttpClient()
+    for _ in range(5):
+        assert client.get(f'{powerbi.url}/reports').status_code == 200
+
+    assert len(powerbi.client_ports) == 1
@@ -0,0 +1,38 @@
+from sqlalchemy import inspect, text
+from src.models.user import db
+from src.database.seed import init_database
+
+
+def index_names(table):
+    return {index['name'] for index in inspect(db.engine).get_indexes(table)}
+
+
+def test_query_shape_indexes_exist(app):
+    with app.app_context():
+        assert 'ix_comments_active_report_created' in index_names('comments')
+        assert 'ix_reactions_report_type' in index_names('reactions')
+        assert 'ix_comment_likes_comment' in index_names('comment_likes')
+
+
+def test_comment_listing_uses_the_partial_index(app):
+    with app.app_context():
+        plan = db.session.execute(text(
+            'EXPLAIN QUERY PLAN SELECT id FROM comments WHERE report_id = 1 AND is_active = 1 '
+            'ORDER BY created_at DESC, id DESC LIMIT 51'
+        )).all()
+
+    details = ' '.join(row[-1] for row in plan)
+    assert 'ix_comments_active_report_created' in details
+    assert 'TEMP B-TREE' not in details
+
+
+def test_migrations_upgrade_an_older_database(app):
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.execute(text('DROP INDEX ix_comments_active_report_created'))
+            connection.execute(text('DROP INDEX ix_comment_likes_comment'))
+
+        init_database()
+
+        assert 'ix_comments_active_report_created' in index_names('comments')
+        assert 'ix_comment_likes_comment' in index_names('comment_likes')
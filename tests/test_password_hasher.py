@@ -0,0 +1,80 @@
+import time
+import pytest
+from src.services.password_hasher import HasherBusyError, LoginThrottle, PasswordHasher
+
+
+def sleep_for(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(method='pbkdf2:sha256:1000', workers=1, max_queue=1, timeout=5)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_hashes_verify_and_detect_old_parameters(hasher):
+    password_hash = hasher.hash('secreto')
+
+    assert hasher.verify(password_hash, 'secreto')
+    assert not hasher.verify(password_hash, 'otro')
+    assert not hasher.needs_rehash(password_hash)
+    assert hasher.needs_rehash('pbkdf2:sha256:600000$salt$hash')
+
+
+def test_slot_stays_taken_until_a_timed_out_hash_finishes(hasher):
+    # Start the pool first, so spawning its process does not count against the timeout
+    assert hasher._run(sleep_for, 0) == 0
+    hasher.timeout = 0.2
+
+    with pytest.raises(HasherBusyError):
+        hasher._run(sleep_for, 1)
+    # Still running in the pool: no room for more work
+    with pytest.raises(HasherBusyError):
+        hasher._run(sleep_for, 0)
+
+    time.sleep(1.5)
+    assert hasher._run(sleep_for, 0) == 0
+
+
+def test_busy_hasher_answers_503(app, client, monkeypatch):
+    def busy(*args, **kwargs):
+        raise HasherBusyError()
+
+    monkeypatch.setattr(app.extensions['password_hasher'], 'verify', busy)
+    monkeypatch.setattr(app.extensions['password_hasher'], 'hash', busy)
+
+    response = client.post('/api/auth/login', json={'username': 'user', 'password': 'user123'})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+    response = client.post('/api/users', json={'username': 'nuevo', 'email': 'nuevo@example.com', 'password': 'x'})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+
+def test_login_attempts_are_throttled_per_username(make_app):
+    client = make_app(LOGIN_MAX_ATTEMPTS_PER_USERNAME=2).test_client()
+
+    statuses = [
+        client.post('/api/auth/login', json={'username': 'user', 'password': 'incorrecta'}).status_code
+        for _ in range(3)
+    ]
+
+    assert statuses == [401, 401, 429]
+
+
+def test_throttle_limits_ips_and_forgets_old_attempts(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+    throttle = LoginThrottle(max_per_username=10, max_per_ip=2, window=60)
+
+    assert throttle.allow('a', '10.0.0.1')
+    assert throttle.allow('b', '10.0.0.1')
+    assert not throttle.allow('c', '10.0.0.1')
+    assert throttle.allow('c', '10.0.0.2')
+
+    now[0] += 61
+    assert throttle.allow('c', '10.0.0.1')
@@ -0,0 +1,198 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from src.services.powerbi_service import PowerBIService
+from src.services.token_cache import AccessTokenCache, EmbedTokenCache
+
+POWERBI_CREDENTIALS = {
+    'POWERBI_TENANT_ID': 'tenant',
+    'POWERBI_CLIENT_ID': 'client',
+    'POWERBI_CLIENT_SECRET': 'secret',
+    'POWERBI_WORKSPACE_ID': 'workspace'
+}
+
+
+def test_access_token_is_reused_until_refresh_margin():
+    cache = AccessTokenCache(refresh_margin=300)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return f'token-{len(calls)}', 3600
+
+    assert cache.get('key', fetch) == 'token-1'
+    assert cache.get('key', fetch) == 'token-1'
+    assert len(calls) == 1
+    assert cache.stats()['hits'] == 1
+
+
+def test_short_lived_access_token_is_refreshed_halfway():
+    cache = AccessTokenCache(refresh_margin=300)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return f'token-{len(calls)}', 0.2
+
+    assert cache.get('key', fetch) == 'token-1'
+    time.sleep(0.15)
+    assert cache.get('key', fetch) == 'token-2'
+
+
+def test_failed_refresh_keeps_unexpired_token():
+    cache = AccessTokenCache(refresh_margin=300)
+    responses = iter([('token-1', 0.4), (None, 0)])
+
+    assert cache.get('key', lambda: next(responses)) == 'token-1'
+    time.sleep(0.25)
+    assert cache.get('key', lambda: next(responses)) == 'token-1'
+    assert cache.stats()['failures'] == 1
+
+
+def test_concurrent_callers_share_one_fetch():
+    cache = AccessTokenCache()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.2)
+        return 'token', 3600
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get('key', fetch))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['token'] * 8
+    assert len(calls) == 1
+
+
+def test_get_access_token_uses_the_cache(make_app, monkeypatch):
+    app = make_app(**POWERBI_CREDENTIALS)
+    calls = []
+
+    def request_access_token(tenant_id, client_id, client_secret):
+        calls.append((tenant_id, client_id))
+        return 'aad-token', 3600
+
+    monkeypatch.setattr(PowerBIService, '_request_access_token', staticmethod(request_access_token))
+
+    with app.app_context():
+        assert PowerBIService.get_access_token() == 'aad-token'
+        assert PowerBIService.get_access_token() == 'aad-token'
+
+    assert calls == [('tenant', 'client')]
+
+
+def test_get_access_token_without_credentials_is_mocked(app):
+    with app.app_context():
+        assert PowerBIService.get_access_token() == 'mock-powerbi-access-token'
+
+
+def embed_data(token, minutes=60):
+    expiration = datetime.utcnow() + timedelta(minutes=minutes)
+    return {'embedUrl': 'url', 'accessToken': token, 'expiration': expiration.isoformat() + 'Z'}
+
+
+def test_embed_token_is_reused_per_key():
+    cache = EmbedTokenCache(safety_margin=300)
+    calls = []
+
+    def fetch(token):
+        def fetch():
+            calls.append(token)
+            return embed_data(token)
+        return fetch
+
+    assert cache.get('alice', fetch('a'))['accessToken'] == 'a'
+    assert cache.get('alice', fetch('a2'))['accessToken'] == 'a'
+    assert cache.get('bob', fetch('b'))['accessToken'] == 'b'
+    assert calls == ['a', 'b']
+
+
+def test_embed_token_inside_safety_margin_is_refetched():
+    cache = EmbedTokenCache(safety_margin=300)
+    tokens = iter(['old', 'new'])
+
+    def fetch():
+        return embed_data(next(tokens), minutes=4)
+
+    assert cache.get('key', fetch)['accessToken'] == 'old'
+    assert cache.get('key', fetch)['accessToken'] == 'new'
+
+
+def test_hot_embed_token_is_refreshed_in_the_background():
+    cache = EmbedTokenCache(safety_margin=60, refresh_ahead=3600, hot_threshold=2)
+    tokens = iter(['first', 'refreshed'])
+
+    def fetch():
+        return embed_data(next(tokens), minutes=30)
+
+    cache.get('key', fetch)
+    cache.get('key', fetch)
+    # The second read makes the entry hot inside the refresh-ahead window
+    assert cache.get('key', fetch)['accessToken'] == 'first'
+
+    deadline = time.monotonic() + 2
+    while cache.stats()['background_refreshes'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.get('key', fetch)['accessToken'] == 'refreshed'
+
+
+def test_embed_tokens_are_cached_per_effective_identity(make_app, monkeypatch):
+    app = make_app(POWERBI_RLS_ENABLED=True, **POWERBI_CREDENTIALS)
+    calls = []
+
+    def request_embed_token(workspace_id, report_id, dataset_id, access_level, identity):
+        calls.append(identity)
+        return embed_data(f'token-{identity[0]}')
+
+    monkeypatch.setattr(PowerBIService, 'get_access_token', staticmethod(lambda: 'aad-token'))
+    monkeypatch.setattr(PowerBIService, '_request_embed_token', staticmethod(request_embed_token))
+
+    alice = {'username': 'alice', 'esAdmin': False}
+    bob = {'username': 'bob', 'esAdmin': True}
+    with app.app_context():
+        assert PowerBIService.generate_embed_token('r1', alice)['accessToken'] == 'token-alice'
+        assert PowerBIService.generate_embed_token('r1', alice)['accessToken'] == 'token-alice'
+        assert PowerBIService.generate_embed_token('r1', bob)['accessToken'] == 'token-bob'
+
+    assert calls == [('alice', ('User',)), ('bob', ('Admin',))]
+
+
+def test_multi_report_embed_token_is_one_call_shared_across_orderings(make_app, monkeypatch):
+    app = make_app(**POWERBI_CREDENTIALS)
+    calls = []
+
+    def request_multi_embed_token(workspace_id, resources, identity):
+        calls.append(resources)
+        data = embed_data('shared')
+        data['reports'] = [{'reportId': report_id, 'embedUrl': f'url-{report_id}'} for report_id, _ in resources]
+        return data
+
+    monkeypatch.setattr(PowerBIService, 'get_access_token', staticmethod(lambda: 'aad-token'))
+    monkeypatch.setattr(PowerBIService, '_request_multi_embed_token', staticmethod(request_multi_embed_token))
+
+    with app.app_context():
+        first = PowerBIService.generate_multi_embed_token([('r1', 'd1'), ('r2', None)])
+        second = PowerBIService.generate_multi_embed_token([('r2', None), ('r1', 'd1')])
+
+    assert first['accessToken'] == second['accessToken'] == 'shared'
+    assert [report['reportId'] for report in first['reports']] == ['r1', 'r2']
+    assert calls == [(('r1', 'd1'), ('r2', ''))]
+
+
+def test_multi_report_embed_endpoint(client, login):
+    response = client.post('/api/powerbi/embed-token', headers=login(), json={
+        'reports': [{'report_id': 'r1'}, {'report_id': 'r2', 'dataset_id': 'd2'}]
+    })
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [report['reportId'] for report in data['reports']] == ['r1', 'r2']
+    assert data['accessToken']
+
+    response = client.post('/api/powerbi/embed-token', headers=login(), json={'reports': []})
+    assert response.status_code == 400
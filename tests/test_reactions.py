@@ -0,0 +1,82 @@
+from src.models.user import db
+from src.models.reaction import Reaction, ReactionCounter
+
+
+def counters(app, report_id=1):
+    with app.app_context():
+        return {
+            counter.reaction_type: counter.count
+            for counter in ReactionCounter.query.filter_by(report_id=report_id) if counter.count
+        }
+
+
+def assert_counters_match_rows(app):
+    with app.app_context():
+        expected = Reaction.count_reactions()
+        actual = {
+            (counter.report_id, counter.reaction_type): counter.count
+            for counter in ReactionCounter.query if counter.count
+        }
+        assert actual == expected
+
+
+def react(client, headers, tipo):
+    response = client.post('/api/reactions', json={'report_id': 1, 'tipo': tipo}, headers=headers)
+    assert response.status_code in (200, 201), response.get_json()
+    return response.get_json()
+
+
+def test_counters_follow_add_replace_and_remove(app, client, login):
+    headers = login()
+    assert counters(app) == {'me_interesa': 1, 'aporta': 1}
+
+    # The seeded user already reacted with me_interesa: the same type removes it
+    react(client, headers, 'me_interesa')
+    assert counters(app) == {'aporta': 1}
+
+    react(client, headers, 'increible')
+    react(client, headers, 'aporta')
+    assert counters(app) == {'aporta': 2}
+    assert_counters_match_rows(app)
+
+
+def test_stats_are_read_from_the_counters(app, client):
+    with app.app_context():
+        ReactionCounter.query.filter_by(report_id=1, reaction_type='aporta').one().count = 7
+        db.session.commit()
+
+    stats = {stat['tipo']: stat['count'] for stat in client.get('/api/reactions?report_id=1').get_json()}
+
+    assert stats == {'me_interesa': 1, 'aporta': 7}
+
+
+def test_reconcile_corrects_drift(app):
+    with app.app_context():
+        ReactionCounter.query.filter_by(report_id=1, reaction_type='aporta').one().count = 7
+        db.session.add(ReactionCounter(report_id=1, reaction_type='increible', count=2))
+        db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['reconcile-reactions'])
+
+    assert result.exit_code == 0, result.output
+    assert '2 counter(s) corrected' in result.output
+    assert_counters_match_rows(app)
+
+
+def test_bulk_stats_match_the_per_report_stats(client):
+    bulk = client.get('/api/reactions/stats?report_ids=1,99').get_json()
+
+    assert bulk['1'] == client.get('/api/reactions?report_id=1').get_json()
+    assert bulk['99'] == client.get('/api/reactions?report_id=99').get_json()
+    assert [stat['count'] for stat in bulk['99']] == [0, 0, 0]
+
+
+def test_bulk_stats_default_to_every_active_report(client):
+    assert list(client.get('/api/reactions/stats').get_json()) == ['1']
+
+
+def test_bulk_stats_reject_invalid_report_ids(client):
+    too_many = ','.join(str(report_id) for report_id in range(1, 502))
+
+    assert client.get('/api/reactions/stats?report_ids=1,x').status_code == 400
+    assert client.get(f'/api/reactions/stats?report_ids={too_many}').status_code == 400
@@ -0,0 +1,57 @@
+import sqlite3
+import pytest
+from flask import g
+from src.models.user import db, User
+from src.models.report import ReportVersion
+from src.services.user_cache import UserCache
+
+
+@pytest.fixture
+def app(make_app, tmp_path):
+    primary = make_app()
+    replica_path = tmp_path / 'replica.db'
+
+    # A snapshot of the primary that will lag behind every later write
+    with primary.app_context():
+        db.engine.dispose()
+    source = sqlite3.connect(tmp_path / 'app.db')
+    target = sqlite3.connect(replica_path)
+    source.backup(target)
+    source.close()
+    target.close()
+
+    return make_app(SQLALCHEMY_REPLICA_URIS=[f'sqlite:///{replica_path}'])
+
+
+def usernames(response):
+    return {user['username'] for user in response.get_json()}
+
+
+def test_reads_go_to_the_replica_until_the_client_writes(app, client):
+    response = client.post('/api/users', json={'username': 'nuevo', 'email': 'nuevo@example.com', 'password': 'x'})
+    assert response.status_code == 201
+
+    assert 'nuevo' not in usernames(app.test_client().get('/api/users'))
+    # The writer keeps reading from the primary
+    assert 'nuevo' in usernames(client.get('/api/users'))
+
+
+def test_versioned_responses_are_built_from_the_primary(app, client, login):
+    client.post('/api/comments', json={'report_id': 1, 'contenido': 'Solo en el primario'}, headers=login())
+
+    response = app.test_client().get('/api/comments?report_id=1')
+
+    assert response.get_json()[0]['contenido'] == 'Solo en el primario'
+
+
+def test_security_sensitive_reads_use_the_primary(app):
+    with app.app_context():
+        db.session.get(User, 2).is_active = False
+        ReportVersion.bump(1, comments=True)
+        db.session.commit()
+
+    with app.test_request_context('/api/comments'):
+        g.db_replica = 'replica_0'
+        assert db.session.query(User.is_active).filter_by(id=2).scalar() is True
+        assert UserCache().get(2).is_active is False
+        assert ReportVersion.get(1) == (1, 0)
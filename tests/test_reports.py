@@ -0,0 +1,42 @@
+import time
+from src.services.powerbi_service import PowerBIService
+
+
+def test_bootstrap_returns_everything_to_open_a_report(client, login):
+    headers = login()
+
+    data = client.get('/api/reports/1/bootstrap', headers=headers).get_json()
+
+    assert data['report']['powerbi_report_id'] == 'default-report'
+    assert data['embed']['accessToken'] == 'mock-powerbi-embed-token'
+    assert data['comments'] == client.get('/api/comments?report_id=1&limit=50', headers=headers).get_json()
+    assert data['comments_next_cursor'] is None
+    assert data['reactions'] == client.get('/api/reactions?report_id=1').get_json()
+    assert [reaction['tipo'] for reaction in data['user_reactions']] == ['me_interesa']
+
+
+def test_bootstrap_degrades_without_an_embed_token(make_app, monkeypatch):
+    app = make_app(BOOTSTRAP_EMBED_TIMEOUT=0.2)
+    client = app.test_client()
+    response = client.post('/api/auth/login', json={'username': 'user', 'password': 'user123'})
+    headers = {'Authorization': f"Bearer {response.get_json()['token']}"}
+
+    def slow(**kwargs):
+        time.sleep(1)
+
+    monkeypatch.setattr(PowerBIService, 'generate_embed_token', staticmethod(slow))
+    response = client.get('/api/reports/1/bootstrap', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['embed'] is None
+    assert len(response.get_json()['comments']) == 2
+
+    def failing(**kwargs):
+        raise RuntimeError('Power BI no disponible')
+
+    monkeypatch.setattr(PowerBIService, 'generate_embed_token', staticmethod(failing))
+    assert client.get('/api/reports/1/bootstrap', headers=headers).get_json()['embed'] is None
+
+
+def test_bootstrap_of_unknown_report_is_404(client, login):
+    assert client.get('/api/reports/1/bootstrap').status_code == 401
+    assert client.get('/api/reports/99/bootstrap', headers=login()).status_code == 404
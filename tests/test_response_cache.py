@@ -0,0 +1,47 @@
+def test_matching_etag_answers_304(client):
+    response = client.get('/api/comments?report_id=1')
+    etag = response.headers['ETag']
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+
+    response = client.get('/api/comments?report_id=1', headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert response.get_data() == b''
+
+
+def test_writes_bump_only_their_own_version(client, login):
+    headers = login()
+    comments_etag = client.get('/api/comments?report_id=1').headers['ETag']
+    reactions_etag = client.get('/api/reactions?report_id=1').headers['ETag']
+
+    client.post('/api/reactions', json={'report_id': 1, 'tipo': 'aporta'}, headers=headers)
+
+    assert client.get('/api/comments?report_id=1', headers={'If-None-Match': comments_etag}).status_code == 304
+    response = client.get('/api/reactions?report_id=1', headers={'If-None-Match': reactions_etag})
+    assert response.status_code == 200
+    reactions_etag = response.headers['ETag']
+
+    client.post('/api/comments', json={'report_id': 1, 'contenido': 'Nuevo comentario'}, headers=headers)
+
+    assert client.get('/api/reactions?report_id=1', headers={'If-None-Match': reactions_etag}).status_code == 304
+    response = client.get('/api/comments?report_id=1', headers={'If-None-Match': comments_etag})
+    assert response.status_code == 200
+    assert response.get_json()[0]['contenido'] == 'Nuevo comentario'
+
+
+def test_etags_depend_on_the_viewer(client, login):
+    anonymous = client.get('/api/comments?report_id=1').headers['ETag']
+    viewer = client.get('/api/comments?report_id=1', headers=login()).headers['ETag']
+    projected = client.get('/api/comments?report_id=1&fields=id,likes', headers=login()).headers['ETag']
+
+    assert anonymous != viewer
+    assert client.get('/api/comments?report_id=1&fields=id,likes').headers['ETag'] == projected
+
+
+def test_unchanged_responses_are_served_from_the_cache(app, client):
+    first = client.get('/api/reactions/stats?report_ids=1')
+    second = client.get('/api/reactions/stats?report_ids=1')
+
+    assert first.get_data() == second.get_data()
+    stats = app.extensions['response_cache'].stats()
+    assert (stats['hits'], stats['misses']) == (1, 1)
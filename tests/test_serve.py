@@ -0,0 +1,55 @@
+from click.testing import CliRunner
+from src import serve
+from src.config import Config
+
+
+def test_options_come_from_the_config_with_overrides():
+    options = serve.build_options(Config, workers=3, threads=None)
+
+    assert options['worker_class'] == Config.SERVER_WORKER_CLASS
+    assert options['workers'] == 3
+    assert options['threads'] == Config.SERVER_THREADS
+    assert options['bind'] == Config.SERVER_BIND
+
+
+def test_only_gthread_workers_use_threads():
+    assert serve.build_options(Config, worker_class='gevent', threads=8)['threads'] == 1
+    assert serve.build_options(Config, worker_class='gthread', threads=8)['threads'] == 8
+
+
+def test_cli_passes_options_to_gunicorn(monkeypatch):
+    started = []
+    monkeypatch.setattr(serve, 'run', started.append)
+
+    result = CliRunner().invoke(serve.main, ['--worker-class', 'sync', '--workers', '2', '--bind', '127.0.0.1:9000'])
+
+    assert result.exit_code == 0, result.output
+    assert (started[0]['worker_class'], started[0]['workers'], started[0]['bind']) == ('sync', 2, '127.0.0.1:9000')
+
+
+def test_cli_rejects_unknown_worker_classes(monkeypatch):
+    monkeypatch.setattr(serve, 'run', lambda options: None)
+
+    result = CliRunner().invoke(serve.main, ['--worker-class', 'eventlet'])
+
+    assert result.exit_code == 2
+    assert "'eventlet' is not one of" in result.output
+
+
+def test_write_behind_requires_a_single_worker(monkeypatch):
+    monkeypatch.setattr(serve, 'run', lambda options: None)
+    monkeypatch.setattr(Config, 'WRITE_BEHIND_ENABLED', True)
+
+    result = CliRunner().invoke(serve.main, ['--workers', '2'])
+
+    assert result.exit_code == 1
+    assert 'WRITE_BEHIND_ENABLED requiere un solo worker' in result.output
+
+
+def test_catalog_sync_runs_in_one_process_next_to_the_workers(monkeypatch):
+    monkeypatch.setattr(Config, 'POWERBI_CATALOG_WORKSPACES', ['w1'])
+    monkeypatch.setattr(Config, 'POWERBI_CATALOG_SYNC_INTERVAL', 600)
+    assert serve.catalog_sync_command(Config)[-3:] == ['sync-reports', '--interval', '600']
+
+    monkeypatch.setattr(Config, 'POWERBI_CATALOG_SYNC_INTERVAL', 0)
+    assert serve.catalog_sync_command(Config) is None
@@ -0,0 +1,52 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code, database_path):
+    """Run ``code`` in a fresh interpreter against a database file, returns its stdout"""
+    env = dict(
+        os.environ,
+        DATABASE_URL=f'sqlite:///{database_path}',
+        JWT_SECRET_KEY='test-jwt-secret-key-that-is-long-enough',
+        WRITE_BEHIND_ENABLED='false'
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', code], cwd=PROJECT_ROOT, env=env,
+        capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def tables(database_path):
+    with sqlite3.connect(database_path) as connection:
+        return {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def test_create_app_has_no_side_effects(tmp_path):
+    database_path = tmp_path / 'app.db'
+
+    output = run_python(
+        'import threading\n'
+        'from src.main import create_app\n'
+        'create_app()\n'
+        'print(threading.active_count())',
+        database_path
+    )
+
+    assert output.strip() == '1'
+    assert not database_path.exists() or tables(database_path) == set()
+
+
+def test_legacy_module_app_creates_and_seeds_the_database(tmp_path):
+    database_path = tmp_path / 'app.db'
+
+    run_python('from src.main import app', database_path)
+
+    assert {'users', 'comments', 'reports'} <= tables(database_path)
+    with sqlite3.connect(database_path) as connection:
+        assert connection.execute('SELECT COUNT(*) FROM users').fetchone()[0] > 0
@@ -0,0 +1,71 @@
+import gzip
+import pytest
+from src.services.static_manifest import StaticManifest
+
+
+@pytest.fixture
+def assets(app, tmp_path):
+    """Serve a temporary static folder with hashed, plain and precompressed files"""
+    root = tmp_path / 'static'
+    (root / 'assets').mkdir(parents=True)
+    (root / 'index.html').write_text('<html></html>')
+    (root / 'assets' / 'app.3f2a9c1b.js').write_text('console.log(1)')
+    (root / 'assets' / 'logo.svg').write_text('<svg/>')
+    (root / 'assets' / 'logo.svg.gz').write_bytes(gzip.compress(b'<svg/>'))
+
+    app.extensions['static_manifest'] = StaticManifest(str(root), app.config['STATIC_HASHED_PATTERN'])
+    return root
+
+
+def test_hashed_assets_are_immutable(assets, client):
+    response = client.get('/assets/app.3f2a9c1b.js')
+
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+
+
+def test_entry_point_is_revalidated_and_serves_client_routes(assets, client):
+    response = client.get('/reportes/1')
+
+    assert response.get_data() == b'<html></html>'
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert client.get('/', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+
+
+def test_precompressed_variants_are_negotiated(assets, client):
+    compressed = client.get('/assets/logo.svg', headers={'Accept-Encoding': 'gzip'})
+    plain = client.get('/assets/logo.svg', headers={'Accept-Encoding': 'identity'})
+
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.get_data()) == plain.get_data() == b'<svg/>'
+    assert compressed.headers['ETag'] != plain.headers['ETag']
+    assert 'Accept-Encoding' in plain.headers['Vary']
+    assert plain.headers['Cache-Control'] == 'public, max-age=3600'
+
+
+def test_precompressed_files_are_served_by_their_own_name(assets, client):
+    response = client.get('/assets/logo.svg.gz', headers={'Accept-Encoding': 'identity'})
+
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == 'image/svg+xml; charset=utf-8'
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.get_data()) == b'<svg/>'
+
+
+def test_hashed_pattern_comes_from_the_config(make_app):
+    app = make_app(STATIC_HASHED_PATTERN=r'\.min\.js$')
+
+    manifest = app.extensions['static_manifest']
+
+    assert manifest.hashed_pattern.pattern == r'\.min\.js$'
+    assert not manifest.lookup('favicon.ico').immutable
+
+
+def test_auto_reload_picks_up_new_files(tmp_path):
+    (tmp_path / 'index.html').write_text('v1')
+    manifest = StaticManifest(str(tmp_path), r'$^', auto_reload=True, reload_interval=0)
+    assert manifest.lookup('nuevo.css') is None
+
+    (tmp_path / 'nuevo.css').write_text('body {}')
+
+    assert manifest.lookup('nuevo.css').mimetype == 'text/css'
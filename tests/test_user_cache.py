@@ -0,0 +1,54 @@
+from flask_jwt_extended import create_access_token
+from src.models.user import db, User
+from src.services.user_cache import UserCache
+
+
+def test_profile_is_served_from_the_cache(app, client, login):
+    headers = login()
+    cache = app.extensions['user_cache']
+
+    for _ in range(3):
+        response = client.get('/api/auth/me', headers=headers)
+        assert response.get_json()['username'] == 'user'
+
+    assert cache.stats()['misses'] == 1
+    assert cache.stats()['hits'] == 2
+
+
+def test_tokens_without_claims_are_resolved_through_the_cache(app, client):
+    with app.test_request_context():
+        headers = {'Authorization': f"Bearer {create_access_token(identity='2')}"}
+
+    for _ in range(2):
+        assert client.post('/api/comments/1/like', headers=headers).status_code == 200
+
+    assert app.extensions['user_cache'].stats()['cached_users'] == 1
+
+
+def test_user_updates_invalidate_the_cached_user(client, login):
+    headers = login()
+    client.get('/api/auth/me', headers=headers)
+
+    response = client.put('/api/users/2', json={'email': 'nuevo@example.com'}, headers=login('admin', 'admin123'))
+    assert response.status_code == 200
+
+    assert client.get('/api/auth/me', headers=headers).get_json()['email'] == 'nuevo@example.com'
+
+
+def test_entries_expire_and_are_evicted(app):
+    with app.app_context():
+        expired = UserCache(ttl=-1)
+        expired.get(1)
+        expired.get(1)
+        assert expired.stats() == {'hits': 0, 'misses': 2, 'cached_users': 1}
+
+        small = UserCache(max_entries=1)
+        assert small.get(1).username == 'admin'
+        assert small.get(2).username == 'user'
+        assert small.stats()['cached_users'] == 1
+        assert small.get(99) is None
+
+        # Snapshots do not change behind the cache's back
+        db.session.get(User, 2).username = 'renombrado'
+        assert small.get(2).username == 'user'
+        db.session.rollback()
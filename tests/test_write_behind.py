@@ -0,0 +1,145 @@
+import threading
+import pytest
+from click.testing import CliRunner
+from src import serve
+from src.config import Config
+from sqlalchemy import event
+from src.models.user import db, User
+from src.models.comment import Comment, CommentLike
+from src.models.reaction import Reaction, ReactionCounter
+from src.services.write_behind import WriteBehindBuffer
+
+
+@pytest.fixture
+def app(make_app):
+    # Flushes only happen when a test asks for them
+    return make_app(WRITE_BEHIND_ENABLED=True, WRITE_BEHIND_FLUSH_MS=600000)
+
+
+def like_rows(app, comment_id):
+    with app.app_context():
+        return CommentLike.query.filter_by(comment_id=comment_id).count()
+
+
+def test_likes_are_visible_before_they_are_flushed(app, client, login):
+    headers = login()
+
+    response = client.post('/api/comments/1/like', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['likes'] == 6
+
+    comment = client.get('/api/comments?report_id=1', headers=headers).get_json()[-1]
+    assert (comment['id'], comment['likes'], comment['userLiked']) == (1, 6, True)
+    assert like_rows(app, 1) == 0
+
+    assert app.extensions['write_behind'].flush() == 1
+    assert like_rows(app, 1) == 1
+    with app.app_context():
+        assert db.session.get(Comment, 1).likes == 6
+
+
+def test_repeated_toggles_coalesce_into_one_write(app, client, login):
+    headers = login()
+
+    for _ in range(3):
+        client.post('/api/reactions', json={'report_id': 1, 'tipo': 'increible'}, headers=headers)
+    client.post('/api/comments/2/like', headers=headers)
+    client.post('/api/comments/2/like', headers=headers)
+
+    write_behind = app.extensions['write_behind']
+    assert write_behind.stats()['pending'] == 1
+    assert write_behind.flush() == 1
+
+    with app.app_context():
+        user = User.query.filter_by(username='user').one()
+        assert Reaction.get_user_reaction_type(user.id, 1) == 'increible'
+        assert db.session.get(ReactionCounter, (1, 'increible')).count == 1
+        assert db.session.get(ReactionCounter, (1, 'me_interesa')).count == 0
+    assert like_rows(app, 2) == 0
+
+
+def test_stop_drains_pending_writes(app, client, login):
+    client.post('/api/comments/1/like', headers=login())
+
+    app.extensions['write_behind'].stop()
+
+    assert like_rows(app, 1) == 1
+
+
+def test_server_refuses_several_workers(monkeypatch):
+    monkeypatch.setattr(Config, 'WRITE_BEHIND_ENABLED', True)
+
+    result = CliRunner().invoke(serve.main, ['--workers', '2'])
+
+    assert result.exit_code != 0
+    assert 'un solo worker' in result.output
+
+
+def test_reads_during_a_flush_do_not_count_in_flight_writes_twice(app, client, login):
+    headers = login()
+    client.post('/api/comments/1/like', headers=headers)
+    write_behind = app.extensions['write_behind']
+    readers, likes = [], []
+
+    def read_likes():
+        likes.append(client.get('/api/comments?report_id=1&fields=id,likes').get_json()[-1]['likes'])
+
+    def read_after_commit(session):
+        # The batch is committed but the flush has not finished yet (savepoint releases also land here)
+        if session.in_nested_transaction() or readers:
+            return
+        readers.append(threading.Thread(target=read_likes))
+        readers[0].start()
+        readers[0].join(0.3)
+
+    with app.app_context():
+        event.listen(db.session, 'after_commit', read_after_commit)
+        try:
+            write_behind.flush()
+        finally:
+            event.remove(db.session, 'after_commit', read_after_commit)
+    readers[0].join()
+
+    assert likes == [6]
+
+
+def test_concurrent_toggles_by_one_user_are_not_lost(app, client):
+    client.get('/health')
+    write_behind = app.extensions['write_behind']
+    actions = []
+
+    def toggle():
+        with app.app_context():
+            actions.append(write_behind.toggle_like(2, 1)[0])
+
+    threads = [threading.Thread(target=toggle) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(actions) == ['added'] * 4 + ['removed'] * 4
+    assert write_behind.stats()['pending'] == 0
+
+
+def test_failed_writes_are_retried_then_counted_as_dropped(app, client, login, monkeypatch):
+    headers = login()
+    write_behind = app.extensions['write_behind']
+    write_behind.max_attempts = 2
+    write_behind.flush_interval = 0
+    client.post('/api/comments/1/like', headers=headers)
+
+    def failing(key, desired):
+        raise RuntimeError('base de datos no disponible')
+
+    monkeypatch.setattr(WriteBehindBuffer, '_apply', staticmethod(failing))
+    assert write_behind.flush() == 0
+    # Still pending, so readers keep seeing the like
+    assert write_behind.stats()['pending'] == 1
+    assert client.get('/api/comments?report_id=1', headers=headers).get_json()[-1]['userLiked'] is True
+
+    write_behind.flush()
+
+    health = client.get('/health').get_json()['write_behind']
+    assert (health['pending'], health['failed_writes'], health['dropped_events']) == (0, 2, 1)
+    assert client.get('/api/comments?report_id=1', headers=headers).get_json()[-1]['userLiked'] is False